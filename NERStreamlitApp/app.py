@@ -1,5 +1,39 @@
+import os
+import time
+import uuid
+from collections import Counter
+
 import streamlit as st
-import spacy
+
+from ner_cache import result_cache, result_key
+from ner_corpus import (
+    count_corpus_documents,
+    iter_corpus,
+    iter_text_chunks,
+    open_uploaded_text,
+    process_corpus,
+    stream_chunk_entities,
+)
+from ner_gazetteer import build_gazetteer_patterns, read_gazetteer, ruler_throughput
+from ner_incremental import incremental_entities, segment_cache
+from ner_pipeline import (
+    DEFAULT_MODEL,
+    entity_records,
+    get_entity_ruler,
+    load_model,
+    ner_only_components,
+    registry,
+    ruler_cache,
+    run_pipeline,
+    time_pipeline,
+)
+from ner_profile import new_profile, profile_json, profile_summary, timed
+from ner_render import DEFAULT_PAGE_CHARS, page_bounds, render_page_html
+from ner_rulesets import RuleSetStore
+from ner_search import EntityIndex, text_document_name
+from ner_service import DEFAULT_SERVICE_URL, request_corpus_entities, request_entities
+from ner_stats import corpus_entity_frame, entity_frame, label_summary, to_csv_bytes, to_parquet_bytes, top_entities
+from sample_texts import sample_texts
 
 # =============================================================================
 # CUSTOM CSS STYLING
@@ -37,6 +71,21 @@ st.markdown(
 )
 
 
+# =============================================================================
+# SHARED INDEX
+# -----------------------------------------------------------------------------
+# Searchable index of the entities of every processed document. Built once per
+# process and shared by every session; created before the sidebar, whose
+# "Clear Search Index" button uses it.
+# =============================================================================
+@st.cache_resource
+def get_entity_index():
+    return EntityIndex()
+
+
+entity_index = get_entity_index()
+
+
 # =============================================================================
 # SIDEBAR CONTENT
 # -----------------------------------------------------------------------------
@@ -84,28 +133,97 @@ st.sidebar.expander("Help / Documentation", expanded=True).markdown(
 # -----------------------------------------------------------------------------
 # These are pre-loaded samples users can select to quickly test the app.
 # Each one covers a different topic domain (e.g., politics, sports, tech).
+# The texts themselves are defined in sample_texts.py.
 # =============================================================================
-sample_texts = {
-    "Sample 1 - Obama & Politics": (
-        "Barack Obama, the 44th President of the United States, delivered a stirring speech at Harvard University "
-        "in Cambridge, Massachusetts. During his presidency, he focused heavily on healthcare reform and economic recovery, "
-        "especially in urban centers like Chicago and New York City. In 2009, he received the Nobel Peace Prize."
-    ),
-    "Sample 2 - Sports & Entertainment": (
-        "LeBron James led the Los Angeles Lakers to a win at Crypto.com Arena. Meanwhile, Taylor Swift performed in a sold-out "
-        "concert at Madison Square Garden. Tom Brady made headlines as he announced his retirement from the NFL."
-    ),
-    "Sample 3 - Business & Tech": (
-        "Google revealed a $2B investment in AI, partnering with Oxford University. Elon Musk and Satya Nadella gave talks at "
-        "the TechFuture Summit, and Apple announced the Vision Pro headset from its Cupertino HQ."
-    )
-}
 st.sidebar.markdown("## Sample Texts")
 selected_sample = st.sidebar.selectbox("Choose a sample text", list(sample_texts.keys()))
 if st.sidebar.button("Load Sample Text"):
     st.session_state["user_text"] = sample_texts[selected_sample]
     st.sidebar.success("Sample text loaded!")
 
+# =============================================================================
+# PERFORMANCE OPTIONS
+# -----------------------------------------------------------------------------
+# NER-only fast mode skips the components the app never reads (tagger,
+# parser, attribute_ruler, lemmatizer). The comparison option times the full
+# pipeline and the fast mode on the same text, side by side.
+# =============================================================================
+st.sidebar.markdown("---")
+st.sidebar.markdown("## Performance")
+ner_only = st.sidebar.toggle("NER-only fast mode", value=False)
+compare_latency = st.sidebar.checkbox("Compare latency: full pipeline vs. NER-only")
+
+# Profiling times every pipeline component and rendering step of each run.
+# Profiled runs skip the result and paragraph caches, so every click is measured.
+profile_enabled = st.sidebar.checkbox("Profile pipeline and rendering", value=False)
+
+# Re-runs after an edit only analyze the paragraphs that changed.
+# Streaming mode and the service backend always analyze the whole text.
+incremental = st.sidebar.checkbox("Incremental re-analysis", value=True, help="Reuse entities of unchanged paragraphs when you edit the text and run NER again.")
+
+# Repeat runs on the same text + rules are served from the result cache.
+# The optional disk tier keeps results across app restarts.
+disk_cache = st.sidebar.checkbox("Also cache results on disk", value=False)
+if st.sidebar.button("Clear Result Cache"):
+    result_cache.clear(include_disk=True)
+    segment_cache.clear()
+    st.sidebar.success("Result cache cleared.")
+
+# =============================================================================
+# NER BACKEND
+# -----------------------------------------------------------------------------
+# "In-process" runs the model inside this Streamlit server. "Local service"
+# sends texts to ner_service.py, which batches requests from all users
+# together and can run on its own machine or process.
+# =============================================================================
+st.sidebar.markdown("---")
+st.sidebar.markdown("## NER Backend")
+backend = st.sidebar.radio("Run NER with", ["In-process", "Local service"])
+service_url = DEFAULT_SERVICE_URL
+if backend == "Local service":
+    service_url = st.sidebar.text_input("Service URL", value=DEFAULT_SERVICE_URL)
+    st.sidebar.caption("Start it with `python ner_service.py`. Streaming mode for large files always runs in-process.")
+use_service = backend == "Local service"
+
+# Load time and memory of the shared model, once some session has loaded it
+model_stats = registry.stats()
+if model_stats:
+    st.sidebar.markdown("---")
+    with st.sidebar.expander("Model Status"):
+        for entry in model_stats:
+            st.markdown(f"**{entry['model']}** — loaded in {entry['load_seconds']} s")
+            if entry["rss_after_mb"] is not None:
+                st.markdown(f"Resident memory: {entry['rss_after_mb']} MB (+{entry['rss_delta_mb']} MB for the model)")
+            st.caption("Pipeline: " + ", ".join(entry["pipeline"]))
+        rule_stats = ruler_cache.stats()
+        st.caption(
+            f"Compiled rule sets cached: {rule_stats['cached_rulers']} "
+            f"({rule_stats['hits']} hits, {rule_stats['misses']} misses)"
+        )
+        cached_results = result_cache.stats()
+        st.caption(
+            f"Cached NER results: {cached_results['entries']} "
+            f"({cached_results['hits']} hits, {cached_results['misses']} misses)"
+        )
+        cached_segments = segment_cache.stats()
+        st.caption(
+            f"Cached paragraphs: {cached_segments['entries']} "
+            f"({cached_segments['hits']} hits, {cached_segments['misses']} misses)"
+        )
+
+# =============================================================================
+# ENTITY SEARCH INDEX
+# -----------------------------------------------------------------------------
+# Entities of every processed text, file and corpus document are added to a
+# local search index (re-running a document replaces its old entries).
+# =============================================================================
+st.sidebar.markdown("---")
+st.sidebar.markdown("## Entity Search")
+index_results = st.sidebar.checkbox("Add results to the search index", value=True)
+if st.sidebar.button("Clear Search Index"):
+    entity_index.clear()
+    st.sidebar.success("Search index cleared.")
+
 st.sidebar.markdown("---")
 st.sidebar.markdown("**App Version 1.0**")
 
@@ -118,9 +236,79 @@ st.sidebar.markdown("**App Version 1.0**")
 if "custom_patterns" not in st.session_state:
     st.session_state["custom_patterns"] = []
 
+# Statistics from the last gazetteer import
+if "gazetteer_report" not in st.session_state:
+    st.session_state["gazetteer_report"] = None
+
 if "user_text" not in st.session_state:
     st.session_state["user_text"] = ""
 
+if "corpus_results" not in st.session_state:
+    st.session_state["corpus_results"] = []
+
+if "corpus_frame" not in st.session_state:
+    st.session_state["corpus_frame"] = None
+
+# Profiles of earlier runs, aggregated in the profiling panel
+if "profile_runs" not in st.session_state:
+    st.session_state["profile_runs"] = []
+
+# Typed text is indexed under one document name per session (see text_document_name)
+if "text_document_id" not in st.session_state:
+    st.session_state["text_document_id"] = uuid.uuid4().hex[:12]
+
+# The last single-text result, so paging through it doesn't rerun NER
+if "ner_result" not in st.session_state:
+    st.session_state["ner_result"] = None
+
+# The last streamed file's results, so changing a widget doesn't stream the file again
+if "stream_result" not in st.session_state:
+    st.session_state["stream_result"] = None
+
+# =============================================================================
+# ENTITY STATISTICS AND EXPORT
+# -----------------------------------------------------------------------------
+# Shared by the single-text, streaming and batch views. Everything is computed
+# from the columnar entity table (see ner_stats.py):
+# - mentions and unique entities per label
+# - the most frequent entities within each label
+# - CSV / Parquet downloads of the full entity table, built once per table
+#   and kept in session state (next to the table they were built from), so
+#   reruns don't serialize the whole table again
+# =============================================================================
+def entity_exports(frame, key):
+    cached = st.session_state.get(f"{key}_exports")
+    if cached is None or cached["frame"] is not frame:
+        cached = {"frame": frame, "csv": to_csv_bytes(frame), "parquet": to_parquet_bytes(frame)}
+        st.session_state[f"{key}_exports"] = cached
+    return cached
+
+
+def show_entity_statistics(frame, key):
+    st.markdown("#### Entity Statistics")
+    st.write(f"Total entities recognized: {len(frame)}")
+    st.dataframe(label_summary(frame), hide_index=True)
+
+    with st.expander("Top Entities per Type"):
+        top_n = st.slider("Entities per type", 1, 25, 5, key=f"{key}_top_n")
+        st.dataframe(top_entities(frame, top_n), hide_index=True)
+
+    exports = entity_exports(frame, key)
+    csv_col, parquet_col = st.columns(2)
+    with csv_col:
+        st.download_button("⬇️ Download CSV", exports["csv"], file_name="entities.csv", mime="text/csv", key=f"{key}_csv")
+    with parquet_col:
+        if exports["parquet"] is None:
+            st.caption("Parquet export needs `pyarrow` (`pip install pyarrow`).")
+        else:
+            st.download_button(
+                "⬇️ Download Parquet",
+                exports["parquet"],
+                file_name="entities.parquet",
+                mime="application/octet-stream",
+                key=f"{key}_parquet"
+            )
+
 # =============================================================================
 # MAIN APP HEADER
 # -----------------------------------------------------------------------------
@@ -138,6 +326,16 @@ st.markdown('<div class="sub-header">Built with spaCy and Streamlit</div>', unsa
 # Column 1: Input for user text (typed or uploaded)
 # Column 2: Interface for defining and managing custom entity rules
 # =============================================================================
+CORPUS_INPUT = "Upload Corpus (.txt / .zip / .jsonl)"
+# Uploaded .txt files larger than this are streamed in chunks by default
+STREAM_THRESHOLD_BYTES = 1_000_000
+# The profiling panel aggregates at most this many recent runs
+MAX_PROFILE_RUNS = 500
+# The rules expander previews at most this many rules
+RULE_PREVIEW_LIMIT = 200
+# Named, versioned rule sets shared by every session of this app folder
+rule_store = RuleSetStore()
+stream_upload = False
 col1, col2 = st.columns(2)
 
 # ---------------- TEXT INPUT SECTION (LEFT COLUMN) ----------------
@@ -145,13 +343,26 @@ with col1:
     st.markdown('<h3 style="color:#C99700;">Text Input</h3>', unsafe_allow_html=True)
     st.markdown('<p class="instruction">Enter or upload your text below.</p>', unsafe_allow_html=True)
     
-    input_method = st.radio("Choose Input Method", ["Type or Paste Text", "Upload Text File (.txt)"])
+    input_method = st.radio("Choose Input Method", ["Type or Paste Text", "Upload Text File (.txt)", CORPUS_INPUT])
 
     if input_method == "Type or Paste Text":
         user_text = st.text_area("Enter Text Here", height=300, value=st.session_state["user_text"], key="user_text")
+    elif input_method == CORPUS_INPUT:
+        corpus_files = st.file_uploader(
+            "Upload .txt files, a .zip of .txt files, or a .jsonl file (one {\"text\": ...} per line)",
+            type=["txt", "zip", "jsonl"],
+            accept_multiple_files=True
+        )
     else:
         uploaded_file = st.file_uploader("Upload a .txt file", type=["txt"])
-        if uploaded_file:
+        stream_upload = st.checkbox(
+            "Stream in chunks (recommended for very large files)",
+            value=bool(uploaded_file) and uploaded_file.size > STREAM_THRESHOLD_BYTES
+        )
+        if uploaded_file and stream_upload:
+            user_text = ""
+            st.caption(f"{uploaded_file.name}: {uploaded_file.size / 1_000_000:.1f} MB, processed in chunks when you run NER.")
+        elif uploaded_file:
             user_text = uploaded_file.read().decode("utf-8")
             st.session_state.user_text = user_text
         else:
@@ -173,97 +384,521 @@ with col2:
         else:
             st.error("Both label and pattern fields are required.")
 
+    # Bulk import from a gazetteer file (CSV or JSONL)
+    with st.expander("Import Gazetteer"):
+        st.caption(
+            "CSV with `label` and `pattern` columns, or JSONL with `label`/`pattern` per line. "
+            "Phrases match case-insensitively; duplicates are skipped."
+        )
+        gazetteer_file = st.file_uploader("Gazetteer file", type=["csv", "jsonl"], key="gazetteer_file")
+        if gazetteer_file is not None and st.button("Import Rules"):
+            try:
+                nlp = load_model(DEFAULT_MODEL)
+                new_patterns, import_stats = build_gazetteer_patterns(
+                    read_gazetteer(gazetteer_file), nlp, st.session_state.custom_patterns
+                )
+                all_patterns = st.session_state.custom_patterns + new_patterns
+
+                compile_start = time.perf_counter()
+                ruler = get_entity_ruler(all_patterns, DEFAULT_MODEL)
+                compile_seconds = time.perf_counter() - compile_start
+
+                st.session_state.custom_patterns = all_patterns
+                st.session_state.gazetteer_report = {
+                    "file": gazetteer_file.name,
+                    "imported": len(new_patterns),
+                    "total_rules": len(all_patterns),
+                    **import_stats,
+                    "compile_seconds": round(compile_seconds, 3),
+                    "throughput": None if ruler is None else ruler_throughput(
+                        nlp, ruler, list(sample_texts.values()) + [st.session_state.user_text]
+                    ),
+                }
+            except (ValueError, KeyError, TypeError, UnicodeDecodeError) as e:
+                st.error(f"Could not import gazetteer: {e}")
+
+        report = st.session_state.gazetteer_report
+        if report:
+            st.success(f"Imported {report['imported']:,} rules from {report['file']} ({report['total_rules']:,} in total).")
+            st.markdown(
+                f"- Rows read: {report['rows']:,} ({report['duplicates']:,} duplicates, "
+                f"{report['label_conflicts']:,} with a conflicting label, {report['empty']:,} empty)\n"
+                f"- Phrase patterns: {report['phrase_lower']:,} case-insensitive, {report['phrase_exact']:,} exact case "
+                f"({report['converted_to_phrase']:,} rewritten from token patterns)\n"
+                f"- Token patterns: {report['token']:,}\n"
+                f"- Compile time: {report['compile_seconds']} s"
+            )
+            throughput = report["throughput"]
+            if throughput and throughput["docs_per_sec"]:
+                st.markdown(
+                    f"- Match throughput: {throughput['docs_per_sec']:,} docs/s, "
+                    f"{throughput['chars_per_sec']:,} chars/s "
+                    f"({throughput['matches']} matches in {throughput['docs']} test texts)"
+                )
+
+    # Save the current rules under a name, or load a saved rule set
+    with st.expander("Saved Rule Sets"):
+        ruleset_name = st.text_input("Rule set name", key="ruleset_name")
+        if st.button("Save Current Rules", disabled=not st.session_state.custom_patterns):
+            if ruleset_name.strip():
+                version = rule_store.save(ruleset_name.strip(), st.session_state.custom_patterns)
+                st.success(f"Saved {len(st.session_state.custom_patterns):,} rules as {ruleset_name.strip()} v{version}.")
+            else:
+                st.error("Please enter a name for the rule set.")
+
+        saved_sets = rule_store.names()
+        if saved_sets:
+            saved_names = [name for name, _, _ in saved_sets]
+            rule_counts = {name: (version, count) for name, version, count in saved_sets}
+            chosen_set = st.selectbox(
+                "Saved rule set",
+                saved_names,
+                format_func=lambda name: f"{name} (v{rule_counts[name][0]}, {rule_counts[name][1]:,} rules)"
+            )
+            chosen_version = st.selectbox(
+                "Version",
+                [None] + [version for version, _, _ in rule_store.versions(chosen_set)],
+                format_func=lambda version: "Latest" if version is None else f"v{version}"
+            )
+            counts_by_label = rule_store.label_counts(chosen_set, chosen_version)
+            chosen_labels = st.multiselect(
+                "Only load these labels (optional)",
+                list(counts_by_label),
+                format_func=lambda label: f"{label} ({counts_by_label[label]:,})"
+            )
+            if st.button("Load Rule Set"):
+                load_start = time.perf_counter()
+                st.session_state.custom_patterns = rule_store.load(chosen_set, chosen_version, chosen_labels)
+                st.session_state.gazetteer_report = None
+                st.success(
+                    f"Loaded {len(st.session_state.custom_patterns):,} rules from {chosen_set} "
+                    f"in {(time.perf_counter() - load_start) * 1000:.0f} ms."
+                )
+
     # Display current rules in a collapsible section
     if st.session_state.custom_patterns:
         with st.expander("Current Custom Rules"):
-            st.json(st.session_state.custom_patterns)
+            # Imported gazetteers can hold 100k+ rules; only preview those
+            if len(st.session_state.custom_patterns) > RULE_PREVIEW_LIMIT:
+                st.caption(f"Showing the first {RULE_PREVIEW_LIMIT} of {len(st.session_state.custom_patterns):,} rules.")
+            st.json(st.session_state.custom_patterns[:RULE_PREVIEW_LIMIT])
 
     # Clear all custom rules
     if st.button("Clear Custom Rules"):
         st.session_state.custom_patterns = []
+        st.session_state.gazetteer_report = None
         st.success("Cleared all custom rules.")
 
 # =============================================================================
-# SPA-CY MODEL LOADER
+# MAIN BUTTON: Run NER and Display Results
+# -----------------------------------------------------------------------------
+# When "Run NER" is clicked:
+# - The shared model is fetched (loaded only on the first run in this process)
+# - Custom rules are compiled into a ruler (or reused from the ruler cache)
+# - The text is processed
+# - Entities and visualizations are displayed
+# =============================================================================
+run_ner = input_method != CORPUS_INPUT and st.button("Run NER")
+# Set while a profiled run is being processed and rendered
+current_profile = None
+
+if run_ner and not stream_upload:
+    if not st.session_state.user_text.strip():
+        st.warning("Please enter some text.")
+    else:
+        try:
+            text = st.session_state.user_text
+            if profile_enabled:
+                current_profile = new_profile(text, "NER-only" if ner_only else "full")
+            # Profiled and service runs always analyze the whole text
+            incremental_run = incremental and not profile_enabled and not use_service
+            cache_key = result_key(text, st.session_state.custom_patterns, DEFAULT_MODEL, ner_only, incremental_run)
+            records = None if profile_enabled else result_cache.get(cache_key, use_disk=disk_cache)
+            from_cache = records is not None
+
+            # The model only runs on a cache miss (or when timing is requested)
+            if records is None and use_service:
+                with st.spinner("Waiting for the NER service..."), timed(current_profile, "pipeline", "service request"):
+                    records = request_entities([text], st.session_state.custom_patterns, ner_only, service_url)[0]
+                result_cache.put(cache_key, records, use_disk=disk_cache)
+
+            if records is None or (compare_latency and not use_service):
+                if not registry.is_loaded(DEFAULT_MODEL):
+                    with st.spinner("Loading spaCy model (first run only)..."):
+                        load_model(DEFAULT_MODEL)
+                nlp = load_model(DEFAULT_MODEL)
+                ner_components = ner_only_components(nlp)
+                ruler = get_entity_ruler(st.session_state.custom_patterns, DEFAULT_MODEL)
+
+            reanalyzed = None
+            if records is None:
+                with st.spinner("Analyzing text..."):
+                    if current_profile is not None:
+                        doc = run_pipeline(
+                            nlp, text, ruler, ner_components if ner_only else None, current_profile["pipeline"]
+                        )
+                        with timed(current_profile, "pipeline", "entity records"):
+                            records = entity_records(doc)
+                    elif incremental_run:
+                        records, segment_total, reanalyzed = incremental_entities(
+                            nlp,
+                            text,
+                            st.session_state.custom_patterns,
+                            DEFAULT_MODEL,
+                            ruler,
+                            ner_components if ner_only else None,
+                            ner_only
+                        )
+                    else:
+                        doc = run_pipeline(nlp, text, ruler, ner_components if ner_only else None)
+                        records = entity_records(doc)
+                result_cache.put(cache_key, records, use_disk=disk_cache)
+
+            if from_cache:
+                st.caption("⚡ Loaded from the result cache (same text, rules and mode as an earlier run).")
+            elif reanalyzed is not None and reanalyzed < segment_total:
+                st.caption(f"♻️ Re-analyzed {reanalyzed} of {segment_total} paragraphs; the rest were unchanged since an earlier run.")
+            st.session_state.ner_page = 1
+
+            # ---- Latency Comparison (Full Pipeline vs. NER-Only) ----
+            if compare_latency and use_service:
+                st.info("The latency comparison times the in-process model. Switch the backend to In-process to use it.")
+            elif compare_latency:
+                with st.spinner("Timing both pipelines..."):
+                    full_seconds = time_pipeline(nlp, text, ruler)
+                    fast_seconds = time_pipeline(nlp, text, ruler, ner_components)
+                st.markdown("### Latency Comparison")
+                full_col, fast_col = st.columns(2)
+                with full_col:
+                    st.metric("Full pipeline", f"{full_seconds * 1000:.1f} ms")
+                    st.caption(", ".join(nlp.pipe_names))
+                with fast_col:
+                    st.metric(
+                        "NER-only",
+                        f"{fast_seconds * 1000:.1f} ms",
+                        delta=f"{(fast_seconds - full_seconds) * 1000:.1f} ms",
+                        delta_color="inverse"
+                    )
+                    st.caption(", ".join(ner_components))
+                if fast_seconds > 0:
+                    st.caption(f"Speedup: {full_seconds / fast_seconds:.1f}× (median of 3 runs each)")
+
+            # The entity table is built once here, not on every rerun
+            with timed(current_profile, "render", "entity table"):
+                st.session_state.ner_result = {"text": text, "records": records, "frame": entity_frame(records)}
+            if current_profile is not None:
+                current_profile["entities"] = len(records)
+                st.session_state.profile_runs = (st.session_state.profile_runs + [current_profile])[-MAX_PROFILE_RUNS:]
+            if index_results:
+                if input_method != "Type or Paste Text" and uploaded_file:
+                    document_name = uploaded_file.name
+                else:
+                    document_name = text_document_name(st.session_state.text_document_id)
+                entity_index.add_documents([(document_name, records)], source="text")
+
+        except Exception as e:
+            st.error(f"An error occurred while processing: {e}")
+
+# =============================================================================
+# SINGLE-TEXT RESULTS
 # -----------------------------------------------------------------------------
-# This function loads the pre-trained English model.
-# It assumes the model is already available (or will be downloaded via your deployment logic).
+# Shown from session state, so changing the page doesn't rerun the model.
+# - All entities go into one dataframe instead of one element per entity
+# - The highlighted text is rendered one page at a time, with pages ending on
+#   paragraph or sentence boundaries, to keep the HTML payload small
 # =============================================================================
-def load_model():
-    return spacy.load("en_core_web_sm")
+ner_result = st.session_state.ner_result
+if ner_result and input_method != CORPUS_INPUT and not stream_upload:
+    text, records = ner_result["text"], ner_result["records"]
+
+    # ---- Display Recognized Entities ----
+    st.markdown("### Recognized Entities")
+    if records:
+        with timed(current_profile, "render", "entity list"):
+            st.dataframe(
+                ner_result["frame"].rename(columns={
+                    "text": "Entity", "label": "Type", "start": "Start", "end": "End", "sentence": "Sentence"
+                }),
+                hide_index=True
+            )
+
+        # ---- Entity Statistics and Export ----
+        with timed(current_profile, "render", "statistics"):
+            show_entity_statistics(ner_result["frame"], "single")
+
+    else:
+        st.info("No named entities were found.")
+
+    # ---- Visualize Highlighted Text (One Page at a Time) ----
+    st.markdown("### Highlighted Text")
+    page_chars = st.select_slider(
+        "Characters per page",
+        options=[1000, 2000, DEFAULT_PAGE_CHARS, 10000, 20000],
+        value=DEFAULT_PAGE_CHARS
+    )
+    with timed(current_profile, "render", "displacy"):
+        pages = page_bounds(text, records, page_chars)
+    if len(pages) > 1:
+        # A smaller page count (after changing the page size) must not leave us past the end
+        if st.session_state.get("ner_page", 1) > len(pages):
+            st.session_state.ner_page = len(pages)
+        page_number = st.number_input("Page", min_value=1, max_value=len(pages), key="ner_page")
+    else:
+        page_number = 1
+    page_start, page_end = pages[page_number - 1]
+    st.caption(f"Page {page_number} of {len(pages)} — characters {page_start:,}–{page_end:,} of {len(text):,}")
+    with timed(current_profile, "render", "displacy"):
+        st.markdown(render_page_html(text, records, page_start, page_end), unsafe_allow_html=True)
 
 # =============================================================================
-# ADD ENTITY RULER TO PIPELINE
+# PROFILING PANEL
 # -----------------------------------------------------------------------------
-# This function injects custom rules into the spaCy NLP pipeline.
-# It first removes any existing EntityRuler, then adds a fresh one.
+# Aggregates every profiled run of this session: where the time goes inside
+# the pipeline (per component) and while rendering the results.
 # =============================================================================
-def add_entity_ruler(nlp, patterns):
-    if "entity_ruler" in nlp.pipe_names:
-        nlp.remove_pipe("entity_ruler")
-    ruler = nlp.add_pipe("entity_ruler", before="ner")
-    ruler.add_patterns(patterns)
-    return nlp
+if profile_enabled and st.session_state.profile_runs:
+    profile_runs = st.session_state.profile_runs
+    st.markdown("### ⏱️ Profile")
+    summary = profile_summary(profile_runs)
+    st.caption(f"{len(profile_runs)} profiled runs; the latest took {sum(profile_runs[-1]['pipeline'].values()) * 1000:.1f} ms in the pipeline.")
+    st.dataframe(summary, hide_index=True)
+    st.bar_chart(summary.set_index("Step")["Mean ms"])
+
+    download_col, reset_col = st.columns(2)
+    with download_col:
+        st.download_button("⬇️ Download Profile (JSON)", profile_json(profile_runs), file_name="ner_profile.json", mime="application/json")
+    with reset_col:
+        if st.button("Reset Profile"):
+            st.session_state.profile_runs = []
+            st.rerun()
 
 # =============================================================================
-# MAIN BUTTON: Run NER and Display Results
+# STREAMING MODE: Run NER Over a Very Large Uploaded File
 # -----------------------------------------------------------------------------
-# When "Run NER" is clicked:
-# - The model is loaded
-# - Custom rules are applied (if any)
-# - The text is processed
-# - Entities and visualizations are displayed
+# The file is never decoded in one piece. It is split into paragraph- or
+# sentence-aligned chunks, each chunk goes through the model on its own, and
+# entity offsets are mapped back to positions in the original file.
+# Running totals are redrawn after every chunk, so results appear while the
+# rest of the file is still being processed.
 # =============================================================================
-if st.button("Run NER"):
-    if not st.session_state.user_text.strip():
-        st.warning("Please enter some text.")
+if run_ner and stream_upload:
+    if not uploaded_file:
+        st.warning("Please upload a .txt file.")
     else:
         try:
-            nlp = load_model()
-
-            if st.session_state.custom_patterns:
-                nlp = add_entity_ruler(nlp, st.session_state.custom_patterns)
-
-            with st.spinner("Analyzing text..."):
-                doc = nlp(st.session_state.user_text)
-
-            # ---- Display Recognized Entities (Split into Columns) ----
-            st.markdown("### Recognized Entities")
-            if doc.ents:
-                entity_lines = [f"**{ent.text}** — `{ent.label_}`" for ent in doc.ents]
-                mid = (len(entity_lines) + 1) // 2
-                col1, col2 = st.columns(2)
-                with col1:
-                    for line in entity_lines[:mid]:
-                        st.markdown(line)
-                with col2:
-                    for line in entity_lines[mid:]:
-                        st.markdown(line)
-
-                # ---- Entity Frequency Statistics (Sorted by Count Descending) ----
-                stats = {}
-                for ent in doc.ents:
-                    stats[ent.label_] = stats.get(ent.label_, 0) + 1
-
-                # Sort the stats dictionary by frequency (value) in descending order
-                sorted_stats = dict(sorted(stats.items(), key=lambda item: item[1], reverse=True))
-
-                # Convert to a format Streamlit can display cleanly as a table
-                st.markdown("#### Entity Statistics")
-                st.write(f"Total entities recognized: {len(doc.ents)}")
-                st.table({"Entity Type": list(sorted_stats.keys()), "Count": list(sorted_stats.values())})
+            if not registry.is_loaded(DEFAULT_MODEL):
+                with st.spinner("Loading spaCy model (first run only)..."):
+                    load_model(DEFAULT_MODEL)
 
-            else:
-                st.info("No named entities were found.")
+            st.markdown("### Recognized Entities (Streaming)")
+            progress = st.progress(0.0, text="Starting...")
+            totals_placeholder = st.empty()
+            stats_placeholder = st.empty()
+            latest_placeholder = st.empty()
 
-            # ---- Visualize Highlighted Text ----
-            st.markdown("### Highlighted Text")
-            html = spacy.displacy.render(doc, style="ent", jupyter=False)
-            st.markdown(html, unsafe_allow_html=True)
+            stream_records = []
+            label_counts = Counter()
+            chunk_number = 0
+            text_stream = open_uploaded_text(uploaded_file)
+            try:
+                for chunk_number, (offset, chunk, records) in enumerate(
+                    stream_chunk_entities(
+                        iter_text_chunks(text_stream),
+                        st.session_state.custom_patterns,
+                        DEFAULT_MODEL,
+                        ner_only=ner_only
+                    ),
+                    start=1
+                ):
+                    stream_records.extend(records)
+                    label_counts.update(record[1] for record in records)
+
+                    progress.progress(
+                        min(uploaded_file.tell() / max(uploaded_file.size, 1), 1.0),
+                        text=f"Processed {chunk_number} chunks ({offset + len(chunk):,} characters)"
+                    )
+                    totals_placeholder.write(f"Total entities recognized so far: {len(stream_records)}")
+                    stats_placeholder.table({"Entity Type": [label for label, _ in label_counts.most_common()],
+                                             "Count": [count for _, count in label_counts.most_common()]})
+                    if records:
+                        latest_placeholder.markdown(
+                            "**Latest chunk:** " + ", ".join(
+                                f"{ent_text} (`{label}`, {start}–{end})" for ent_text, label, start, end, _ in records[:20]
+                            )
+                        )
+            finally:
+                # Detach even if the run stops early: a wrapper that's garbage collected closes the upload with it
+                text_stream.detach()
+            progress.progress(1.0, text=f"Done — {chunk_number} chunks processed")
+
+            st.session_state.stream_result = {
+                "file": (uploaded_file.name, uploaded_file.size),
+                "chunks": chunk_number,
+                "frame": entity_frame(stream_records),
+            }
+            if index_results:
+                entity_index.add_documents([(uploaded_file.name, stream_records)], source="stream")
 
         except Exception as e:
             st.error(f"An error occurred while processing: {e}")
 
+# =============================================================================
+# STREAMING RESULTS
+# -----------------------------------------------------------------------------
+# Shown from session state for as long as the same file stays uploaded, so
+# the statistics widgets can be changed without streaming the file again.
+# =============================================================================
+stream_result = st.session_state.stream_result
+if (
+    stream_result
+    and stream_upload
+    and uploaded_file
+    and stream_result["file"] == (uploaded_file.name, uploaded_file.size)
+):
+    if not run_ner:
+        st.markdown("### Recognized Entities (Streaming)")
+        st.caption(f"{stream_result['file'][0]}: {stream_result['chunks']} chunks processed")
+    if len(stream_result["frame"]):
+        show_entity_statistics(stream_result["frame"], "stream")
+    else:
+        st.info("No named entities were found.")
+
+# =============================================================================
+# BATCH MODE: Run NER Over an Uploaded Corpus
+# -----------------------------------------------------------------------------
+# Documents are streamed through the model in batches (optionally across
+# several worker processes). Only each document's entity list is kept; the
+# columnar entity table for the whole corpus is built once when the run ends.
+# =============================================================================
+if input_method == CORPUS_INPUT:
+    with st.expander("Batch Settings"):
+        batch_size = st.slider("Batch size (documents per nlp.pipe batch)", 8, 1000, 128, step=8)
+        n_process = st.number_input("Worker processes", min_value=1, max_value=os.cpu_count() or 1, value=1)
+        st.caption("Each extra worker loads its own copy of the model, so it pays off on large corpora.")
+
+    if st.button("Run Batch NER"):
+        if not corpus_files:
+            st.warning("Please upload at least one corpus file.")
+        else:
+            try:
+                total_docs = count_corpus_documents(corpus_files)
+                progress = st.progress(0.0, text=f"Processed 0 of {total_docs} documents")
+                results = []
+                if use_service:
+                    corpus_stream = request_corpus_entities(
+                        iter_corpus(corpus_files),
+                        st.session_state.custom_patterns,
+                        ner_only,
+                        service_url,
+                        batch_size=batch_size
+                    )
+                else:
+                    corpus_stream = process_corpus(
+                        iter_corpus(corpus_files),
+                        st.session_state.custom_patterns,
+                        DEFAULT_MODEL,
+                        batch_size=batch_size,
+                        n_process=int(n_process),
+                        ner_only=ner_only
+                    )
+                for name, records in corpus_stream:
+                    results.append((name, records))
+                    if len(results) % batch_size == 0 or len(results) == total_docs:
+                        progress.progress(
+                            min(len(results) / max(total_docs, 1), 1.0),
+                            text=f"Processed {len(results)} of {total_docs} documents"
+                        )
+                st.session_state.corpus_results = results
+                st.session_state.corpus_frame = corpus_entity_frame(results)
+                if index_results:
+                    with st.spinner("Adding the results to the search index..."):
+                        entity_index.add_documents(results, source="batch")
+            except Exception as e:
+                st.error(f"An error occurred while processing the corpus: {e}")
+
+    # Results are kept in session state so browsing documents doesn't rerun NER
+    if st.session_state.corpus_results:
+        corpus_results = st.session_state.corpus_results
+        corpus_frame = st.session_state.corpus_frame
+
+        st.markdown("### Corpus Results")
+        st.write(f"Documents processed: {len(corpus_results)}")
+        show_entity_statistics(corpus_frame, "corpus")
+
+        st.markdown("#### Entities per Document")
+        doc_names = [name for name, _ in corpus_results]
+        selected_index = st.selectbox(
+            "Choose a document",
+            range(len(doc_names)),
+            format_func=lambda index: f"{doc_names[index]} ({len(corpus_results[index][1])} entities)"
+        )
+        selected_records = corpus_results[selected_index][1]
+        if selected_records:
+            st.dataframe(
+                entity_frame(selected_records).rename(columns={
+                    "text": "Entity", "label": "Type", "start": "Start", "end": "End", "sentence": "Sentence"
+                }),
+                hide_index=True
+            )
+        else:
+            st.info("No named entities were found in this document.")
+
+# =============================================================================
+# ENTITY SEARCH
+# -----------------------------------------------------------------------------
+# Searches every document in the local index by entity prefix and label.
+# Matching entities are listed by number of mentions; picking one shows
+# where it occurs (document, offsets, sentence).
+# =============================================================================
+index_stats = entity_index.stats()
+if index_stats["documents"]:
+    st.markdown("### 🔎 Entity Search")
+    st.caption(
+        f"{index_stats['mentions']:,} mentions of {index_stats['entities']:,} entities "
+        f"in {index_stats['documents']:,} indexed documents"
+    )
+    search_col, label_col = st.columns([2, 1])
+    with search_col:
+        search_query = st.text_input("Entity starts with", key="entity_search_query")
+    with label_col:
+        search_labels = st.multiselect("Entity types", entity_index.labels(), key="entity_search_labels")
+
+    search_start = time.perf_counter()
+    matches = entity_index.search(search_query, search_labels)
+    search_ms = (time.perf_counter() - search_start) * 1000
+    if matches:
+        st.dataframe(
+            {
+                "Entity": [text for _, text, _, _, _ in matches],
+                "Type": [label for _, _, label, _, _ in matches],
+                "Mentions": [mentions for _, _, _, mentions, _ in matches],
+                "Documents": [documents for _, _, _, _, documents in matches]
+            },
+            hide_index=True
+        )
+        st.caption(f"Top {len(matches)} matches in {search_ms:.1f} ms")
+
+        match_index = st.selectbox(
+            "Show mentions of",
+            range(len(matches)),
+            format_func=lambda index: f"{matches[index][1]} ({matches[index][2]})",
+            key="entity_search_match"
+        )
+        postings = entity_index.postings(matches[match_index][0])
+        st.dataframe(
+            {
+                "Document": [name for name, _, _, _ in postings],
+                "Start": [start for _, start, _, _ in postings],
+                "End": [end for _, _, end, _ in postings],
+                "Sentence": [sentence for _, _, _, sentence in postings]
+            },
+            hide_index=True
+        )
+        if len(postings) < matches[match_index][3]:
+            st.caption(f"Showing the first {len(postings):,} of {matches[match_index][3]:,} mentions.")
+    else:
+        st.info("No indexed entities match this search.")
+
 # =============================================================================
 # FOOTER
 # -----------------------------------------------------------------------------
@@ -0,0 +1,333 @@
+# =============================================================================
+# NER BENCHMARK SUITE
+# -----------------------------------------------------------------------------
+# Measures the NER app's processing paths on reproducible corpora and writes
+# a JSON report that can be diffed between runs (or compared with --compare).
+#
+#   python ner_benchmark.py --sizes 1KB,100KB,1MB --output report.json
+#   python ner_benchmark.py --compare old_report.json --output new_report.json
+#
+# Corpora:
+# - "samples": the app's three sample texts
+# - synthetic corpora of a given size (1KB ... 50MB), built by shuffling the
+#   samples into ~1 KB documents with a fixed seed, so every run processes
+#   exactly the same text (its SHA-256 is recorded in the report)
+#
+# Paths:
+# - single:       one run_pipeline() call per document
+# - pipe:         all documents streamed through pipe_pipeline()
+# - multiprocess: process_corpus() with a pool of worker processes
+# - cached:       result-cache lookups after a warm-up pass
+#
+# Memory:
+# - process_peak_rss_mb: the benchmark process's RSS high-water mark so far.
+#   It never goes down, so it belongs to the whole run up to that row (the
+#   model, the corpora and every earlier path), not to the row's path.
+# - peak_traced_mb (with --trace-memory): the most memory the path itself
+#   had allocated at once, from tracemalloc started just before the path.
+#   Tracing slows allocation-heavy code down, so timings from a traced run
+#   shouldn't be compared with untraced ones.
+# =============================================================================
+import argparse
+import hashlib
+import json
+import math
+import os
+import platform
+import random
+import re
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import spacy
+
+from ner_cache import ResultCache, result_key
+from ner_corpus import process_corpus
+from ner_pipeline import (
+    DEFAULT_MODEL,
+    entity_records,
+    load_model,
+    pipe_pipeline,
+    registry,
+    run_pipeline,
+)
+from sample_texts import sample_texts
+
+DEFAULT_SIZES = "1KB,10KB,100KB,1MB,10MB,50MB"
+DEFAULT_PATHS = "single,pipe,multiprocess,cached"
+DOCUMENT_CHARS = 1000
+SIZE_UNITS = {"KB": 1000, "MB": 1000 ** 2}
+
+
+# =============================================================================
+# REPRODUCIBLE CORPORA
+# -----------------------------------------------------------------------------
+# parse_size("10MB") -> 10_000_000 characters.
+# synthetic_corpus() keeps appending a seeded-random sample text to the
+# current document until it reaches DOCUMENT_CHARS, then starts a new one,
+# until the corpus holds `total_chars` characters.
+# =============================================================================
+def parse_size(label):
+    match = re.fullmatch(r"(\d+)(KB|MB)", label.strip().upper())
+    if not match:
+        raise argparse.ArgumentTypeError(f"Invalid size {label!r}; use e.g. 500KB or 10MB")
+    return int(match.group(1)) * SIZE_UNITS[match.group(2)]
+
+
+def synthetic_corpus(total_chars, seed=0):
+    rng = random.Random(seed)
+    samples = list(sample_texts.values())
+    documents = []
+    current = []
+    current_chars = 0
+    produced = 0
+    while produced < total_chars:
+        sample = rng.choice(samples)[:total_chars - produced]
+        current.append(sample)
+        current_chars += len(sample) + 1
+        produced += len(sample) + 1
+        if current_chars >= DOCUMENT_CHARS:
+            documents.append(" ".join(current))
+            current = []
+            current_chars = 0
+    if current:
+        documents.append(" ".join(current))
+    return documents
+
+
+def corpus_fingerprint(documents):
+    digest = hashlib.sha256()
+    for document in documents:
+        digest.update(document.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+# =============================================================================
+# MEASUREMENT HELPERS
+# -----------------------------------------------------------------------------
+# - percentile: nearest-rank percentile of a list of latencies
+# - peak_rss_mb: the highest RSS this process (or the largest of its finished
+#   worker processes) has reached so far, from the resource module; None
+#   where it's unavailable
+# - traced_peak_mb: the tracemalloc peak since tracing started
+# =============================================================================
+def percentile(values, pct):
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+def peak_rss_mb(children=False):
+    try:
+        import resource
+    except ImportError:
+        return None
+    who = resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF
+    peak = resource.getrusage(who).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and in kilobytes on Linux
+    if sys.platform == "darwin":
+        return round(peak / (1024 * 1024), 1)
+    return round(peak / 1024, 1)
+
+
+def traced_peak_mb():
+    return round(tracemalloc.get_traced_memory()[1] / (1024 * 1024), 1)
+
+
+def summarize(path, documents, latencies, total_seconds, entities, children=False):
+    chars = sum(len(document) for document in documents)
+    return {
+        "path": path,
+        "docs": len(documents),
+        "chars": chars,
+        "entities": entities,
+        "total_seconds": round(total_seconds, 4),
+        "docs_per_sec": round(len(documents) / total_seconds, 2) if total_seconds else None,
+        "chars_per_sec": round(chars / total_seconds, 1) if total_seconds else None,
+        "p50_ms": None if not latencies else round(percentile(latencies, 50) * 1000, 3),
+        "p99_ms": None if not latencies else round(percentile(latencies, 99) * 1000, 3),
+        "process_peak_rss_mb": peak_rss_mb(),
+        "process_peak_worker_rss_mb": peak_rss_mb(children=True) if children else None,
+    }
+
+
+# =============================================================================
+# BENCHMARKED PATHS
+# -----------------------------------------------------------------------------
+# Each returns one result row. Per-document latency for the streaming paths
+# is the time between consecutive documents coming out of the stream.
+# =============================================================================
+def bench_single(nlp, documents):
+    latencies = []
+    entities = 0
+    start = time.perf_counter()
+    for document in documents:
+        doc_start = time.perf_counter()
+        entities += len(run_pipeline(nlp, document).ents)
+        latencies.append(time.perf_counter() - doc_start)
+    return summarize("single", documents, latencies, time.perf_counter() - start, entities)
+
+
+def bench_pipe(nlp, documents, batch_size):
+    latencies = []
+    entities = 0
+    start = last = time.perf_counter()
+    for doc in pipe_pipeline(nlp, documents, batch_size=batch_size):
+        entities += len(doc.ents)
+        now = time.perf_counter()
+        latencies.append(now - last)
+        last = now
+    return summarize("pipe", documents, latencies, time.perf_counter() - start, entities)
+
+
+def bench_multiprocess(model, documents, batch_size, n_process):
+    latencies = []
+    entities = 0
+    start = last = time.perf_counter()
+    named = ((str(index), document) for index, document in enumerate(documents))
+    for _, records in process_corpus(named, (), model, batch_size=batch_size, n_process=n_process):
+        entities += len(records)
+        now = time.perf_counter()
+        latencies.append(now - last)
+        last = now
+    row = summarize("multiprocess", documents, latencies, time.perf_counter() - start, entities, children=True)
+    row["n_process"] = n_process
+    return row
+
+
+def bench_cached(nlp, model, documents, batch_size):
+    cache = ResultCache(max_entries=len(documents) + 1)
+    keys = [result_key(document, (), model) for document in documents]
+    for key, doc in zip(keys, pipe_pipeline(nlp, documents, batch_size=batch_size)):
+        cache.put(key, entity_records(doc))
+
+    latencies = []
+    entities = 0
+    start = time.perf_counter()
+    for document in documents:
+        lookup_start = time.perf_counter()
+        # Includes hashing the text, as the app does on every run
+        entities += len(cache.get(result_key(document, (), model)))
+        latencies.append(time.perf_counter() - lookup_start)
+    return summarize("cached", documents, latencies, time.perf_counter() - start, entities)
+
+
+# =============================================================================
+# RUNNING THE SUITE
+# =============================================================================
+def run_benchmarks(model, sizes, paths, batch_size, n_process, seed, trace_memory=False):
+    # The registry records load time and RSS before/after for each model
+    nlp = load_model(model)
+    model_load = next(entry for entry in registry.stats() if entry["model"] == model)
+
+    corpora = [("samples", list(sample_texts.values()))]
+    corpora += [(label, synthetic_corpus(parse_size(label), seed)) for label in sizes]
+
+    # One untimed pass so lazy initialization doesn't count against the first path
+    run_pipeline(nlp, corpora[0][1][0])
+
+    results = []
+    for corpus_name, documents in corpora:
+        fingerprint = corpus_fingerprint(documents)
+        for path in paths:
+            if trace_memory:
+                tracemalloc.start()
+            if path == "single":
+                row = bench_single(nlp, documents)
+            elif path == "pipe":
+                row = bench_pipe(nlp, documents, batch_size)
+            elif path == "multiprocess":
+                row = bench_multiprocess(model, documents, batch_size, n_process)
+            elif path == "cached":
+                row = bench_cached(nlp, model, documents, batch_size)
+            else:
+                raise ValueError(f"Unknown benchmark path: {path}")
+            row["peak_traced_mb"] = None
+            if trace_memory:
+                row["peak_traced_mb"] = traced_peak_mb()
+                tracemalloc.stop()
+            row = {"corpus": corpus_name, "corpus_sha256": fingerprint, **row}
+            results.append(row)
+            memory = f", peak {row['peak_traced_mb']} MB" if trace_memory else ""
+            print(
+                f"{corpus_name:>8} {path:>12}: {row['docs_per_sec']} docs/s, p50 {row['p50_ms']} ms, "
+                f"p99 {row['p99_ms']} ms{memory}"
+            )
+
+    return {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "spacy": spacy.__version__,
+            "model": model,
+            "pipeline": nlp.pipe_names,
+            "seed": seed,
+            "batch_size": batch_size,
+            "n_process": n_process,
+            "trace_memory": trace_memory,
+        },
+        "model_load": model_load,
+        "results": results,
+    }
+
+
+# =============================================================================
+# COMPARING TWO REPORTS
+# -----------------------------------------------------------------------------
+# Prints docs/sec and p99 side by side for every (corpus, path) pair found
+# in both reports. A ratio above 1.0 means the new run is faster.
+# =============================================================================
+def compare_reports(old_report, new_report):
+    if old_report["meta"].get("trace_memory", False) != new_report["meta"].get("trace_memory", False):
+        print("Only one of the two reports traced memory, so its timings are slower than the other's.")
+    old_rows = {(row["corpus"], row["path"]): row for row in old_report["results"]}
+    print(f"{'corpus':>8} {'path':>12} {'old docs/s':>12} {'new docs/s':>12} {'ratio':>7} {'old p99':>9} {'new p99':>9}")
+    for row in new_report["results"]:
+        old = old_rows.get((row["corpus"], row["path"]))
+        if not old or not old["docs_per_sec"] or not row["docs_per_sec"]:
+            continue
+        if old["corpus_sha256"] != row["corpus_sha256"]:
+            print(f"{row['corpus']:>8} {row['path']:>12}  (corpus changed, skipped)")
+            continue
+        ratio = row["docs_per_sec"] / old["docs_per_sec"]
+        print(
+            f"{row['corpus']:>8} {row['path']:>12} {old['docs_per_sec']:>12} {row['docs_per_sec']:>12} "
+            f"{ratio:>7.2f} {old['p99_ms']:>9} {row['p99_ms']:>9}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the NER app's processing paths.")
+    parser.add_argument("--model", default=DEFAULT_MODEL)
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help=f"Synthetic corpus sizes (default: {DEFAULT_SIZES})")
+    parser.add_argument("--paths", default=DEFAULT_PATHS, help=f"Paths to run (default: {DEFAULT_PATHS})")
+    parser.add_argument("--batch-size", type=int, default=128)
+    parser.add_argument("--n-process", type=int, default=max(2, (os.cpu_count() or 2) // 2))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--trace-memory", action="store_true", help="Record each path's peak allocations with tracemalloc (slower)"
+    )
+    parser.add_argument("--output", default="ner_benchmark_report.json")
+    parser.add_argument("--compare", help="An earlier report to compare this run against")
+    args = parser.parse_args()
+
+    sizes = [size.strip() for size in args.sizes.split(",") if size.strip()]
+    for size in sizes:
+        parse_size(size)
+    paths = [path.strip() for path in args.paths.split(",") if path.strip()]
+
+    report = run_benchmarks(args.model, sizes, paths, args.batch_size, args.n_process, args.seed, args.trace_memory)
+    with open(args.output, "w", encoding="utf-8") as report_file:
+        json.dump(report, report_file, indent=2, sort_keys=True)
+    print(f"Report written to {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as old_file:
+            compare_reports(json.load(old_file), report)
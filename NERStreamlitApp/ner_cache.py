@@ -0,0 +1,150 @@
+# =============================================================================
+# NER RESULT CACHE
+# -----------------------------------------------------------------------------
+# Maps (text, custom rules, model, modes) to the entity records NER produced
+# for it, so clicking "Run NER" again on the same input returns instantly.
+# Two tiers:
+# - memory: a bounded LRU shared by every session in this process
+# - disk (optional): one small JSON file per result, which survives restarts
+# =============================================================================
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+from ner_pipeline import patterns_key
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".ner_cache")
+# Bump when the shape of an entity record changes, so old disk entries are ignored
+RECORD_FORMAT = "2"
+
+
+# =============================================================================
+# CACHE KEY
+# -----------------------------------------------------------------------------
+# The rules are reduced to their content hash first, so large rule sets don't
+# make every key expensive to build. Incremental runs are keyed apart from
+# whole-text runs: their entities come from paragraphs analyzed on their own,
+# which can differ from one pass over the whole text (e.g. at paragraph
+# breaks, or when the model uses context across paragraphs).
+# =============================================================================
+def result_key(text, patterns, model, ner_only=False, incremental=False):
+    digest = hashlib.sha256()
+    parts = (
+        RECORD_FORMAT,
+        model,
+        "ner-only" if ner_only else "full",
+        "incremental" if incremental else "whole",
+        patterns_key(list(patterns)),
+        text,
+    )
+    for part in parts:
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def _modified_time(path):
+    # Another process may delete the file between listdir() and this call
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return 0.0
+
+
+# =============================================================================
+# TWO-TIER RESULT CACHE
+# -----------------------------------------------------------------------------
+# get() checks memory first, then disk (promoting disk hits into memory).
+# put() always fills memory and, when the disk tier is enabled, writes the
+# records to disk as well. The disk tier keeps at most `max_disk_entries`
+# files and removes the oldest ones beyond that.
+# =============================================================================
+class ResultCache:
+    def __init__(self, max_entries=256, cache_dir=DEFAULT_CACHE_DIR, max_disk_entries=5000):
+        self.max_entries = max_entries
+        self.cache_dir = cache_dir
+        self.max_disk_entries = max_disk_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def _remember(self, key, records):
+        with self._lock:
+            self._entries[key] = records
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get(self, key, use_disk=False):
+        with self._lock:
+            records = self._entries.get(key)
+            if records is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return records
+
+        if use_disk:
+            try:
+                with open(self._path(key), encoding="utf-8") as cached_file:
+                    records = [tuple(record) for record in json.load(cached_file)["ents"]]
+            except (OSError, ValueError, KeyError):
+                records = None
+            if records is not None:
+                self._remember(key, records)
+                with self._lock:
+                    self.hits += 1
+                return records
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key, records, use_disk=False):
+        records = [tuple(record) for record in records]
+        self._remember(key, records)
+        if use_disk:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            # Write to a temp file first so a concurrent reader never sees half a file. The temp name is unique
+            # across threads and processes (several app or service processes can share the cache directory).
+            with tempfile.NamedTemporaryFile(
+                "w", encoding="utf-8", dir=self.cache_dir, prefix=f"{key}.", suffix=".tmp", delete=False
+            ) as cached_file:
+                json.dump({"ents": records}, cached_file, ensure_ascii=False)
+            os.replace(cached_file.name, self._path(key))
+            self._prune_disk()
+
+    def _prune_disk(self):
+        try:
+            names = [name for name in os.listdir(self.cache_dir) if name.endswith(".json")]
+        except OSError:
+            return
+        if len(names) <= self.max_disk_entries:
+            return
+        paths = sorted((os.path.join(self.cache_dir, name) for name in names), key=_modified_time)
+        for path in paths[:len(paths) - self.max_disk_entries]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def clear(self, include_disk=False):
+        with self._lock:
+            self._entries.clear()
+        if include_disk and os.path.isdir(self.cache_dir):
+            for name in os.listdir(self.cache_dir):
+                if name.endswith(".json"):
+                    os.remove(os.path.join(self.cache_dir, name))
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+result_cache = ResultCache()
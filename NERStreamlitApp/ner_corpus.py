@@ -0,0 +1,263 @@
+# =============================================================================
+# CORPUS (BATCH) NER
+# -----------------------------------------------------------------------------
+# Reads an uploaded corpus (loose .txt files, a .zip of .txt files, or JSONL)
+# as a stream of documents and runs NER over it in batches, optionally
+# spread across several worker processes.
+# =============================================================================
+import io
+import json
+import os
+import re
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+import spacy
+
+from ner_pipeline import (
+    DEFAULT_MODEL,
+    RULER_CACHE_DIR,
+    compile_ruler,
+    entity_records,
+    get_entity_ruler,
+    load_model,
+    ner_only_components,
+    pipe_pipeline,
+    sentence_count,
+)
+
+# Large single files are split into chunks of at most this many characters,
+# far below spaCy's default nlp.max_length of 1,000,000
+CHUNK_CHARS = 100_000
+READ_BLOCK_CHARS = 64 * 1024
+PARAGRAPH_BREAK = re.compile(r"\n[ \t\r]*\n")
+SENTENCE_END = re.compile(r"[.!?][\"')\]]*\s+")
+
+
+# =============================================================================
+# READING UPLOADED CORPUS FILES
+# -----------------------------------------------------------------------------
+# Each reader yields (document name, text) pairs one at a time, so a zip with
+# tens of thousands of members is never decoded all at once.
+# JSONL lines need a "text" field; "id" or "name" is used as the document
+# name when present.
+# =============================================================================
+def _is_text_member(name):
+    return name.lower().endswith(".txt") and not os.path.basename(name).startswith(".")
+
+
+def _read_zip(uploaded_file):
+    uploaded_file.seek(0)
+    with zipfile.ZipFile(uploaded_file) as archive:
+        for member in archive.namelist():
+            if _is_text_member(member):
+                yield member, archive.read(member).decode("utf-8", errors="replace")
+
+
+def _read_jsonl(uploaded_file):
+    uploaded_file.seek(0)
+    lines = io.TextIOWrapper(uploaded_file, encoding="utf-8", errors="replace")
+    try:
+        for line_number, line in enumerate(lines, start=1):
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            name = record.get("id", record.get("name", f"{uploaded_file.name}:{line_number}"))
+            yield str(name), record["text"]
+    finally:
+        # Detach so closing the wrapper doesn't close the uploaded file
+        lines.detach()
+
+
+def iter_corpus(uploaded_files):
+    for uploaded_file in uploaded_files:
+        lower_name = uploaded_file.name.lower()
+        if lower_name.endswith(".zip"):
+            yield from _read_zip(uploaded_file)
+        elif lower_name.endswith(".jsonl"):
+            yield from _read_jsonl(uploaded_file)
+        else:
+            uploaded_file.seek(0)
+            yield uploaded_file.name, uploaded_file.read().decode("utf-8", errors="replace")
+
+
+# =============================================================================
+# COUNTING DOCUMENTS
+# -----------------------------------------------------------------------------
+# A cheap pre-pass (zip directory listing, newline count) so the progress
+# bar knows how many documents to expect without decoding any of them.
+# =============================================================================
+def count_corpus_documents(uploaded_files):
+    total = 0
+    for uploaded_file in uploaded_files:
+        lower_name = uploaded_file.name.lower()
+        uploaded_file.seek(0)
+        if lower_name.endswith(".zip"):
+            with zipfile.ZipFile(uploaded_file) as archive:
+                total += sum(1 for member in archive.namelist() if _is_text_member(member))
+        elif lower_name.endswith(".jsonl"):
+            total += sum(1 for line in uploaded_file if line.strip())
+        else:
+            total += 1
+        uploaded_file.seek(0)
+    return total
+
+
+# =============================================================================
+# WORKER PROCESSES
+# -----------------------------------------------------------------------------
+# Each worker loads its own copy of the model once (in the pool initializer)
+# and compiles the custom rules against it the same way the app does, so
+# large phrase lists are only tokenized, never tagged or parsed. Only entity
+# tuples travel back to the app, never Doc objects.
+# =============================================================================
+_worker_nlp = None
+_worker_ruler = None
+_worker_components = None
+
+
+def _init_worker(model, patterns, ner_only=False):
+    global _worker_nlp, _worker_ruler, _worker_components
+    _worker_nlp = spacy.load(model)
+    _worker_ruler = compile_ruler(_worker_nlp, patterns, RULER_CACHE_DIR) if patterns else None
+    _worker_components = ner_only_components(_worker_nlp) if ner_only else None
+
+
+def _process_batch(texts, batch_size):
+    docs = pipe_pipeline(_worker_nlp, texts, _worker_ruler, batch_size, _worker_components)
+    return [entity_records(doc) for doc in docs]
+
+
+def _batches(documents, size):
+    documents = iter(documents)
+    while True:
+        batch = list(islice(documents, size))
+        if not batch:
+            return
+        yield batch
+
+
+# =============================================================================
+# RUN NER OVER A CORPUS
+# -----------------------------------------------------------------------------
+# Yields (document name, entity records) in corpus order.
+# - n_process == 1: streams through the shared in-process model
+# - n_process > 1: fans batches out to a process pool, keeping only a couple
+#   of batches per worker in flight so memory stays flat on huge corpora
+# =============================================================================
+def process_corpus(documents, patterns=(), model=DEFAULT_MODEL, batch_size=64, n_process=1, ner_only=False):
+    patterns = list(patterns)
+
+    if n_process <= 1:
+        nlp = load_model(model)
+        ruler = get_entity_ruler(patterns, model)
+        components = ner_only_components(nlp) if ner_only else None
+        for batch in _batches(documents, batch_size):
+            names = [name for name, _ in batch]
+            docs = pipe_pipeline(nlp, (text for _, text in batch), ruler, batch_size, components)
+            for name, doc in zip(names, docs):
+                yield name, entity_records(doc)
+        return
+
+    with ProcessPoolExecutor(
+        max_workers=n_process,
+        initializer=_init_worker,
+        initargs=(model, patterns, ner_only)
+    ) as pool:
+        pending = deque()
+        for batch in _batches(documents, batch_size):
+            names = [name for name, _ in batch]
+            texts = [text for _, text in batch]
+            pending.append((names, pool.submit(_process_batch, texts, batch_size)))
+            if len(pending) >= 2 * n_process:
+                names, future = pending.popleft()
+                yield from zip(names, future.result())
+        while pending:
+            names, future = pending.popleft()
+            yield from zip(names, future.result())
+
+
+# =============================================================================
+# CHUNKING A LARGE TEXT STREAM
+# -----------------------------------------------------------------------------
+# Reads a text stream block by block and yields (offset, chunk) pairs, where
+# offset is the chunk's character position in the whole file. Chunks end on
+# a paragraph break when possible, otherwise on a sentence end, otherwise on
+# whitespace, so entities are rarely cut in half. At most one chunk plus one
+# read block is held in memory, whatever the file size.
+# =============================================================================
+def _find_cut(text, limit):
+    window = text[:limit]
+
+    last_paragraph_break = None
+    for match in PARAGRAPH_BREAK.finditer(window):
+        last_paragraph_break = match.end()
+    if last_paragraph_break:
+        return last_paragraph_break
+
+    last_sentence_end = None
+    for match in SENTENCE_END.finditer(window):
+        last_sentence_end = match.end()
+    if last_sentence_end:
+        return last_sentence_end
+
+    whitespace = max(window.rfind(" "), window.rfind("\n"))
+    if whitespace > 0:
+        return whitespace + 1
+    return limit
+
+
+def iter_text_chunks(stream, max_chars=CHUNK_CHARS):
+    buffer = ""
+    offset = 0
+    while True:
+        block = stream.read(READ_BLOCK_CHARS)
+        if block:
+            buffer += block
+        while len(buffer) > max_chars or (not block and buffer):
+            cut = _find_cut(buffer, max_chars) if len(buffer) > max_chars else len(buffer)
+            yield offset, buffer[:cut]
+            offset += cut
+            buffer = buffer[cut:]
+        if not block:
+            return
+
+
+def open_uploaded_text(uploaded_file):
+    # newline="" keeps "\r\n" as two characters, so offsets match the file
+    uploaded_file.seek(0)
+    return io.TextIOWrapper(uploaded_file, encoding="utf-8", errors="replace", newline="")
+
+
+# =============================================================================
+# STREAMING NER OVER CHUNKS
+# -----------------------------------------------------------------------------
+# Runs the chunks through the pipeline a few at a time and yields
+# (offset, chunk text, entity records) with every entity's offsets shifted
+# back to positions in the original file (and sentence indices continuing
+# across chunks). Each Doc is dropped as soon as its
+# entities have been read.
+# =============================================================================
+def stream_chunk_entities(chunks, patterns=(), model=DEFAULT_MODEL, batch_size=4, ner_only=False):
+    nlp = load_model(model)
+    ruler = get_entity_ruler(list(patterns), model)
+    components = ner_only_components(nlp) if ner_only else None
+    offsets = deque()
+
+    def texts():
+        for offset, text in chunks:
+            offsets.append(offset)
+            yield text
+
+    # Sentence indices keep counting across chunks, like offsets do
+    sentences_so_far = 0
+    for doc in pipe_pipeline(nlp, texts(), ruler, batch_size, components):
+        offset = offsets.popleft()
+        records = [
+            (text, label, start + offset, end + offset, sentence)
+            for text, label, start, end, sentence in entity_records(doc, sentences_so_far)
+        ]
+        sentences_so_far += sentence_count(doc)
+        yield offset, doc.text, records
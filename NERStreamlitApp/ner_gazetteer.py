@@ -0,0 +1,202 @@
+# =============================================================================
+# GAZETTEER IMPORT
+# -----------------------------------------------------------------------------
+# Bulk-imports custom entity rules from an uploaded gazetteer and turns them
+# into the cheapest EntityRuler patterns that still match the same text:
+# - plain phrases become phrase patterns matched on LOWER (case-insensitive),
+#   which the PhraseMatcher looks up in a hash table in one pass per doc
+# - token patterns that only list exact words are rewritten as phrases too
+# - everything else stays a token pattern for the (slower) Matcher
+#
+# Accepted files:
+# - CSV with "label" and "pattern" (or "phrase") columns, or no header and
+#   label, phrase as the first two columns
+# - JSONL with {"label": ..., "pattern": ...} per line, where pattern is a
+#   phrase or a spaCy token pattern; "case_sensitive": true keeps a phrase
+#   matching exact case
+# =============================================================================
+import csv
+import io
+import json
+import time
+from itertools import chain
+
+from ner_pipeline import LOWER_ATTR, split_patterns
+
+PATTERN_COLUMNS = ("pattern", "phrase", "text")
+
+
+# =============================================================================
+# READING GAZETTEER FILES
+# -----------------------------------------------------------------------------
+# Both readers yield (label, pattern, case_sensitive) rows one at a time.
+# =============================================================================
+def _read_csv(uploaded_file):
+    uploaded_file.seek(0)
+    lines = io.TextIOWrapper(uploaded_file, encoding="utf-8-sig", errors="replace", newline="")
+    try:
+        reader = csv.reader(lines)
+        first = next(reader, None)
+        if first is None:
+            return
+        header = [cell.strip().lower() for cell in first]
+        if "label" in header:
+            label_column = header.index("label")
+            pattern_column = next((header.index(name) for name in PATTERN_COLUMNS if name in header), None)
+            if pattern_column is None:
+                pattern_column = 1 if label_column == 0 else 0
+            rows = reader
+        else:
+            label_column, pattern_column = 0, 1
+            rows = chain([first], reader)
+        for row in rows:
+            if len(row) > max(label_column, pattern_column):
+                yield row[label_column], row[pattern_column], False
+    finally:
+        # Detach so closing the wrapper doesn't close the uploaded file
+        lines.detach()
+
+
+def _read_jsonl(uploaded_file):
+    uploaded_file.seek(0)
+    lines = io.TextIOWrapper(uploaded_file, encoding="utf-8", errors="replace")
+    try:
+        for line_number, line in enumerate(lines, start=1):
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            # Malformed records are reported as ValueError, like malformed JSON
+            if not isinstance(record, dict):
+                raise ValueError(f"line {line_number}: expected a JSON object")
+            pattern = record.get("pattern")
+            if not isinstance(pattern, str) and not (
+                isinstance(pattern, list) and all(isinstance(token, dict) for token in pattern)
+            ):
+                raise ValueError(f"line {line_number}: \"pattern\" must be a phrase or a list of token objects")
+            yield record["label"], pattern, bool(record.get("case_sensitive", False))
+    finally:
+        lines.detach()
+
+
+def read_gazetteer(uploaded_file):
+    if uploaded_file.name.lower().endswith(".jsonl"):
+        return _read_jsonl(uploaded_file)
+    return _read_csv(uploaded_file)
+
+
+# =============================================================================
+# TOKEN PATTERNS THAT ARE REALLY PHRASES
+# -----------------------------------------------------------------------------
+# [{"LOWER": "new"}, {"LOWER": "york"}] matches exactly what the LOWER
+# phrase "new york" matches, provided the tokenizer splits the phrase into
+# those same tokens. Returns (phrase, attr) for such patterns, else None.
+# =============================================================================
+def _as_phrase(token_pattern, nlp):
+    if not token_pattern:
+        return None
+    attrs = set()
+    words = []
+    for token in token_pattern:
+        if not isinstance(token, dict) or len(token) != 1:
+            return None
+        attr, value = next(iter(token.items()))
+        attr = "ORTH" if attr.upper() == "TEXT" else attr.upper()
+        if attr not in ("ORTH", LOWER_ATTR) or not isinstance(value, str):
+            return None
+        attrs.add(attr)
+        words.append(value)
+    if len(attrs) != 1:
+        return None
+
+    attr = attrs.pop()
+    phrase = " ".join(words)
+    tokens = [token.lower_ if attr == LOWER_ATTR else token.text for token in nlp.make_doc(phrase)]
+    if tokens != words:
+        return None
+    return phrase, attr
+
+
+def _rule_key(pattern):
+    # Label is left out on purpose: the same phrase under two labels is a conflict
+    if isinstance(pattern["pattern"], str):
+        phrase = pattern["pattern"]
+        if pattern.get("attr") == LOWER_ATTR:
+            return "lower", phrase.lower()
+        return "exact", phrase
+    return "token", json.dumps(pattern["pattern"], sort_keys=True)
+
+
+# =============================================================================
+# BUILD DE-DUPLICATED PATTERNS
+# -----------------------------------------------------------------------------
+# Returns (new patterns, import statistics). Rows already covered by
+# `existing` rules are skipped, and when one phrase appears under several
+# labels the first label wins. Whitespace inside phrases is normalized, so
+# "New  York" and "New York" count as the same rule.
+# =============================================================================
+def build_gazetteer_patterns(rows, nlp, existing=()):
+    seen = {_rule_key(pattern): pattern["label"] for pattern in existing}
+    patterns = []
+    stats = {"rows": 0, "empty": 0, "duplicates": 0, "label_conflicts": 0, "converted_to_phrase": 0}
+
+    for label, pattern, case_sensitive in rows:
+        stats["rows"] += 1
+        label = str(label).strip()
+        if isinstance(pattern, str):
+            pattern = " ".join(pattern.split())
+        if not label or not pattern:
+            stats["empty"] += 1
+            continue
+
+        if isinstance(pattern, str):
+            rule = {"label": label, "pattern": pattern}
+            if not case_sensitive:
+                rule["attr"] = LOWER_ATTR
+        else:
+            rule = {"label": label, "pattern": pattern}
+            as_phrase = _as_phrase(pattern, nlp)
+            if as_phrase:
+                rule["pattern"] = as_phrase[0]
+                if as_phrase[1] == LOWER_ATTR:
+                    rule["attr"] = LOWER_ATTR
+                stats["converted_to_phrase"] += 1
+
+        key = _rule_key(rule)
+        if key in seen:
+            stats["duplicates"] += 1
+            if seen[key] != label:
+                stats["label_conflicts"] += 1
+            continue
+        seen[key] = label
+        patterns.append(rule)
+
+    exact, lower = split_patterns(patterns)
+    stats["phrase_lower"] = len(lower)
+    stats["phrase_exact"] = sum(1 for pattern in exact if isinstance(pattern["pattern"], str))
+    stats["token"] = len(exact) - stats["phrase_exact"]
+    return patterns, stats
+
+
+# =============================================================================
+# MATCH THROUGHPUT
+# -----------------------------------------------------------------------------
+# Times the compiled ruler alone (no tagger, parser or NER) over tokenized
+# texts, so the report shows what the rules themselves cost per document.
+# =============================================================================
+def ruler_throughput(nlp, ruler, texts, repeats=3):
+    texts = [text for text in texts if text]
+    chars = sum(len(text) for text in texts) * repeats
+    matches = 0
+    seconds = 0.0
+    for _ in range(repeats):
+        docs = [nlp.make_doc(text) for text in texts]
+        start = time.perf_counter()
+        docs = list(ruler.pipe(docs, batch_size=128))
+        seconds += time.perf_counter() - start
+        matches = sum(len(doc.ents) for doc in docs)
+    return {
+        "docs": len(texts),
+        "matches": matches,
+        "docs_per_sec": round(len(texts) * repeats / seconds, 1) if seconds else None,
+        "chars_per_sec": round(chars / seconds) if seconds else None,
+    }
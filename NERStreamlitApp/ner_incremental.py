@@ -0,0 +1,140 @@
+# =============================================================================
+# INCREMENTAL RE-ANALYSIS
+# -----------------------------------------------------------------------------
+# When a long text is edited and NER is run again, only the paragraphs that
+# actually changed go through the pipeline. The text is split into segments
+# at paragraph breaks (and very long paragraphs at sentence ends), each
+# segment's entities are cached under a hash of its content, and the cached
+# records are stitched back together with their offsets and sentence indices
+# shifted to the segment's position in the full text.
+#
+# Segment boundaries depend only on the text around them, so typing in one
+# paragraph leaves every other segment, and its cache entry, unchanged.
+# =============================================================================
+import hashlib
+import threading
+from collections import OrderedDict
+
+from ner_corpus import PARAGRAPH_BREAK, SENTENCE_END
+from ner_pipeline import DEFAULT_MODEL, entity_records, patterns_key, pipe_pipeline, sentence_count
+
+# Paragraphs longer than this are split further at sentence ends
+MAX_SEGMENT_CHARS = 5000
+
+
+# =============================================================================
+# SPLITTING THE TEXT INTO SEGMENTS
+# -----------------------------------------------------------------------------
+# Returns (offset, segment text) pairs that cover the whole text, in order.
+# Each paragraph break stays at the end of the segment before it.
+# =============================================================================
+def _split_at(text, pattern):
+    cuts = [match.end() for match in pattern.finditer(text) if match.end() < len(text)]
+    starts = [0] + cuts
+    ends = cuts + [len(text)]
+    return [(start, text[start:end]) for start, end in zip(starts, ends)]
+
+
+def split_segments(text, max_chars=MAX_SEGMENT_CHARS):
+    segments = []
+    for offset, paragraph in _split_at(text, PARAGRAPH_BREAK):
+        if len(paragraph) <= max_chars:
+            segments.append((offset, paragraph))
+        else:
+            segments.extend((offset + start, sentence) for start, sentence in _split_at(paragraph, SENTENCE_END))
+    return segments
+
+
+# =============================================================================
+# SEGMENT CACHE
+# -----------------------------------------------------------------------------
+# An LRU of (entity records, sentence count) per segment, with offsets and
+# sentence indices relative to the segment. Sized for tens of thousands of
+# paragraphs, since one long document alone can have thousands.
+# =============================================================================
+def segment_key(segment, rules_key, model, ner_only=False):
+    digest = hashlib.sha256()
+    for part in (model, "ner-only" if ner_only else "full", rules_key, segment):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class SegmentCache:
+    def __init__(self, max_entries=50_000):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key, records, sentences):
+        with self._lock:
+            self._entries[key] = (records, sentences)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+segment_cache = SegmentCache()
+
+
+# =============================================================================
+# INCREMENTAL NER
+# -----------------------------------------------------------------------------
+# Looks every segment up in the cache, runs only the missing ones through the
+# pipeline in one batch, then stitches all segments' records together.
+# Returns (entity records for the whole text, number of segments, number of
+# segments that had to be analyzed).
+# =============================================================================
+def incremental_entities(nlp, text, patterns=(), model=DEFAULT_MODEL, ruler=None, components=None, ner_only=False, batch_size=32):
+    rules_key = patterns_key(list(patterns))
+    segments = split_segments(text)
+    keys = [segment_key(segment, rules_key, model, ner_only) for _, segment in segments]
+
+    # Keep hits locally, so nothing can be evicted between lookup and stitching
+    results = {}
+    missing = []
+    for index, key in enumerate(keys):
+        if not segments[index][1].strip():
+            results[index] = ([], 0)
+            continue
+        cached = segment_cache.get(key)
+        if cached is None:
+            missing.append(index)
+        else:
+            results[index] = cached
+
+    docs = pipe_pipeline(nlp, (segments[index][1] for index in missing), ruler, batch_size, components)
+    for index, doc in zip(missing, docs):
+        results[index] = (entity_records(doc), sentence_count(doc))
+        segment_cache.put(keys[index], *results[index])
+
+    records = []
+    sentences_so_far = 0
+    for index, (offset, _) in enumerate(segments):
+        segment_records, sentences = results[index]
+        records.extend(
+            (entity_text, label, start + offset, end + offset, sentence + sentences_so_far if sentence >= 0 else sentence)
+            for entity_text, label, start, end, sentence in segment_records
+        )
+        sentences_so_far += sentences
+    return records, len(segments), len(missing)
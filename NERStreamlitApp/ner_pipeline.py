@@ -0,0 +1,489 @@
+# =============================================================================
+# NER PIPELINE HELPERS
+# -----------------------------------------------------------------------------
+# Shared spaCy plumbing for the NER app.
+# Everything in this module lives for the whole Python process, so every
+# Streamlit session (and every rerun of app.py) reuses the same objects
+# instead of rebuilding them on each click.
+# =============================================================================
+import hashlib
+import json
+from bisect import bisect_right
+import os
+import statistics
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+import spacy
+from spacy.pipeline import EntityRuler
+from spacy.tokens import Doc
+
+DEFAULT_MODEL = "en_core_web_sm"
+
+
+# =============================================================================
+# PROCESS MEMORY
+# -----------------------------------------------------------------------------
+# Reports the resident memory (RSS) of this process in MB.
+# Uses /proc on Linux and falls back to the peak RSS from the resource module
+# elsewhere. Returns None on platforms that offer neither (e.g. Windows).
+# =============================================================================
+def current_rss_mb():
+    try:
+        with open("/proc/self/statm") as statm:
+            resident_pages = int(statm.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, AttributeError):
+        pass
+
+    try:
+        import resource
+    except ImportError:
+        return None
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and in kilobytes on Linux
+    if sys.platform == "darwin":
+        return peak / (1024 * 1024)
+    return peak / 1024
+
+
+# =============================================================================
+# MODEL REGISTRY
+# -----------------------------------------------------------------------------
+# Loads each spaCy pipeline once per process and hands the same object to
+# every caller. A per-model lock makes sure two sessions clicking "Run NER"
+# at the same moment don't both deserialize the model, while lookups of an
+# already-loaded model never wait on a lock.
+# =============================================================================
+class ModelRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._load_locks = {}
+        self._models = {}
+        self._stats = {}
+
+    def get(self, name=DEFAULT_MODEL):
+        nlp = self._models.get(name)
+        if nlp is not None:
+            return nlp
+
+        with self._lock:
+            load_lock = self._load_locks.setdefault(name, threading.Lock())
+
+        with load_lock:
+            # Another session may have finished loading while we waited
+            if name not in self._models:
+                self._load(name)
+        return self._models[name]
+
+    def _load(self, name):
+        rss_before = current_rss_mb()
+        start = time.perf_counter()
+        nlp = spacy.load(name)
+        load_seconds = time.perf_counter() - start
+        rss_after = current_rss_mb()
+
+        with self._lock:
+            self._stats[name] = {
+                "model": name,
+                "pipeline": list(nlp.pipe_names),
+                "load_seconds": round(load_seconds, 3),
+                "rss_before_mb": None if rss_before is None else round(rss_before, 1),
+                "rss_after_mb": None if rss_after is None else round(rss_after, 1),
+                "rss_delta_mb": None if rss_before is None or rss_after is None else round(rss_after - rss_before, 1),
+            }
+            self._models[name] = nlp
+
+    def is_loaded(self, name=DEFAULT_MODEL):
+        return name in self._models
+
+    def stats(self):
+        with self._lock:
+            return [dict(entry) for entry in self._stats.values()]
+
+
+# One registry for the whole process
+registry = ModelRegistry()
+
+
+# =============================================================================
+# SPA-CY MODEL LOADER
+# -----------------------------------------------------------------------------
+# Returns the shared, already-loaded pipeline for the given model name.
+# The first call in a process pays the load cost; every later call is a
+# dictionary lookup.
+# =============================================================================
+def load_model(name=DEFAULT_MODEL):
+    return registry.get(name)
+
+
+# =============================================================================
+# PATTERN SET FINGERPRINT
+# -----------------------------------------------------------------------------
+# A content hash of a list of EntityRuler patterns. Two sessions with the same
+# rules (in the same order) get the same key, so they share a compiled ruler.
+# =============================================================================
+def patterns_key(patterns):
+    payload = json.dumps(patterns, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+# =============================================================================
+# CASE-INSENSITIVE PHRASE PATTERNS
+# -----------------------------------------------------------------------------
+# Rules typed into the app match case-sensitively, as before. Phrase patterns
+# carrying "attr": "LOWER" (e.g. from a gazetteer import) match regardless
+# of case, which needs a second ruler whose PhraseMatcher compares LOWER.
+# split_patterns() separates the two groups and drops the extra key, since
+# EntityRuler itself only knows "label", "pattern" and "id".
+# =============================================================================
+LOWER_ATTR = "LOWER"
+
+
+def split_patterns(patterns):
+    exact = []
+    lower = []
+    for pattern in patterns:
+        if pattern.get("attr") == LOWER_ATTR and isinstance(pattern["pattern"], str):
+            lower.append({key: value for key, value in pattern.items() if key != "attr"})
+        else:
+            exact.append(pattern)
+    return exact, lower
+
+
+# =============================================================================
+# RULER CHAIN
+# -----------------------------------------------------------------------------
+# Applies several rulers one after another, with the same __call__/pipe
+# interface as a single EntityRuler. Rulers don't overwrite entities set by
+# an earlier one, so the case-sensitive rules win where both match.
+# =============================================================================
+class RulerChain:
+    def __init__(self, rulers):
+        self.rulers = rulers
+
+    def __call__(self, doc):
+        for ruler in self.rulers:
+            doc = ruler(doc)
+        return doc
+
+    def pipe(self, docs, batch_size=128):
+        for ruler in self.rulers:
+            docs = ruler.pipe(docs, batch_size=batch_size)
+        return docs
+
+    def __len__(self):
+        return sum(len(ruler) for ruler in self.rulers)
+
+
+# =============================================================================
+# ON-DISK PHRASE CACHE
+# -----------------------------------------------------------------------------
+# Compiling a large rule set is dominated by tokenizing its phrases. The
+# tokenized phrases (words and trailing spaces) of big rule sets are saved
+# under .ner_cache/rulers/, keyed by the phrases themselves, the model and
+# the spaCy version, so a freshly started process rebuilds the PhraseMatcher
+# from them without running the tokenizer again. Small rule sets compile
+# faster than the file can be read, so they are never written.
+# =============================================================================
+RULER_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".ner_cache", "rulers")
+DISK_RULER_MIN_PHRASES = 1000
+MAX_DISK_RULERS = 64
+
+
+def _phrase_cache_path(nlp, texts, cache_dir):
+    digest = hashlib.sha256()
+    for part in (spacy.__version__, nlp.lang, nlp.meta.get("name", ""), nlp.meta.get("version", ""), patterns_key(texts)):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return os.path.join(cache_dir, f"{digest.hexdigest()}.json")
+
+
+def _read_phrase_cache(vocab, path, expected):
+    try:
+        with open(path, encoding="utf-8") as cache_file:
+            cached = json.load(cache_file)
+    except (OSError, ValueError):
+        return None
+    lengths = cached.get("lengths", [])
+    if len(lengths) != expected:
+        return None
+    docs = []
+    position = 0
+    for length in lengths:
+        words = cached["words"][position:position + length]
+        spaces = [flag == "1" for flag in cached["spaces"][position:position + length]]
+        docs.append(Doc(vocab, words=words, spaces=spaces))
+        position += length
+    return docs
+
+
+def _write_phrase_cache(docs, path):
+    cached = {
+        "lengths": [len(doc) for doc in docs],
+        "words": [token.text for doc in docs for token in doc],
+        "spaces": "".join("1" if token.whitespace_ else "0" for doc in docs for token in doc),
+    }
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # Write to a temp file first so a concurrent reader never sees half a file
+    temp_path = path + f".{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as cache_file:
+        json.dump(cached, cache_file, ensure_ascii=False)
+    os.replace(temp_path, path)
+
+    cache_dir = os.path.dirname(path)
+    names = [name for name in os.listdir(cache_dir) if name.endswith(".json")]
+    if len(names) > MAX_DISK_RULERS:
+        paths = sorted((os.path.join(cache_dir, name) for name in names), key=os.path.getmtime)
+        for old_path in paths[:len(paths) - MAX_DISK_RULERS]:
+            try:
+                os.remove(old_path)
+            except OSError:
+                pass
+
+
+def _phrase_docs(nlp, texts, cache_dir=None):
+    if cache_dir is None or len(texts) < DISK_RULER_MIN_PHRASES:
+        return list(nlp.tokenizer.pipe(texts))
+    path = _phrase_cache_path(nlp, texts, cache_dir)
+    docs = _read_phrase_cache(nlp.vocab, path, len(texts))
+    if docs is None:
+        docs = list(nlp.tokenizer.pipe(texts))
+        try:
+            _write_phrase_cache(docs, path)
+        except OSError:
+            pass
+    return docs
+
+
+# =============================================================================
+# COMPILE A STANDALONE ENTITY RULER
+# -----------------------------------------------------------------------------
+# Builds an EntityRuler that is NOT part of the shared pipeline.
+# Phrase patterns only need tokenizing, so the ruler is attached to a blank
+# pipeline that shares the model's vocab and tokenizer. This keeps pattern
+# compilation from running the tagger/parser and from touching `nlp` itself.
+# Phrases are tokenized in one pass (or read from the phrase cache) and added
+# to the PhraseMatcher one label at a time; token patterns and patterns with
+# an "id" go through add_patterns() as usual.
+# When some patterns are case-insensitive, returns a RulerChain of a
+# case-sensitive ruler and a LOWER one.
+# =============================================================================
+def _is_plain_phrase(pattern):
+    return isinstance(pattern["pattern"], str) and "id" not in pattern
+
+
+def _build_ruler(tokenizer_only, name, patterns, phrase_docs, attr="ORTH"):
+    ruler = EntityRuler(tokenizer_only, name=name, phrase_matcher_attr=attr)
+    ruler.add_patterns([pattern for pattern in patterns if not _is_plain_phrase(pattern)])
+
+    docs_by_label = {}
+    for pattern in patterns:
+        if _is_plain_phrase(pattern):
+            docs_by_label.setdefault(pattern["label"], []).append(phrase_docs[pattern["pattern"]])
+    for label, docs in docs_by_label.items():
+        ruler.phrase_patterns[label].extend(docs)
+        ruler.phrase_matcher.add(label, docs)
+    return ruler
+
+
+def compile_ruler(nlp, patterns, cache_dir=None):
+    tokenizer_only = spacy.blank(nlp.lang, vocab=nlp.vocab)
+    tokenizer_only.tokenizer = nlp.tokenizer
+
+    texts = list(dict.fromkeys(pattern["pattern"] for pattern in patterns if _is_plain_phrase(pattern)))
+    phrase_docs = dict(zip(texts, _phrase_docs(nlp, texts, cache_dir)))
+
+    exact, lower = split_patterns(patterns)
+    rulers = []
+    if exact or not lower:
+        rulers.append(_build_ruler(tokenizer_only, "entity_ruler", exact, phrase_docs))
+    if lower:
+        rulers.append(_build_ruler(tokenizer_only, "entity_ruler_lower", lower, phrase_docs, LOWER_ATTR))
+    return rulers[0] if len(rulers) == 1 else RulerChain(rulers)
+
+
+# =============================================================================
+# COMPILED RULER CACHE
+# -----------------------------------------------------------------------------
+# Keeps the most recently used compiled rulers, keyed by model name and the
+# content hash of the pattern set, and evicts the least recently used one
+# once `max_size` is reached. Compilation happens outside the lock, so a big
+# rule set being compiled never blocks sessions whose ruler is already cached.
+# Large rule sets also use the on-disk phrase cache in `cache_dir`.
+# =============================================================================
+class RulerCache:
+    def __init__(self, max_size=32, cache_dir=RULER_CACHE_DIR):
+        self.max_size = max_size
+        self.cache_dir = cache_dir
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._rulers = OrderedDict()
+
+    def get(self, patterns, model=DEFAULT_MODEL):
+        key = (model, patterns_key(patterns))
+        with self._lock:
+            ruler = self._rulers.get(key)
+            if ruler is not None:
+                self._rulers.move_to_end(key)
+                self.hits += 1
+                return ruler
+            self.misses += 1
+
+        ruler = compile_ruler(registry.get(model), patterns, self.cache_dir)
+
+        with self._lock:
+            self._rulers[key] = ruler
+            self._rulers.move_to_end(key)
+            while len(self._rulers) > self.max_size:
+                self._rulers.popitem(last=False)
+        return ruler
+
+    def stats(self):
+        with self._lock:
+            return {"cached_rulers": len(self._rulers), "hits": self.hits, "misses": self.misses}
+
+
+ruler_cache = RulerCache()
+
+
+# =============================================================================
+# GET THE RULER FOR A SET OF CUSTOM RULES
+# -----------------------------------------------------------------------------
+# Returns the compiled ruler for the given patterns, or None when there are
+# no custom rules.
+# =============================================================================
+def get_entity_ruler(patterns, model=DEFAULT_MODEL):
+    if not patterns:
+        return None
+    return ruler_cache.get(patterns, model)
+
+
+# =============================================================================
+# NER-ONLY COMPONENTS
+# -----------------------------------------------------------------------------
+# The app only reads doc.ents, so the "fast mode" runs just "ner" plus any
+# shared embedding layer (e.g. tok2vec) that "ner" listens to. Tagger,
+# parser, attribute_ruler and lemmatizer are skipped.
+# =============================================================================
+def ner_only_components(nlp):
+    needed = {"ner"}
+    for name, proc in nlp.pipeline:
+        if "ner" in (getattr(proc, "listening_components", None) or []):
+            needed.add(name)
+    return [name for name in nlp.pipe_names if name in needed]
+
+
+def _active_pipeline(nlp, components):
+    if components is None:
+        return nlp.pipeline
+    return [(name, proc) for name, proc in nlp.pipeline if name in components]
+
+
+# =============================================================================
+# RUN THE PIPELINE WITH AN OPTIONAL RULER
+# -----------------------------------------------------------------------------
+# Runs each component of the shared pipeline by hand and slots the ruler in
+# right before "ner", which is where the app used to add it with add_pipe.
+# The shared pipeline is never modified, so concurrent sessions with
+# different rules can use the same `nlp` safely.
+# Pass `components` (e.g. from ner_only_components) to run only those.
+# Pass a `timings` dict to have the seconds spent in each step (tokenizer,
+# every component and "entity_ruler") added to it.
+# =============================================================================
+def _pipeline_steps(nlp, ruler=None, components=None):
+    steps = []
+    for name, proc in _active_pipeline(nlp, components):
+        if name == "ner" and ruler is not None:
+            steps.append(("entity_ruler", ruler))
+            ruler = None
+        steps.append((name, proc))
+    if ruler is not None:
+        steps.append(("entity_ruler", ruler))
+    return steps
+
+
+def run_pipeline(nlp, text, ruler=None, components=None, timings=None):
+    if timings is None:
+        doc = nlp.make_doc(text)
+        for _, proc in _pipeline_steps(nlp, ruler, components):
+            doc = proc(doc)
+        return doc
+
+    start = time.perf_counter()
+    doc = nlp.make_doc(text)
+    timings["tokenizer"] = timings.get("tokenizer", 0.0) + time.perf_counter() - start
+    for name, proc in _pipeline_steps(nlp, ruler, components):
+        start = time.perf_counter()
+        doc = proc(doc)
+        timings[name] = timings.get(name, 0.0) + time.perf_counter() - start
+    return doc
+
+
+# =============================================================================
+# LATENCY MEASUREMENT
+# -----------------------------------------------------------------------------
+# Median wall-clock time of `repeats` runs of run_pipeline(), in seconds.
+# Used for the full-pipeline vs. NER-only comparison in the app.
+# =============================================================================
+def time_pipeline(nlp, text, ruler=None, components=None, repeats=3):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        run_pipeline(nlp, text, ruler, components)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+# =============================================================================
+# STREAM MANY TEXTS THROUGH THE PIPELINE
+# -----------------------------------------------------------------------------
+# The batched counterpart of run_pipeline(): chains each component's .pipe()
+# (exactly what nlp.pipe does internally) with the ruler in front of "ner".
+# Docs are produced lazily, so callers can consume a corpus as a stream.
+# =============================================================================
+def _pipe_component(proc, docs, batch_size):
+    if hasattr(proc, "pipe"):
+        return proc.pipe(docs, batch_size=batch_size)
+    return (proc(doc) for doc in docs)
+
+
+def pipe_pipeline(nlp, texts, ruler=None, batch_size=64, components=None):
+    docs = (nlp.make_doc(text) for text in texts)
+    for _, proc in _pipeline_steps(nlp, ruler, components):
+        docs = _pipe_component(proc, docs, batch_size)
+    return docs
+
+
+# =============================================================================
+# ENTITY RECORDS
+# -----------------------------------------------------------------------------
+# Plain (text, label, start_char, end_char, sentence) tuples for each entity
+# in a doc. They are small and picklable, so they can leave worker processes
+# and be kept for thousands of documents without holding on to the Docs.
+# `sentence` is the index of the sentence the entity starts in (shifted by
+# `sentence_offset`), or -1 when the doc has no sentence boundaries, e.g.
+# in NER-only mode where the parser doesn't run.
+# =============================================================================
+ENTITY_COLUMNS = ["text", "label", "start", "end", "sentence"]
+
+
+def entity_records(doc, sentence_offset=0):
+    if not doc.has_annotation("SENT_START"):
+        return [(ent.text, ent.label_, ent.start_char, ent.end_char, -1) for ent in doc.ents]
+
+    sentence_starts = [sent.start for sent in doc.sents]
+    return [
+        (ent.text, ent.label_, ent.start_char, ent.end_char, sentence_offset + bisect_right(sentence_starts, ent.start) - 1)
+        for ent in doc.ents
+    ]
+
+
+def sentence_count(doc):
+    if not doc.has_annotation("SENT_START"):
+        return 0
+    return sum(1 for _ in doc.sents)
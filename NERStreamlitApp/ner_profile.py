@@ -0,0 +1,86 @@
+# =============================================================================
+# PIPELINE AND RENDERING PROFILES
+# -----------------------------------------------------------------------------
+# One profile is recorded per "Run NER" click while profiling is on:
+#
+#   {"timestamp": ..., "chars": ..., "entities": ..., "mode": ...,
+#    "pipeline": {"tokenizer": s, "tok2vec": s, ..., "entity_ruler": s, "ner": s},
+#    "render": {"entity table": s, "entity list": s, "statistics": s, "displacy": s}}
+#
+# profile_summary() aggregates any number of them into one breakdown table,
+# so the slowest step across runs stands out.
+# =============================================================================
+import json
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+import pandas as pd
+
+STAGES = ("pipeline", "render")
+
+
+def new_profile(text, mode):
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "chars": len(text),
+        "entities": 0,
+        "mode": mode,
+        "pipeline": {},
+        "render": {},
+    }
+
+
+# =============================================================================
+# TIMING A STEP
+# -----------------------------------------------------------------------------
+# `with timed(profile, "render", "statistics"): ...` adds the block's
+# duration to that step. With profile=None it does nothing, so call sites
+# don't need an "if profiling" branch.
+# =============================================================================
+@contextmanager
+def timed(profile, stage, step):
+    if profile is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile[stage][step] = profile[stage].get(step, 0.0) + time.perf_counter() - start
+
+
+# =============================================================================
+# AGGREGATING PROFILES
+# -----------------------------------------------------------------------------
+# One row per (stage, step) with its mean, median, max and total time over
+# all runs, and its share of the total time, slowest total first.
+# =============================================================================
+def profile_summary(runs):
+    rows = [
+        (stage, step, seconds * 1000)
+        for run in runs
+        for stage in STAGES
+        for step, seconds in run[stage].items()
+    ]
+    frame = pd.DataFrame(rows, columns=["Stage", "Step", "ms"])
+    if frame.empty:
+        return pd.DataFrame(columns=["Stage", "Step", "Runs", "Mean ms", "Median ms", "Max ms", "Total ms", "Share %"])
+
+    grouped = frame.groupby(["Stage", "Step"], sort=False)["ms"]
+    summary = pd.DataFrame({
+        "Runs": grouped.size(),
+        "Mean ms": grouped.mean(),
+        "Median ms": grouped.median(),
+        "Max ms": grouped.max(),
+        "Total ms": grouped.sum(),
+    }).reset_index()
+    summary["Share %"] = 100 * summary["Total ms"] / summary["Total ms"].sum()
+    summary = summary.sort_values("Total ms", ascending=False, kind="stable").reset_index(drop=True)
+    return summary.round({"Mean ms": 2, "Median ms": 2, "Max ms": 2, "Total ms": 2, "Share %": 1})
+
+
+def profile_json(runs):
+    # to_json turns NumPy numbers into plain JSON numbers
+    report = {"runs": runs, "summary": json.loads(profile_summary(runs).to_json(orient="records"))}
+    return json.dumps(report, indent=2).encode("utf-8")
@@ -0,0 +1,74 @@
+# =============================================================================
+# NER RESULT RENDERING
+# -----------------------------------------------------------------------------
+# Builds the app's visual output from plain entity records
+# (text, label, start_char, end_char, sentence) instead of from a spaCy Doc, so cached
+# results can be displayed without running the model again.
+# =============================================================================
+import io
+from bisect import bisect_left, bisect_right
+
+from spacy import displacy
+
+from ner_corpus import iter_text_chunks
+
+DEFAULT_PAGE_CHARS = 5000
+
+
+# =============================================================================
+# HIGHLIGHTED TEXT
+# -----------------------------------------------------------------------------
+# displaCy's "manual" mode takes the raw text plus character spans and
+# produces the same highlighted HTML as rendering a Doc.
+# =============================================================================
+def render_entities_html(text, records):
+    parsed = {
+        "text": text,
+        "ents": [{"start": start, "end": end, "label": label} for _, label, start, end, _ in records],
+        "title": None,
+    }
+    return displacy.render(parsed, style="ent", manual=True, jupyter=False)
+
+
+# =============================================================================
+# PAGE BOUNDARIES
+# -----------------------------------------------------------------------------
+# Splits the text into pages of roughly `page_chars` characters, ending on a
+# paragraph break or sentence end where possible (the same rules as the
+# streaming chunker). A page boundary that would cut an entity in half is
+# moved to the end of that entity. Returns a list of (start, end) offsets.
+# `records` must be sorted by start offset, which doc.ents always is.
+# =============================================================================
+def page_bounds(text, records, page_chars=DEFAULT_PAGE_CHARS):
+    starts = [record[2] for record in records]
+    bounds = []
+    page_start = 0
+    for offset, chunk in iter_text_chunks(io.StringIO(text), page_chars):
+        page_end = offset + len(chunk)
+        if page_end <= page_start:
+            continue
+        # The last entity starting before the boundary may run across it
+        index = bisect_left(starts, page_end) - 1
+        if index >= 0 and records[index][3] > page_end:
+            page_end = records[index][3]
+        bounds.append((page_start, page_end))
+        page_start = page_end
+    return bounds or [(0, len(text))]
+
+
+# =============================================================================
+# ONE PAGE OF HIGHLIGHTED TEXT
+# -----------------------------------------------------------------------------
+# Renders only the slice text[start:end] and the entities inside it, so the
+# HTML sent to the browser stays the size of one page.
+# =============================================================================
+def render_page_html(text, records, start, end):
+    starts = [record[2] for record in records]
+    first = bisect_left(starts, start)
+    last = bisect_right(starts, end - 1)
+    page_records = [
+        (ent_text, label, ent_start - start, ent_end - start, sentence)
+        for ent_text, label, ent_start, ent_end, sentence in records[first:last]
+        if ent_end <= end
+    ]
+    return render_entities_html(text[start:end], page_records)
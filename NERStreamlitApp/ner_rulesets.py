@@ -0,0 +1,149 @@
+# =============================================================================
+# SAVED RULE SETS
+# -----------------------------------------------------------------------------
+# A small SQLite store for custom entity rules, so a rule set survives the
+# session and can be loaded again by name (by anyone using the same app
+# folder). Every save of a name adds a new numbered version; loading without
+# a version returns the latest one.
+#
+# Tables:
+# - rule_sets: one row per (name, version) with its rule count and the
+#   content hash of its patterns
+# - rules: the patterns themselves, in their original order, indexed by
+#   (rule set, label) so one label's rules can be counted or loaded alone
+# =============================================================================
+import json
+import os
+import sqlite3
+from contextlib import closing
+from datetime import datetime, timezone
+
+from ner_pipeline import patterns_key
+
+DEFAULT_RULESET_DB = os.path.join(os.path.dirname(os.path.abspath(__file__)), "rule_sets.sqlite3")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS rule_sets (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    patterns_key TEXT NOT NULL,
+    rule_count INTEGER NOT NULL,
+    created_at TEXT NOT NULL,
+    UNIQUE (name, version)
+);
+CREATE TABLE IF NOT EXISTS rules (
+    rule_set_id INTEGER NOT NULL REFERENCES rule_sets (id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    label TEXT NOT NULL,
+    pattern TEXT NOT NULL,
+    PRIMARY KEY (rule_set_id, position)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS rules_by_label ON rules (rule_set_id, label);
+"""
+
+
+# =============================================================================
+# RULE SET STORE
+# -----------------------------------------------------------------------------
+# Opens a short-lived connection per call, since Streamlit runs every session
+# on its own thread and a sqlite3 connection can't be shared across threads.
+# Each rule is stored as its label plus the rest of the pattern dict as JSON,
+# so token patterns and case-insensitive phrases round-trip unchanged.
+# =============================================================================
+class RuleSetStore:
+    def __init__(self, path=DEFAULT_RULESET_DB):
+        self.path = path
+        with closing(self._connect()) as connection:
+            connection.executescript(SCHEMA)
+
+    def _connect(self):
+        connection = sqlite3.connect(self.path, timeout=30)
+        connection.execute("PRAGMA foreign_keys = ON")
+        return connection
+
+    def _rule_set_id(self, connection, name, version=None):
+        if version is None:
+            row = connection.execute(
+                "SELECT id, version FROM rule_sets WHERE name = ? ORDER BY version DESC LIMIT 1", (name,)
+            ).fetchone()
+        else:
+            row = connection.execute(
+                "SELECT id, version FROM rule_sets WHERE name = ? AND version = ?", (name, version)
+            ).fetchone()
+        if row is None:
+            raise KeyError(f"No saved rule set {name!r}" + ("" if version is None else f" version {version}"))
+        return row
+
+    def save(self, name, patterns):
+        # Returns the version number; saving unchanged rules doesn't add a version
+        key = patterns_key(patterns)
+        with closing(self._connect()) as connection, connection:
+            latest = connection.execute(
+                "SELECT version, patterns_key FROM rule_sets WHERE name = ? ORDER BY version DESC LIMIT 1", (name,)
+            ).fetchone()
+            if latest is not None and latest[1] == key:
+                return latest[0]
+
+            version = 1 if latest is None else latest[0] + 1
+            cursor = connection.execute(
+                "INSERT INTO rule_sets (name, version, patterns_key, rule_count, created_at) VALUES (?, ?, ?, ?, ?)",
+                (name, version, key, len(patterns), datetime.now(timezone.utc).isoformat(timespec="seconds"))
+            )
+            rule_set_id = cursor.lastrowid
+            connection.executemany(
+                "INSERT INTO rules (rule_set_id, position, label, pattern) VALUES (?, ?, ?, ?)",
+                (
+                    (rule_set_id, position, pattern["label"], json.dumps(
+                        {field: value for field, value in pattern.items() if field != "label"}, ensure_ascii=False
+                    ))
+                    for position, pattern in enumerate(patterns)
+                )
+            )
+        return version
+
+    def load(self, name, version=None, labels=None):
+        with closing(self._connect()) as connection:
+            rule_set_id, _ = self._rule_set_id(connection, name, version)
+            if labels:
+                placeholders = ", ".join("?" for _ in labels)
+                rows = connection.execute(
+                    f"SELECT label, pattern FROM rules WHERE rule_set_id = ? AND label IN ({placeholders}) ORDER BY position",
+                    (rule_set_id, *labels)
+                )
+            else:
+                rows = connection.execute(
+                    "SELECT label, pattern FROM rules WHERE rule_set_id = ? ORDER BY position", (rule_set_id,)
+                )
+            return [{"label": label, **json.loads(pattern)} for label, pattern in rows]
+
+    def label_counts(self, name, version=None):
+        with closing(self._connect()) as connection:
+            rule_set_id, _ = self._rule_set_id(connection, name, version)
+            rows = connection.execute(
+                "SELECT label, COUNT(*) FROM rules WHERE rule_set_id = ? GROUP BY label ORDER BY COUNT(*) DESC, label",
+                (rule_set_id,)
+            )
+            return dict(rows.fetchall())
+
+    def names(self):
+        # [(name, latest version, rule count of that version), ...]
+        with closing(self._connect()) as connection:
+            return connection.execute(
+                "SELECT name, version, rule_count FROM rule_sets AS outer_set "
+                "WHERE version = (SELECT MAX(version) FROM rule_sets WHERE name = outer_set.name) ORDER BY name"
+            ).fetchall()
+
+    def versions(self, name):
+        # [(version, rule count, created_at), ...], newest first
+        with closing(self._connect()) as connection:
+            return connection.execute(
+                "SELECT version, rule_count, created_at FROM rule_sets WHERE name = ? ORDER BY version DESC", (name,)
+            ).fetchall()
+
+    def delete(self, name, version=None):
+        with closing(self._connect()) as connection, connection:
+            if version is None:
+                connection.execute("DELETE FROM rule_sets WHERE name = ?", (name,))
+            else:
+                connection.execute("DELETE FROM rule_sets WHERE name = ? AND version = ?", (name, version))
@@ -0,0 +1,228 @@
+# =============================================================================
+# ENTITY SEARCH INDEX
+# -----------------------------------------------------------------------------
+# An inverted index over every document the app has processed, persisted in
+# a local SQLite database:
+#
+#   entity text -> label -> postings (document, start, end, sentence)
+#
+# Tables:
+# - documents: one row per indexed document (re-indexing a name replaces it)
+# - entities: one row per distinct (text, label), with its lowercased text
+#   for prefix search and running mention/document counts
+# - mentions: the postings, clustered by entity so one entity's mentions
+#   are read from one contiguous range of the table
+#
+# Prefix search is a range scan on the lowercased-text index, and results are
+# ranked by the stored counts, so lookups never count mentions at query time.
+# =============================================================================
+import os
+import sqlite3
+from collections import Counter
+from contextlib import closing
+from datetime import datetime, timezone
+from itertools import islice
+
+DEFAULT_INDEX_DB = os.path.join(os.path.dirname(os.path.abspath(__file__)), "entity_index.sqlite3")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    source TEXT NOT NULL,
+    entity_count INTEGER NOT NULL,
+    indexed_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS entities (
+    id INTEGER PRIMARY KEY,
+    text TEXT NOT NULL,
+    text_lower TEXT NOT NULL,
+    label TEXT NOT NULL,
+    mention_count INTEGER NOT NULL DEFAULT 0,
+    document_count INTEGER NOT NULL DEFAULT 0,
+    UNIQUE (text, label)
+);
+-- Covers every column search() reads, so prefix scans never touch the table
+CREATE INDEX IF NOT EXISTS entities_by_prefix ON entities (text_lower, label, mention_count, document_count, text);
+CREATE INDEX IF NOT EXISTS entities_by_frequency ON entities (mention_count);
+CREATE INDEX IF NOT EXISTS entities_by_label ON entities (label, mention_count);
+CREATE TABLE IF NOT EXISTS mentions (
+    entity_id INTEGER NOT NULL,
+    document_id INTEGER NOT NULL,
+    start_char INTEGER NOT NULL,
+    end_char INTEGER NOT NULL,
+    sentence INTEGER NOT NULL,
+    PRIMARY KEY (entity_id, document_id, start_char)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS mentions_by_document ON mentions (document_id);
+"""
+
+# Sorts after every character, so [prefix, prefix + PREFIX_END) is a range
+PREFIX_END = "\U0010ffff"
+
+
+def normalize_entity_text(text):
+    return " ".join(text.lower().split())
+
+
+def text_document_name(session_id):
+    # Typed or pasted text has no file name. Each session indexes it as one
+    # document that every run replaces, so editing the text and running NER
+    # again never leaves the older versions in the index
+    return f"Text input {session_id}"
+
+
+def _batches(items, size):
+    items = iter(items)
+    while True:
+        batch = list(islice(items, size))
+        if not batch:
+            return
+        yield batch
+
+
+# =============================================================================
+# ENTITY INDEX
+# -----------------------------------------------------------------------------
+# Like the rule set store, every call opens its own short-lived connection.
+# WAL mode lets searches keep running while a batch run is being indexed.
+# =============================================================================
+class EntityIndex:
+    def __init__(self, path=DEFAULT_INDEX_DB):
+        self.path = path
+        with closing(self._connect()) as connection:
+            connection.execute("PRAGMA journal_mode = WAL")
+            connection.executescript(SCHEMA)
+
+    def _connect(self):
+        connection = sqlite3.connect(self.path, timeout=30)
+        connection.execute("PRAGMA synchronous = NORMAL")
+        return connection
+
+    # ---------------- Indexing ----------------
+    def _remove_documents(self, connection, names):
+        for name in names:
+            row = connection.execute("SELECT id FROM documents WHERE name = ?", (name,)).fetchone()
+            if row is None:
+                continue
+            document_id = row[0]
+            counts = connection.execute(
+                "SELECT entity_id, COUNT(*) FROM mentions WHERE document_id = ? GROUP BY entity_id", (document_id,)
+            ).fetchall()
+            connection.executemany(
+                "UPDATE entities SET mention_count = mention_count - ?, document_count = document_count - 1 WHERE id = ?",
+                ((count, entity_id) for entity_id, count in counts)
+            )
+            connection.execute("DELETE FROM mentions WHERE document_id = ?", (document_id,))
+            connection.execute("DELETE FROM documents WHERE id = ?", (document_id,))
+
+    def _entity_ids(self, connection, pairs, known):
+        new_pairs = [pair for pair in pairs if pair not in known]
+        connection.executemany(
+            "INSERT OR IGNORE INTO entities (text, text_lower, label) VALUES (?, ?, ?)",
+            ((text, normalize_entity_text(text), label) for text, label in new_pairs)
+        )
+        for pair in new_pairs:
+            known[pair] = connection.execute(
+                "SELECT id FROM entities WHERE text = ? AND label = ?", pair
+            ).fetchone()[0]
+        return known
+
+    def add_documents(self, documents, source="batch", batch_size=1000):
+        # documents: (name, entity records) pairs; returns how many were indexed
+        indexed_at = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        known = {}
+        mention_counts = Counter()
+        document_counts = Counter()
+        total = 0
+        with closing(self._connect()) as connection, connection:
+            # A bigger page cache keeps the postings B-tree in memory during bulk inserts
+            connection.execute("PRAGMA cache_size = -65536")
+            for batch in _batches(documents, batch_size):
+                # A name repeated within the batch keeps its last records, as if indexed twice
+                batch = list(dict(batch).items())
+                self._remove_documents(connection, [name for name, _ in batch])
+                pairs = {(record[0], record[1]) for _, records in batch for record in records}
+                known = self._entity_ids(connection, pairs, known)
+
+                postings = []
+                for name, records in batch:
+                    # One posting per (entity, start), matching the table's primary key
+                    document_postings = {
+                        (known[(text, label)], start): (end, sentence) for text, label, start, end, sentence in records
+                    }
+                    document_id = connection.execute(
+                        "INSERT INTO documents (name, source, entity_count, indexed_at) VALUES (?, ?, ?, ?)",
+                        (name, source, len(document_postings), indexed_at)
+                    ).lastrowid
+                    postings.extend(
+                        (entity_id, document_id, start, end, sentence)
+                        for (entity_id, start), (end, sentence) in document_postings.items()
+                    )
+                    mention_counts.update(entity_id for entity_id, _ in document_postings)
+                    document_counts.update({entity_id for entity_id, _ in document_postings})
+
+                # Inserting in primary-key order touches each B-tree page once
+                postings.sort()
+                connection.executemany(
+                    "INSERT INTO mentions (entity_id, document_id, start_char, end_char, sentence) VALUES (?, ?, ?, ?, ?)",
+                    postings
+                )
+                total += len(batch)
+
+            # Counts are updated once per entity at the end, not once per batch
+            connection.executemany(
+                "UPDATE entities SET mention_count = mention_count + ?, document_count = document_count + ? WHERE id = ?",
+                ((count, document_counts[entity_id], entity_id) for entity_id, count in mention_counts.items())
+            )
+        return total
+
+    def clear(self):
+        with closing(self._connect()) as connection, connection:
+            connection.execute("DELETE FROM mentions")
+            connection.execute("DELETE FROM entities")
+            connection.execute("DELETE FROM documents")
+
+    # ---------------- Searching ----------------
+    def search(self, query="", labels=None, limit=50):
+        # [(entity id, text, label, mentions, documents), ...], most mentioned first
+        prefix = normalize_entity_text(query)
+        sql = "SELECT id, text, label, mention_count, document_count FROM entities"
+        params = []
+        if prefix:
+            # The planner would otherwise prefer the label index and scan every entity of that label
+            sql += " INDEXED BY entities_by_prefix WHERE text_lower >= ? AND text_lower < ? AND mention_count > 0"
+            params += [prefix, prefix + PREFIX_END]
+        else:
+            sql += " WHERE mention_count > 0"
+        if labels:
+            sql += f" AND label IN ({', '.join('?' for _ in labels)})"
+            params += list(labels)
+        sql += " ORDER BY mention_count DESC, text_lower LIMIT ?"
+        params.append(limit)
+        with closing(self._connect()) as connection:
+            return connection.execute(sql, params).fetchall()
+
+    def postings(self, entity_id, limit=1000):
+        # [(document name, start, end, sentence), ...] for one entity
+        with closing(self._connect()) as connection:
+            return connection.execute(
+                "SELECT documents.name, mentions.start_char, mentions.end_char, mentions.sentence "
+                "FROM mentions JOIN documents ON documents.id = mentions.document_id "
+                "WHERE mentions.entity_id = ? ORDER BY mentions.document_id, mentions.start_char LIMIT ?",
+                (entity_id, limit)
+            ).fetchall()
+
+    def labels(self):
+        with closing(self._connect()) as connection:
+            return [row[0] for row in connection.execute(
+                "SELECT DISTINCT label FROM entities WHERE mention_count > 0 ORDER BY label"
+            )]
+
+    def stats(self):
+        with closing(self._connect()) as connection:
+            documents, mentions = connection.execute(
+                "SELECT COUNT(*), COALESCE(SUM(entity_count), 0) FROM documents"
+            ).fetchone()
+            entities = connection.execute("SELECT COUNT(*) FROM entities WHERE mention_count > 0").fetchone()[0]
+        return {"documents": documents, "entities": entities, "mentions": mentions}
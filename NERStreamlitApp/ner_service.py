@@ -0,0 +1,243 @@
+# =============================================================================
+# LOCAL NER SERVICE
+# -----------------------------------------------------------------------------
+# Runs the NER logic behind a small HTTP/JSON API so inference can scale
+# separately from the Streamlit front end.
+#
+#   python ner_service.py --port 8600
+#
+# Requests arriving within a few milliseconds of each other are collected
+# into one micro-batch and run together through the pipeline, which is much
+# faster per text than running them one by one.
+#
+# Endpoints:
+#   POST /ner     {"texts": [...], "patterns": [...], "ner_only": false}
+#                 -> {"ents": [[[text, label, start, end, sentence], ...], ...]}
+#   GET  /health  -> model, pipeline and batching statistics
+# =============================================================================
+import argparse
+import json
+import queue
+import threading
+import time
+import urllib.request
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from itertools import islice
+
+from ner_pipeline import (
+    DEFAULT_MODEL,
+    entity_records,
+    get_entity_ruler,
+    load_model,
+    ner_only_components,
+    patterns_key,
+    pipe_pipeline,
+    run_pipeline,
+)
+
+DEFAULT_SERVICE_URL = "http://127.0.0.1:8600"
+
+
+# =============================================================================
+# MICRO-BATCHING QUEUE
+# -----------------------------------------------------------------------------
+# Request threads call submit() and wait on the returned Future. A single
+# worker thread takes the first waiting text, keeps collecting more for up
+# to `max_wait_ms` (or until `max_batch` texts), then groups them by rule set
+# and mode and runs each group through the pipeline in one pass.
+# If that pass fails (e.g. one text is longer than nlp.max_length), the
+# group's remaining texts are run one at a time, so only the requests with a
+# bad text get an error.
+# =============================================================================
+class MicroBatcher:
+    def __init__(self, model=DEFAULT_MODEL, max_batch=64, max_wait_ms=5):
+        self.model = model
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self.batches = 0
+        self.texts = 0
+        self._queue = queue.Queue()
+        self._worker = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        load_model(self.model)
+        self._worker.start()
+
+    def submit(self, text, patterns=(), ner_only=False):
+        future = Future()
+        self._queue.put((text, list(patterns), ner_only, future))
+        return future
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        nlp = load_model(self.model)
+        while True:
+            batch = self._collect()
+            groups = {}
+            for item in batch:
+                text, patterns, ner_only, future = item
+                groups.setdefault((patterns_key(patterns), ner_only), []).append(item)
+
+            for (_, ner_only), items in groups.items():
+                try:
+                    ruler = get_entity_ruler(items[0][1], self.model)
+                    components = ner_only_components(nlp) if ner_only else None
+                except Exception as error:
+                    for item in items:
+                        item[3].set_exception(error)
+                    continue
+                try:
+                    docs = pipe_pipeline(nlp, (item[0] for item in items), ruler, len(items), components)
+                    for item, doc in zip(items, docs):
+                        item[3].set_result(entity_records(doc))
+                except Exception:
+                    for item in items:
+                        if item[3].done():
+                            continue
+                        try:
+                            item[3].set_result(entity_records(run_pipeline(nlp, item[0], ruler, components)))
+                        except Exception as error:
+                            item[3].set_exception(error)
+
+            self.batches += 1
+            self.texts += len(batch)
+
+    def stats(self):
+        return {
+            "batches": self.batches,
+            "texts": self.texts,
+            "mean_batch_size": round(self.texts / self.batches, 2) if self.batches else 0.0,
+            "queued": self._queue.qsize(),
+        }
+
+
+# =============================================================================
+# HTTP HANDLER
+# -----------------------------------------------------------------------------
+# ThreadingHTTPServer gives every connection its own thread. Each thread only
+# parses JSON and waits on the batcher, so concurrent requests naturally end
+# up in the same micro-batch.
+# =============================================================================
+class NERRequestHandler(BaseHTTPRequestHandler):
+    batcher = None
+    request_timeout = 60
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path != "/health":
+            self._send_json(404, {"error": "Not found"})
+            return
+        self._send_json(200, {
+            "status": "ok",
+            "model": self.batcher.model,
+            "pipeline": load_model(self.batcher.model).pipe_names,
+            "batching": self.batcher.stats(),
+        })
+
+    def do_POST(self):
+        if self.path != "/ner":
+            self._send_json(404, {"error": "Not found"})
+            return
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            request = json.loads(self.rfile.read(length).decode("utf-8"))
+            texts = request["texts"]
+            patterns = request.get("patterns", [])
+            ner_only = bool(request.get("ner_only", False))
+            if not isinstance(texts, list) or not all(isinstance(text, str) for text in texts):
+                raise ValueError('"texts" must be a list of strings')
+            if not isinstance(patterns, list) or not all(
+                isinstance(pattern, dict) and isinstance(pattern.get("label"), str) and "pattern" in pattern
+                for pattern in patterns
+            ):
+                raise ValueError('"patterns" must be a list of {"label": ..., "pattern": ...} objects')
+            futures = [self.batcher.submit(text, patterns, ner_only) for text in texts]
+        except (ValueError, KeyError, TypeError) as error:
+            self._send_json(400, {"error": f"Bad request: {error}"})
+            return
+
+        try:
+            ents = [future.result(timeout=self.request_timeout) for future in futures]
+        except Exception as error:
+            self._send_json(500, {"error": str(error)})
+            return
+        self._send_json(200, {"ents": ents})
+
+    def log_message(self, format, *args):
+        # Keep the console quiet; one line per request adds up under load
+        pass
+
+
+def serve(host="127.0.0.1", port=8600, model=DEFAULT_MODEL, max_batch=64, max_wait_ms=5):
+    batcher = MicroBatcher(model, max_batch, max_wait_ms)
+    batcher.start()
+    NERRequestHandler.batcher = batcher
+    server = ThreadingHTTPServer((host, port), NERRequestHandler)
+    print(f"NER service for {model} listening on http://{host}:{port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+# =============================================================================
+# CLIENT
+# -----------------------------------------------------------------------------
+# Used by the Streamlit app when the "Local service" backend is selected.
+# Returns one list of entity records (tuples) per input text.
+# =============================================================================
+def request_entities(texts, patterns=(), ner_only=False, url=DEFAULT_SERVICE_URL, timeout=120):
+    payload = json.dumps({"texts": list(texts), "patterns": list(patterns), "ner_only": ner_only}).encode("utf-8")
+    request = urllib.request.Request(
+        url.rstrip("/") + "/ner",
+        data=payload,
+        headers={"Content-Type": "application/json"},
+        method="POST"
+    )
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        result = json.loads(response.read().decode("utf-8"))
+    return [[tuple(record) for record in records] for records in result["ents"]]
+
+
+def request_corpus_entities(documents, patterns=(), ner_only=False, url=DEFAULT_SERVICE_URL, batch_size=64):
+    # Corpus mode over HTTP: one request per batch of (name, text) documents
+    documents = iter(documents)
+    while True:
+        batch = list(islice(documents, batch_size))
+        if not batch:
+            return
+        results = request_entities([text for _, text in batch], patterns, ner_only, url)
+        yield from zip((name for name, _ in batch), results)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the NER app's spaCy pipeline as a local HTTP service.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8600)
+    parser.add_argument("--model", default=DEFAULT_MODEL)
+    parser.add_argument("--max-batch", type=int, default=64, help="Most texts run together in one micro-batch")
+    parser.add_argument("--max-wait-ms", type=float, default=5, help="How long to wait for more texts before running a batch")
+    args = parser.parse_args()
+    serve(args.host, args.port, args.model, args.max_batch, args.max_wait_ms)
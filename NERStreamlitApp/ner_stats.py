@@ -0,0 +1,76 @@
+# =============================================================================
+# ENTITY STATISTICS AND EXPORT
+# -----------------------------------------------------------------------------
+# Turns entity records into one columnar pandas table and computes every
+# statistic with groupbys on that table, so the same code handles a single
+# text and hundreds of thousands of entities from a batch run.
+# =============================================================================
+import io
+from itertools import chain
+
+import numpy as np
+import pandas as pd
+
+from ner_pipeline import ENTITY_COLUMNS
+
+
+# =============================================================================
+# BUILDING THE ENTITY TABLE
+# -----------------------------------------------------------------------------
+# entity_frame() builds the table for one document.
+# corpus_entity_frame() builds it for a whole batch run: all records are
+# flattened in one pass and the document name column is filled with
+# np.repeat instead of a per-entity loop.
+# =============================================================================
+def entity_frame(records):
+    frame = pd.DataFrame.from_records(records, columns=ENTITY_COLUMNS)
+    frame["label"] = frame["label"].astype("category")
+    return frame
+
+
+def corpus_entity_frame(corpus_results):
+    names = [name for name, _ in corpus_results]
+    counts = np.fromiter((len(records) for _, records in corpus_results), dtype=np.int64, count=len(corpus_results))
+    frame = entity_frame(chain.from_iterable(records for _, records in corpus_results))
+    frame.insert(0, "document", np.repeat(np.array(names, dtype=object), counts))
+    return frame
+
+
+# =============================================================================
+# STATISTICS
+# -----------------------------------------------------------------------------
+# - label_summary: mentions and unique entity texts per label, most common first
+# - top_entities: the n most frequent entity texts within each label
+# =============================================================================
+def label_summary(frame):
+    grouped = frame.groupby("label", observed=True)["text"]
+    summary = pd.DataFrame({"Count": grouped.size(), "Unique Entities": grouped.nunique()})
+    summary = summary.sort_values("Count", ascending=False, kind="stable")
+    return summary.rename_axis("Entity Type").reset_index()
+
+
+def top_entities(frame, n=5):
+    counts = frame.groupby(["label", "text"], observed=True).size().rename("Count").reset_index()
+    counts = counts.sort_values(["label", "Count"], ascending=[True, False], kind="stable")
+    top = counts.groupby("label", observed=True).head(n)
+    return top.rename(columns={"label": "Entity Type", "text": "Entity"}).reset_index(drop=True)
+
+
+# =============================================================================
+# EXPORT
+# -----------------------------------------------------------------------------
+# Both return the file contents as bytes, ready for st.download_button.
+# Parquet needs pyarrow (or fastparquet); to_parquet_bytes returns None when
+# neither is installed so the app can hide that option.
+# =============================================================================
+def to_csv_bytes(frame):
+    return frame.to_csv(index=False).encode("utf-8")
+
+
+def to_parquet_bytes(frame):
+    buffer = io.BytesIO()
+    try:
+        frame.to_parquet(buffer, index=False)
+    except ImportError:
+        return None
+    return buffer.getvalue()
@@ -0,0 +1,22 @@
+# =============================================================================
+# SAMPLE TEXT OPTIONS
+# -----------------------------------------------------------------------------
+# These are pre-loaded samples users can select to quickly test the app.
+# Each one covers a different topic domain (e.g., politics, sports, tech).
+# They live in their own module so the benchmark suite can reuse them.
+# =============================================================================
+sample_texts = {
+    "Sample 1 - Obama & Politics": (
+        "Barack Obama, the 44th President of the United States, delivered a stirring speech at Harvard University "
+        "in Cambridge, Massachusetts. During his presidency, he focused heavily on healthcare reform and economic recovery, "
+        "especially in urban centers like Chicago and New York City. In 2009, he received the Nobel Peace Prize."
+    ),
+    "Sample 2 - Sports & Entertainment": (
+        "LeBron James led the Los Angeles Lakers to a win at Crypto.com Arena. Meanwhile, Taylor Swift performed in a sold-out "
+        "concert at Madison Square Garden. Tom Brady made headlines as he announced his retirement from the NFL."
+    ),
+    "Sample 3 - Business & Tech": (
+        "Google revealed a $2B investment in AI, partnering with Oxford University. Elon Musk and Satya Nadella gave talks at "
+        "the TechFuture Summit, and Apple announced the Vision Pro headset from its Cupertino HQ."
+    )
+}
@@ -0,0 +1,64 @@
+import shutil
+import sqlite3
+import sys
+from pathlib import Path
+
+from streamlit.testing.v1 import AppTest
+
+APP_DIR = Path(__file__).resolve().parents[1]
+
+
+def _app_copy(tmp_path):
+    # The app keeps its SQLite files next to its modules, so run a copy to leave the real index alone
+    copy = tmp_path / "app"
+    shutil.copytree(APP_DIR, copy, ignore=shutil.ignore_patterns("tests", "__pycache__", "*.sqlite3*", ".ner_cache"))
+    for name in [name for name in sys.modules if name.startswith("ner_") or name == "sample_texts"]:
+        del sys.modules[name]
+    return copy
+
+
+def test_clear_search_index_button(tmp_path):
+    copy = _app_copy(tmp_path)
+    at = AppTest.from_file(str(copy / "app.py"), default_timeout=60).run()
+    assert not at.exception
+
+    from ner_search import EntityIndex
+    index = EntityIndex(str(copy / "entity_index.sqlite3"))
+    index.add_documents([("doc", [("Paris", "GPE", 0, 5, 0)])])
+    assert index.stats()["documents"] == 1
+
+    at.sidebar.button[[button.label for button in at.sidebar.button].index("Clear Search Index")].click().run()
+    assert not at.exception
+    assert "Search index cleared." in [message.value for message in at.sidebar.success]
+    with sqlite3.connect(copy / "entity_index.sqlite3") as connection:
+        assert connection.execute("SELECT COUNT(*) FROM documents").fetchone()[0] == 0
+
+
+def test_text_runs_replace_their_sessions_document(tmp_path):
+    from ner_search import EntityIndex, text_document_name
+
+    index = EntityIndex(str(tmp_path / "entity_index.sqlite3"))
+    # The same session edits its text and runs NER again; another session runs its own text
+    index.add_documents([(text_document_name("session-a"), [("Paris", "GPE", 0, 5, 0)])], source="text")
+    index.add_documents([(text_document_name("session-a"), [("Berlin", "GPE", 0, 6, 0)])], source="text")
+    index.add_documents([(text_document_name("session-b"), [("Berlin", "GPE", 0, 6, 0)])], source="text")
+    assert index.stats()["documents"] == 2
+    assert [(text, mentions) for _, text, _, mentions, _ in index.search("")] == [("Berlin", 2)]
+
+
+def test_entity_exports_are_built_once_per_result(tmp_path):
+    copy = _app_copy(tmp_path)
+    from ner_stats import entity_frame
+
+    records = [("Paris", "GPE", 0, 5, 0)]
+    at = AppTest.from_file(str(copy / "app.py"), default_timeout=60)
+    at.session_state["ner_result"] = {"text": "Paris is big.", "records": records, "frame": entity_frame(records)}
+    at.run()
+    assert not at.exception
+    exports = at.session_state["single_exports"]
+    assert exports["csv"].startswith(b"text,label")
+    assert exports["parquet"] is not None
+
+    at.slider(key="single_top_n").set_value(3).run()
+    assert not at.exception
+    assert at.session_state["single_exports"] is exports
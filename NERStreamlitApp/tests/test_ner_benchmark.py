@@ -0,0 +1,12 @@
+from ner_benchmark import percentile
+
+
+def test_percentile_uses_the_nearest_rank():
+    values = list(range(1, 101))
+    assert percentile(values, 99) == 99
+    assert percentile(values, 50) == 50
+    assert percentile(values, 100) == 100
+    assert percentile(list(range(1, 11)), 50) == 5
+    assert percentile([3, 1], 50) == 1
+    assert percentile([7], 99) == 7
+    assert percentile([], 50) is None
@@ -0,0 +1,20 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from ner_cache import ResultCache, result_key
+
+
+def test_result_key_separates_incremental_and_whole_text_runs():
+    text, patterns = "Paris is big.\n\nBerlin is big.", [{"label": "GPE", "pattern": "Paris"}]
+    whole = result_key(text, patterns, "en_core_web_sm")
+    assert result_key(text, patterns, "en_core_web_sm", incremental=True) != whole
+    assert result_key(text, patterns, "en_core_web_sm", ner_only=True) != whole
+    assert result_key(text, patterns, "en_core_web_sm") == whole
+
+
+def test_disk_writes_from_many_threads_leave_whole_files(tmp_path):
+    key = result_key("Paris is big.", [], "en_core_web_sm")
+    records = [("Paris", "GPE", 0, 5, 0)]
+    with ThreadPoolExecutor(8) as pool:
+        list(pool.map(lambda _: ResultCache(cache_dir=str(tmp_path)).put(key, records, use_disk=True), range(64)))
+    assert sorted(path.name for path in tmp_path.iterdir()) == [f"{key}.json"]
+    assert ResultCache(cache_dir=str(tmp_path)).get(key, use_disk=True) == records
@@ -0,0 +1,25 @@
+import io
+
+import pytest
+
+from ner_gazetteer import read_gazetteer
+
+
+class _Upload(io.BytesIO):
+    def __init__(self, name, text):
+        super().__init__(text.encode("utf-8"))
+        self.name = name
+
+
+def test_jsonl_rows():
+    upload = _Upload("places.jsonl", '{"label": "GPE", "pattern": "Paris"}\n\n'
+                                     '{"label": "GPE", "pattern": [{"LOWER": "berlin"}], "case_sensitive": true}\n')
+    assert list(read_gazetteer(upload)) == [("GPE", "Paris", False), ("GPE", [{"LOWER": "berlin"}], True)]
+
+
+@pytest.mark.parametrize("line", ["5", '["GPE", "Paris"]', '{"label": "GPE", "pattern": 5}', '{"label": "GPE", "pattern": [5]}'])
+def test_malformed_jsonl_records_are_value_errors(line):
+    upload = _Upload("places.jsonl", '{"label": "GPE", "pattern": "Paris"}\n' + line + "\n")
+    with pytest.raises(ValueError, match="line 2"):
+        list(read_gazetteer(upload))
+    assert not upload.closed
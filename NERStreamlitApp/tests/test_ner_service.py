@@ -0,0 +1,54 @@
+import json
+import threading
+import urllib.error
+import urllib.request
+from http.server import ThreadingHTTPServer
+
+import pytest
+import spacy
+
+from ner_pipeline import load_model
+from ner_service import MicroBatcher, NERRequestHandler
+
+
+@pytest.fixture
+def service(tmp_path):
+    # A blank English pipeline saved to disk loads like any installed model
+    model = str(tmp_path / "blank_en")
+    spacy.blank("en").to_disk(model)
+    load_model(model).max_length = 100
+    batcher = MicroBatcher(model, max_wait_ms=50)
+    batcher.start()
+    NERRequestHandler.batcher = batcher
+    server = ThreadingHTTPServer(("127.0.0.1", 0), NERRequestHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield batcher, f"http://127.0.0.1:{server.server_address[1]}/ner"
+    server.shutdown()
+    server.server_close()
+
+
+def _post(url, payload):
+    request = urllib.request.Request(url, data=json.dumps(payload).encode("utf-8"), method="POST")
+    try:
+        with urllib.request.urlopen(request, timeout=10) as response:
+            return response.status, json.load(response)
+    except urllib.error.HTTPError as error:
+        return error.code, json.load(error)
+
+
+def test_malformed_patterns_are_a_bad_request(service):
+    _, url = service
+    for patterns in (5, ["Paris"], [{"pattern": "Paris"}]):
+        status, body = _post(url, {"texts": ["Paris"], "patterns": patterns})
+        assert status == 400
+        assert "patterns" in body["error"]
+
+
+def test_one_bad_text_only_fails_its_own_request(service):
+    batcher, _ = service
+    # Submitted together, so both land in the same micro-batch
+    bad = batcher.submit("x" * 200)
+    good = batcher.submit("Paris is big.")
+    assert good.result(timeout=10) == []
+    with pytest.raises(ValueError):
+        bad.result(timeout=10)
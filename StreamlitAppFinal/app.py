@@ -4,8 +4,20 @@
 # ---------------------------------------------------------------------------------------------------------------------------
 
 import streamlit as st
+import pandas as pd
 import random
-import time
+import uuid
+
+from conjugation import TENSES, conjugations
+from content_store import content_store
+from distractors import DistractorIndex
+from leaderboard import leaderboard, typed_run
+from progress_store import progress_store
+from romanization import VERDICT_QUALITY, grade, passed, romanize, to_hangul
+from spaced_repetition import scheduler
+from text_diff import diff_opcodes, diff_summary, highlight_differences
+from typing_analytics import KEY_NAMES, analyze_attempt, keyboard_heatmap_html, to_keys, typing_store
+from typing_timer import new_submission, typing_timer
 
 # ---------------------------------------------------------------------------------------------------------------------------
 # Page Configuration
@@ -73,247 +85,140 @@ st.title("Learn Korean: Mini Games Hub 🇰🇷🎮")
 
 
 # ---------------------------------------------------------------------------------------------------------------------------
-# Datasets for All Mini-Games
+# Content for All Mini-Games
 # ---------------------------------------------------------------------------------------------------------------------------
+# The datasets live in content/*.json and are loaded once per process by content_store.py, indexed by game,
+# difficulty and tag. Each item keeps the fields the games below read (e.g. "romanization"/"hangul"/"english").
 
-# Dataset for Romanization ➔ Hangul
-romanization_words = [
-    {"romanization": "annyeong", "hangul": "안녕", "english": "Hi / Hello"},
-    {"romanization": "gamsahamnida", "hangul": "감사합니다", "english": "Thank you"},
-    {"romanization": "saranghae", "hangul": "사랑해", "english": "I love you"},
-    {"romanization": "jal jinae", "hangul": "잘 지내", "english": "Doing well"},
-    {"romanization": "chingu", "hangul": "친구", "english": "Friend"},
-    {"romanization": "eomma", "hangul": "엄마", "english": "Mother"},
-    {"romanization": "appa", "hangul": "아빠", "english": "Father"},
-    {"romanization": "hangugeo", "hangul": "한국어", "english": "Korean language"},
-    {"romanization": "mashisseoyo", "hangul": "맛있어요", "english": "It's delicious"},
-    {"romanization": "bogosipeo", "hangul": "보고싶어", "english": "I miss you"},
-    {"romanization": "gaja", "hangul": "가자", "english": "Let's go"},
-    {"romanization": "meogeoyo", "hangul": "먹어요", "english": "Eat / Eating"},
-    {"romanization": "isseoyo", "hangul": "있어요", "english": "There is / I have"},
-    {"romanization": "eodieyo", "hangul": "어디에요", "english": "Where is it?"},
-    {"romanization": "jal isseo", "hangul": "잘 있어", "english": "Stay well"},
-    {"romanization": "saengil chukhahae", "hangul": "생일 축하해", "english": "Happy birthday"},
-    {"romanization": "jal ja", "hangul": "잘 자", "english": "Sleep well"},
-    {"romanization": "annyeonghaseyo", "hangul": "안녕하세요", "english": "Hello (formal)"},
-    {"romanization": "byeonhada", "hangul": "변하다", "english": "To change"},
-    {"romanization": "sseuda", "hangul": "쓰다", "english": "To write / To use"},
-    {"romanization": "juseyo", "hangul": "주세요", "english": "Please give me"},
-    {"romanization": "gamsahaeyo", "hangul": "감사해요", "english": "Thanks (polite)"},
-    {"romanization": "je ireumeun", "hangul": "제 이름은", "english": "My name is..."},
-    {"romanization": "jal meokkesseumnida", "hangul": "잘 먹겠습니다", "english": "I will eat well"},
-    {"romanization": "jal meogeosseumnida", "hangul": "잘 먹었습니다", "english": "I ate well"},
-    {"romanization": "chogiyo", "hangul": "저기요", "english": "Excuse me"},
-    {"romanization": "juseyo", "hangul": "주세요", "english": "Please"},
-    {"romanization": "aneyo", "hangul": "아니요", "english": "No"},
-    {"romanization": "ne", "hangul": "네", "english": "Yes"},
-    {"romanization": "mianhamnida", "hangul": "미안합니다", "english": "Sorry"},
-    {"romanization": "sillyehapnida", "hangul": "실례합니다", "english": "Excuse me (formal)"},
-    {"romanization": "oneul", "hangul": "오늘", "english": "Today"},
-    {"romanization": "naeil", "hangul": "내일", "english": "Tomorrow"},
-    {"romanization": "eoneu", "hangul": "어느", "english": "Which"},
-    {"romanization": "eodiseo", "hangul": "어디서", "english": "Where (from)"},
-    {"romanization": "mwo", "hangul": "뭐", "english": "What"},
-    {"romanization": "eotteoke", "hangul": "어떻게", "english": "How"},
-    {"romanization": "wa", "hangul": "와", "english": "And (casual)"},
-    {"romanization": "geurigo", "hangul": "그리고", "english": "And (formal)"},
-    {"romanization": "ttatteuthae", "hangul": "따뜻해", "english": "It's warm"},
-    {"romanization": "chuwo", "hangul": "추워", "english": "It's cold"},
-    {"romanization": "tteugeoun", "hangul": "뜨거운", "english": "Hot"},
-    {"romanization": "sigan", "hangul": "시간", "english": "Time"},
-    {"romanization": "sigan isseo", "hangul": "시간 있어", "english": "Do you have time?"},
-    {"romanization": "pyeonhage", "hangul": "편하게", "english": "Comfortably"},
-    {"romanization": "cheoncheonhi", "hangul": "천천히", "english": "Slowly"},
-    {"romanization": "ppalli", "hangul": "빨리", "english": "Quickly"},
-    {"romanization": "jeoneun", "hangul": "저는", "english": "I am..."},
-    {"romanization": "dangsin", "hangul": "당신", "english": "You"},
-    {"romanization": "geunyeo", "hangul": "그녀", "english": "She"},
-    {"romanization": "geu", "hangul": "그", "english": "That"},
-]
-
-
-
-# Dataset for Vocabulary Quiz
-vocab_questions = [
-    {"english": "Thank you", "choices": ["감사합니다", "사랑해", "친구", "잘 지내"], "answer": "감사합니다"},
-    {"english": "Friend", "choices": ["엄마", "친구", "아빠", "한국어"], "answer": "친구"},
-    {"english": "Mother", "choices": ["엄마", "아빠", "친구", "안녕"], "answer": "엄마"},
-    {"english": "Father", "choices": ["사랑해", "감사합니다", "아빠", "친구"], "answer": "아빠"},
-    {"english": "Korean language", "choices": ["맛있어요", "보고싶어", "한국어", "잘 지내"], "answer": "한국어"},
-    {"english": "It's delicious", "choices": ["맛있어요", "먹어요", "있어요", "어디에요"], "answer": "맛있어요"},
-    {"english": "I miss you", "choices": ["가자", "맛있어요", "보고싶어", "안녕하세요"], "answer": "보고싶어"},
-    {"english": "Let's go", "choices": ["가자", "먹어요", "사랑해", "안녕"], "answer": "가자"},
-    {"english": "Where is it?", "choices": ["있어요", "어디에요", "가자", "잘 자"], "answer": "어디에요"},
-    {"english": "Goodbye (stay well)", "choices": ["잘 자", "잘 있어", "안녕", "친구"], "answer": "잘 있어"},
-    {"english": "Happy birthday", "choices": ["잘 자", "잘 있어", "생일 축하해", "감사합니다"], "answer": "생일 축하해"},
-    {"english": "Sleep well", "choices": ["잘 자", "잘 지내", "친구", "감사합니다"], "answer": "잘 자"},
-    {"english": "Hello (formal)", "choices": ["감사합니다", "안녕하세요", "사랑해", "가자"], "answer": "안녕하세요"},
-    {"english": "To change", "choices": ["변하다", "쓰다", "맛있어요", "친구"], "answer": "변하다"},
-    {"english": "To write / To use", "choices": ["쓰다", "가자", "친구", "감사합니다"], "answer": "쓰다"},
-    {"english": "Please give me", "choices": ["주세요", "미안합니다", "네", "아니요"], "answer": "주세요"},
-    {"english": "Thanks (polite)", "choices": ["감사해요", "감사합니다", "사랑해", "어디에요"], "answer": "감사해요"},
-    {"english": "My name is...", "choices": ["제 이름은", "어디에요", "잘 있어", "사랑해"], "answer": "제 이름은"},
-    {"english": "I will eat well", "choices": ["잘 먹겠습니다", "잘 먹었습니다", "먹어요", "친구"], "answer": "잘 먹겠습니다"},
-    {"english": "I ate well", "choices": ["잘 먹겠습니다", "잘 먹었습니다", "맛있어요", "감사합니다"], "answer": "잘 먹었습니다"},
-    {"english": "Excuse me", "choices": ["저기요", "어디에요", "감사합니다", "잘 자"], "answer": "저기요"},
-    {"english": "No", "choices": ["네", "아니요", "감사합니다", "친구"], "answer": "아니요"},
-    {"english": "Yes", "choices": ["네", "아니요", "감사합니다", "사랑해"], "answer": "네"},
-    {"english": "Sorry", "choices": ["미안합니다", "감사합니다", "친구", "잘 지내"], "answer": "미안합니다"},
-    {"english": "Excuse me (formal)", "choices": ["실례합니다", "감사합니다", "잘 있어", "잘 자"], "answer": "실례합니다"},
-    {"english": "Today", "choices": ["오늘", "내일", "어디에요", "가자"], "answer": "오늘"},
-    {"english": "Tomorrow", "choices": ["내일", "오늘", "감사합니다", "잘 지내"], "answer": "내일"},
-    {"english": "Which", "choices": ["어느", "뭐", "어디에요", "감사합니다"], "answer": "어느"},
-    {"english": "What", "choices": ["뭐", "어느", "감사합니다", "친구"], "answer": "뭐"},
-    {"english": "How", "choices": ["어떻게", "어디에요", "감사합니다", "친구"], "answer": "어떻게"},
-    {"english": "And (casual)", "choices": ["와", "그리고", "맛있어요", "잘 자"], "answer": "와"},
-    {"english": "And (formal)", "choices": ["그리고", "와", "감사합니다", "친구"], "answer": "그리고"},
-    {"english": "It's warm", "choices": ["따뜻해", "추워", "뜨거운", "감사합니다"], "answer": "따뜻해"},
-    {"english": "It's cold", "choices": ["추워", "따뜻해", "뜨거운", "친구"], "answer": "추워"},
-    {"english": "Hot", "choices": ["뜨거운", "추워", "맛있어요", "친구"], "answer": "뜨거운"},
-    {"english": "Time", "choices": ["시간", "어디에요", "감사합니다", "친구"], "answer": "시간"},
-    {"english": "Do you have time?", "choices": ["시간 있어", "시간", "어디에요", "친구"], "answer": "시간 있어"},
-    {"english": "Comfortably", "choices": ["편하게", "천천히", "빨리", "감사합니다"], "answer": "편하게"},
-    {"english": "Slowly", "choices": ["천천히", "편하게", "빨리", "잘 자"], "answer": "천천히"},
-    {"english": "Quickly", "choices": ["빨리", "편하게", "천천히", "잘 있어"], "answer": "빨리"},
-    {"english": "I am...", "choices": ["저는", "당신", "그녀", "그"], "answer": "저는"},
-    {"english": "You", "choices": ["당신", "저는", "그녀", "그"], "answer": "당신"},
-    {"english": "She", "choices": ["그녀", "당신", "저는", "그"], "answer": "그녀"},
-    {"english": "He", "choices": ["그", "그녀", "당신", "저는"], "answer": "그"},
-    {"english": "Food", "choices": ["음식", "친구", "학교", "감사합니다"], "answer": "음식"},
-    {"english": "School", "choices": ["학교", "음식", "친구", "사랑해"], "answer": "학교"},
-    {"english": "Water", "choices": ["물", "학교", "음식", "친구"], "answer": "물"},
-    {"english": "Book", "choices": ["책", "음악", "학교", "친구"], "answer": "책"},
-    {"english": "Music", "choices": ["음악", "책", "학교", "친구"], "answer": "음악"}
-]
-
-
-# Dataset for Korean TypeRacer
-typing_sentences_easy = [
-    {"hangul": "오늘 날씨가 정말 좋아요.", "english": "The weather is really nice today."},
-    {"hangul": "저는 한국어를 공부하고 있어요.", "english": "I am studying Korean."},
-    {"hangul": "내일은 친구를 만날 거예요.", "english": "I will meet a friend tomorrow."},
-    {"hangul": "이 음식은 정말 맛있어요.", "english": "This food is really delicious."},
-    {"hangul": "지금 어디에 가고 있어요?", "english": "Where are you going now?"},
-    {"hangul": "저는 서울에 살고 있어요.", "english": "I live in Seoul."},
-    {"hangul": "학교에 가야 해요.", "english": "I have to go to school."},
-    {"hangul": "커피를 마시고 싶어요.", "english": "I want to drink coffee."},
-    {"hangul": "좋은 하루 보내세요.", "english": "Have a good day."},
-    {"hangul": "오늘도 수고했어요.", "english": "You worked hard today too."},
-    {"hangul": "운동을 하고 싶어요.", "english": "I want to exercise."},
-    {"hangul": "책을 읽고 있어요.", "english": "I am reading a book."},
-    {"hangul": "음악을 듣고 있어요.", "english": "I am listening to music."},
-    {"hangul": "집에 가고 싶어요.", "english": "I want to go home."},
-    {"hangul": "영화를 보고 싶어요.", "english": "I want to watch a movie."},
-    {"hangul": "어제는 정말 추웠어요.", "english": "It was really cold yesterday."},
-    {"hangul": "새로운 친구를 사귀었어요.", "english": "I made a new friend."},
-    {"hangul": "저는 매일 아침에 운동해요.", "english": "I exercise every morning."},
-    {"hangul": "오늘은 숙제가 많아요.", "english": "I have a lot of homework today."},
-    {"hangul": "가족과 시간을 보내고 싶어요.", "english": "I want to spend time with my family."},
-    {"hangul": "저녁에 공원에 갔어요.", "english": "I went to the park in the evening."},
-    {"hangul": "주말에 바다를 보러 갔어요.", "english": "I went to see the sea on the weekend."},
-    {"hangul": "한국 음식을 좋아해요.", "english": "I like Korean food."},
-    {"hangul": "생일 파티에 갔어요.", "english": "I went to a birthday party."},
-    {"hangul": "새로운 직장을 찾고 있어요.", "english": "I am looking for a new job."},
-    {"hangul": "요즘 너무 바빠요.", "english": "I am very busy these days."},
-    {"hangul": "오늘은 일찍 일어났어요.", "english": "I woke up early today."},
-    {"hangul": "비가 와서 집에 있었어요.", "english": "It rained so I stayed at home."},
-    {"hangul": "여름 방학이 기다려져요.", "english": "I am looking forward to summer vacation."},
-    {"hangul": "운전하는 것을 배우고 있어요.", "english": "I am learning how to drive."}
-]
-
-typing_sentences_hard = [
-    {
-        "hangul": "오늘은 정말 바빴어요. 회사에서 회의가 많았어요. 그래서 점심도 늦게 먹었어요.",
-        "english": "Today was really busy. There were many meetings at work. So I ate lunch late."
-    },
-    {
-        "hangul": "주말에 여행을 갔어요. 친구들과 바다를 보러 갔어요. 날씨가 정말 좋았어요.",
-        "english": "I went on a trip over the weekend. I went to see the ocean with friends. The weather was really nice."
-    },
-    {
-        "hangul": "어제는 비가 많이 왔어요. 우산을 안 가져와서 많이 젖었어요. 그래서 감기에 걸렸어요.",
-        "english": "It rained a lot yesterday. I didn’t bring an umbrella and got really wet. So I caught a cold."
-    },
-    {
-        "hangul": "오늘 아침에 운동을 했어요. 조깅을 하고 스트레칭을 했어요. 몸이 상쾌했어요.",
-        "english": "I exercised this morning. I went jogging and did some stretching. My body felt refreshed."
-    },
-    {
-        "hangul": "저는 새로운 취미를 시작했어요. 그림 그리기를 배우고 있어요. 정말 재미있어요.",
-        "english": "I started a new hobby. I am learning to draw. It's really fun."
-    },
-    {
-        "hangul": "이번 주말에는 영화를 볼 거예요. 가족과 함께 영화관에 갈 거예요. 팝콘도 먹을 거예요.",
-        "english": "I will watch a movie this weekend. I will go to the movie theater with my family. We will eat popcorn too."
-    },
-    {
-        "hangul": "오늘은 친구 생일이에요. 우리는 맛있는 음식을 먹을 거예요. 그리고 노래방에 갈 거예요.",
-        "english": "Today is my friend's birthday. We will eat delicious food. And we will go to karaoke."
-    },
-    {
-        "hangul": "어제 새로운 책을 샀어요. 오늘 아침에 조금 읽었어요. 이야기 내용이 정말 흥미로워요.",
-        "english": "I bought a new book yesterday. I read a little this morning. The story is really interesting."
-    },
-    {
-        "hangul": "학교에서 시험을 봤어요. 시험이 생각보다 쉬웠어요. 좋은 점수를 받을 것 같아요.",
-        "english": "I took a test at school. The test was easier than I thought. I think I will get a good score."
-    },
-    {
-        "hangul": "이번 여름에 한국에 갈 거예요. 친구들을 만나고 맛있는 음식을 먹을 거예요. 그리고 여러 곳을 여행할 거예요.",
-        "english": "I will go to Korea this summer. I will meet friends and eat delicious food. And I will travel to many places."
+ALL_TOPICS = "All topics"
+
+
+def topic_deck(game, topic, difficulty=None):
+    return content_store.items(game, difficulty=difficulty, tag=None if topic == ALL_TOPICS else topic)
+
+
+# --- Vocabulary Quiz choices: the answer plus generated distractors (distractors.py) ---
+@st.cache_resource
+def vocab_distractor_index():
+    return DistractorIndex.from_items(content_store.items("vocab"))
+
+
+def vocab_choices(question):
+    # Items may still list hand-written "choices"; otherwise three distractors are generated
+    choices = question.get("choices") or [question["answer"]] + vocab_distractor_index().distractors(question["answer"])
+    choices = list(choices)
+    random.shuffle(choices)
+    return choices
+
+
+# --- Tense Selector questions: every verb in content/tense.json, in each tense (conjugation.py) ---
+@st.cache_resource
+def tense_cards(topic):
+    return [
+        {"id": f"{verb['id']}-{tense}", "verb_id": verb["id"], "tense": tense}
+        for verb in topic_deck("tense", topic)
+        for tense in TENSES
+    ]
+
+
+def tense_question(card):
+    verb = content_store.item("tense", card["verb_id"])
+    prefix = verb.get("prefix", "")
+    forms = conjugations(verb["verb"], verb.get("irregular"))
+    choices = [f"{prefix} {forms[tense]}".strip() for tense in TENSES]
+    english = {
+        "present": f"I {verb['english']}.",
+        "past": f"I {verb['english_past']}.",
+        "future": f"I will {verb['english']}.",
+    }
+    return {
+        "id": card["id"],
+        "verb": verb["verb"],
+        "english": english[card["tense"]],
+        "choices": choices,
+        "answer": choices[TENSES.index(card["tense"])],
     }
-]
 
 
-# Dataset for Tense Selector
-tense_questions = [
-    {"english": "I eat rice.", "choices": ["먹어요", "먹었습니다", "먹을 거예요"], "answer": "먹어요"},
-    {"english": "I ate rice.", "choices": ["먹어요", "먹었습니다", "먹을 거예요"], "answer": "먹었습니다"},
-    {"english": "I will eat rice.", "choices": ["먹어요", "먹었습니다", "먹을 거예요"], "answer": "먹을 거예요"},
-    
-    {"english": "I study Korean.", "choices": ["공부해요", "공부했어요", "공부할 거예요"], "answer": "공부해요"},
-    {"english": "I studied Korean.", "choices": ["공부해요", "공부했어요", "공부할 거예요"], "answer": "공부했어요"},
-    {"english": "I will study Korean.", "choices": ["공부해요", "공부했어요", "공부할 거예요"], "answer": "공부할 거예요"},
+# --- Next card from the spaced-repetition scheduler (spaced_repetition.py) ---
+def next_card(game, deck, deck_name=ALL_TOPICS, current=None):
+    return scheduler.next_item(player, game, deck, deck_name, exclude=None if current is None else current["id"])
 
-    {"english": "I meet a friend.", "choices": ["만나요", "만났어요", "만날 거예요"], "answer": "만나요"},
-    {"english": "I met a friend.", "choices": ["만나요", "만났어요", "만날 거예요"], "answer": "만났어요"},
-    {"english": "I will meet a friend.", "choices": ["만나요", "만났어요", "만날 거예요"], "answer": "만날 거예요"},
 
-    {"english": "I go to school.", "choices": ["가요", "갔어요", "갈 거예요"], "answer": "가요"},
-    {"english": "I went to school.", "choices": ["가요", "갔어요", "갈 거예요"], "answer": "갔어요"},
-    {"english": "I will go to school.", "choices": ["가요", "갔어요", "갈 거예요"], "answer": "갈 거예요"},
+def show_progress(game):
+    stats = progress_store.stats(player, game)
+    st.markdown(f"**Progress:** {stats['correct']} correct out of {stats['attempts']} attempts")
+    st.markdown(f"🔥 **Current Streak:** {stats['streak']} · 🏅 **Best Streak:** {stats['best_streak']}")
 
-    {"english": "I drink coffee.", "choices": ["마셔요", "마셨어요", "마실 거예요"], "answer": "마셔요"},
-    {"english": "I drank coffee.", "choices": ["마셔요", "마셨어요", "마실 거예요"], "answer": "마셨어요"},
-    {"english": "I will drink coffee.", "choices": ["마셔요", "마셨어요", "마실 거예요"], "answer": "마실 거예요"},
 
-    {"english": "I buy a book.", "choices": ["사요", "샀어요", "살 거예요"], "answer": "사요"},
-    {"english": "I bought a book.", "choices": ["사요", "샀어요", "살 거예요"], "answer": "샀어요"},
-    {"english": "I will buy a book.", "choices": ["사요", "샀어요", "살 거예요"], "answer": "살 거예요"},
+def show_review_counts(game, deck, deck_name=ALL_TOPICS):
+    counts = scheduler.deck_counts(player, game, deck, deck_name)
+    st.caption(
+        f"📅 Due for review: {counts['due']} · 🆕 New: {counts['new']} · "
+        f"🔁 Learning: {counts['learning']} · 🧠 Learned: {counts['learned']}"
+    )
+
+
+# --- TypeRacer leaderboards (leaderboard.py), cached briefly so every rerun doesn't query the database ---
+LEADERBOARD_TTL = 10
+MEDALS = {1: "🥇", 2: "🥈", 3: "🥉"}
+
+
+def leaderboard_place(place):
+    return MEDALS.get(place, str(place))
 
-    {"english": "I sleep early.", "choices": ["일찍 자요", "일찍 잤어요", "일찍 잘 거예요"], "answer": "일찍 자요"},
-    {"english": "I slept early.", "choices": ["일찍 자요", "일찍 잤어요", "일찍 잘 거예요"], "answer": "일찍 잤어요"},
-    {"english": "I will sleep early.", "choices": ["일찍 자요", "일찍 잤어요", "일찍 잘 거예요"], "answer": "일찍 잘 거예요"},
 
-    {"english": "I watch a movie.", "choices": ["영화 봐요", "영화 봤어요", "영화 볼 거예요"], "answer": "영화 봐요"},
-    {"english": "I watched a movie.", "choices": ["영화 봐요", "영화 봤어요", "영화 볼 거예요"], "answer": "영화 봤어요"},
-    {"english": "I will watch a movie.", "choices": ["영화 봐요", "영화 봤어요", "영화 볼 거예요"], "answer": "영화 볼 거예요"},
+@st.cache_data(ttl=LEADERBOARD_TTL)
+def sentence_leaderboard(mode, item_id, limit=10):
+    rows = leaderboard.top_sentence(mode, item_id, limit)
+    return pd.DataFrame({
+        "Place": [leaderboard_place(place) for place in range(1, len(rows) + 1)],
+        "Player": [row[0] for row in rows],
+        "Time (s)": [row[1] for row in rows],
+    })
+
+
+@st.cache_data(ttl=LEADERBOARD_TTL)
+def mode_leaderboard(mode, limit=10):
+    rows = leaderboard.top_mode(mode, limit)
+    return pd.DataFrame({
+        "Place": [leaderboard_place(place) for place in range(1, len(rows) + 1)],
+        "Player": [row[0] for row in rows],
+        "Sentence": [content_store.item("typeracer", row[1])["hangul"] for row in rows],
+        "Time (s)": [row[2] for row in rows],
+    })
+
+
+# ---------------------------------------------------------------------------------------------------------------------------
+# Player
+# ---------------------------------------------------------------------------------------------------------------------------
+# Review schedules and progress are saved per player name, so the same name picks up where it left off after a reload.
+# Without a name, everything is saved under an id that belongs to this browser session only, so anonymous visitors never
+# share (or overwrite) each other's schedules, streaks and analytics. Only named players go on the leaderboard.
+
+if "guest_id" not in st.session_state:
+    st.session_state.guest_id = f"guest-{uuid.uuid4().hex}"
+
+with st.sidebar:
+    st.header("👤 Player")
+    player_name = st.text_input("Player name:", key="player_name", placeholder="Guest").strip()
+    player = player_name or st.session_state.guest_id
+    if not player_name:
+        st.caption("Playing as a guest: progress is kept for this session only. Enter a name to save it and join the leaderboard.")
+    st.markdown("---")
 
-    {"english": "I walk in the park.", "choices": ["공원에서 걸어요", "공원에서 걸었어요", "공원에서 걸을 거예요"], "answer": "공원에서 걸어요"},
-    {"english": "I walked in the park.", "choices": ["공원에서 걸어요", "공원에서 걸었어요", "공원에서 걸을 거예요"], "answer": "공원에서 걸었어요"},
-    {"english": "I will walk in the park.", "choices": ["공원에서 걸어요", "공원에서 걸었어요", "공원에서 걸을 거예요"], "answer": "공원에서 걸을 거예요"},
-]
 
 # ---------------------------------------------------------------------------------------------------------------------------
 # Create Tabs
 # ---------------------------------------------------------------------------------------------------------------------------
 
-tab_home, tab1, tab2, tab3, tab4 = st.tabs([
+tab_home, tab1, tab2, tab3, tab4, tab_progress = st.tabs([
     "🏠 Home", 
     "✍️ Romanization ➔ Hangul", 
     "📝 Vocabulary Quiz", 
     "🏎️ Korean TypeRacer", 
-    "⏳ Tense Selector"
+    "⏳ Tense Selector",
+    "📈 My Progress"
 ])
 
 
@@ -418,12 +323,38 @@ Your goal is to correctly type the Hangul (Korean script) based on the Romanized
                  
                  """)
 
+    # --- Converter in the sidebar: Hangul -> Romanization, or Romanization -> Hangul ---
+    with st.sidebar:
+        st.markdown("### 🔤 Romanization Converter")
+        rom_convert = st.text_input("Type Hangul or romanization:", key="rom_convert").strip()
+        if rom_convert:
+            if any("가" <= char <= "힣" for char in rom_convert):
+                st.markdown(f"**{rom_convert}** ➔ *{romanize(rom_convert)}*")
+            else:
+                st.markdown(f"*{rom_convert}* ➔ **{to_hangul(rom_convert)}**")
+            st.caption("Romanization is read by sound, so use a hyphen where it's ambiguous (saeng-il ➔ 생일).")
+        st.markdown("---")
+
     # --- Small Description Under Title ---
     st.caption("Type the correct Hangul spelling based on the Romanized word shown. Press Enter or click Submit!")
 
+    # --- Topic picker (words are drawn from the chosen topic only) ---
+    col1, col2, col3 = st.columns([2, 4, 1])
+    with col2:
+        rom_topic = st.selectbox(
+            "Topic:",
+            options=[ALL_TOPICS] + content_store.tags("romanization"),
+            key="rom_topic",
+            label_visibility="collapsed"
+        )
+    rom_deck = topic_deck("romanization", rom_topic)
+
     # Initialize session state
     if "rom_current_word" not in st.session_state:
-        st.session_state.rom_current_word = random.choice(romanization_words)
+        st.session_state.rom_current_word = next_card("romanization", rom_deck, rom_topic)
+
+    if "rom_deck_topic" not in st.session_state:
+        st.session_state.rom_deck_topic = rom_topic
 
     if "rom_user_input" not in st.session_state:
         st.session_state.rom_user_input = ""
@@ -431,20 +362,18 @@ Your goal is to correctly type the Hangul (Korean script) based on the Romanized
     if "rom_flash" not in st.session_state:
         st.session_state.rom_flash = False  # control color flashing
 
-    if "rom_correct_count" not in st.session_state:
-        st.session_state.rom_correct_count = 0
-
-    if "rom_total_attempts" not in st.session_state:
-        st.session_state.rom_total_attempts = 0
-
-    if "rom_streak" not in st.session_state:
-        st.session_state.rom_streak = 0
+    # --- Handle Topic Switching ---
+    if rom_topic != st.session_state.rom_deck_topic:
+        st.session_state.rom_deck_topic = rom_topic
+        st.session_state.rom_current_word = next_card("romanization", rom_deck, rom_topic)
+        st.session_state.rom_user_input = ""
 
     # --- Handle Next Word button first ---
-    col1, col2, col3 = st.columns([2, 4, 1])
     with col1:
         if st.button("🔄 Next Word"):
-            st.session_state.rom_current_word = random.choice(romanization_words)
+            st.session_state.rom_current_word = next_card(
+                "romanization", rom_deck, rom_topic, current=st.session_state.rom_current_word
+            )
             st.session_state.rom_user_input = ""
             st.session_state.rom_flash = True
             st.rerun()
@@ -452,12 +381,12 @@ Your goal is to correctly type the Hangul (Korean script) based on the Romanized
     # --- Display Word and Input Form ---
     if st.session_state.rom_flash:
         st.markdown(
-            f"<h2 style='color: #C60C30;'>{st.session_state.rom_current_word['romanization']}</h2>",
+            f"<h2 style='color: #C60C30;'>{romanize(st.session_state.rom_current_word['hangul'])}</h2>",
             unsafe_allow_html=True
         )
         st.session_state.rom_flash = False
     else:
-        st.subheader(f"Romanized Word: {st.session_state.rom_current_word['romanization']}")
+        st.subheader(f"Romanized Word: {romanize(st.session_state.rom_current_word['hangul'])}")
 
     # Create the input form
     with st.form(key="rom_form"):
@@ -468,20 +397,45 @@ Your goal is to correctly type the Hangul (Korean script) based on the Romanized
         submit_button = st.form_submit_button("Submit")
 
         if submit_button:
-            st.session_state.rom_total_attempts += 1
-
-            if user_input.strip() == st.session_state.rom_current_word['hangul']:
-                st.session_state.rom_correct_count += 1
-                st.session_state.rom_streak += 1
+            # Partial credit: exact spelling, spelled the way it sounds, or a jamo or two off
+            rom_grade = grade(user_input, st.session_state.rom_current_word['hangul'])
+            rom_correct = rom_grade["verdict"] == "correct"
+            scheduler.review(
+                player, "romanization", st.session_state.rom_current_word['id'], passed(rom_grade["verdict"]),
+                quality=VERDICT_QUALITY[rom_grade["verdict"]]
+            )
+            progress_store.record(
+                player, "romanization", st.session_state.rom_current_word['id'], passed(rom_grade["verdict"])
+            )
+
+            if rom_correct:
                 st.success(f"✅ Correct!\n\n**Meaning:** {st.session_state.rom_current_word['english']}")
+            elif rom_grade["verdict"] == "sounds right":
+                st.warning(
+                    f"🔉 Sounds right, but it's spelled **{st.session_state.rom_current_word['hangul']}** "
+                    f"(score {rom_grade['score']:.0%}).\n\n**Meaning:** {st.session_state.rom_current_word['english']}"
+                )
+            elif rom_grade["verdict"] == "close":
+                st.warning(
+                    f"🤏 Almost! {rom_grade['distance']} jamo off (score {rom_grade['score']:.0%}). "
+                    f"Correct answer: {st.session_state.rom_current_word['hangul']}"
+                )
+                st.markdown(
+                    highlight_differences(st.session_state.rom_current_word['hangul'], user_input.strip()),
+                    unsafe_allow_html=True
+                )
             else:
-                st.session_state.rom_streak = 0
                 st.error(f"❌ Incorrect. Correct answer: {st.session_state.rom_current_word['hangul']}")
+                if user_input.strip() and user_input.isascii():
+                    st.info(
+                        f"⌨️ That looks like romanization. Switch to a Korean keyboard: "
+                        f"**{user_input.strip()}** would be spelled **{to_hangul(user_input.strip())}**."
+                    )
 
     # --- Show Progress and Streak at the Bottom ---
     st.markdown("---")
-    st.markdown(f"**Progress:** {st.session_state.rom_correct_count} correct out of {st.session_state.rom_total_attempts} attempts")
-    st.markdown(f"🔥 **Current Streak:** {st.session_state.rom_streak}")
+    show_progress("romanization")
+    show_review_counts("romanization", rom_deck, rom_topic)
 
 
 
@@ -495,34 +449,45 @@ with tab2:
     # --- Add Small Description Under Title ---
     st.caption("Choose the correct Korean translation for the given English word. Press Submit to check your answer!")
 
+    # --- Topic picker ---
+    col1, col2, col3 = st.columns([2, 4, 1])
+    with col2:
+        vocab_topic = st.selectbox(
+            "Topic:",
+            options=[ALL_TOPICS] + content_store.tags("vocab"),
+            key="vocab_topic",
+            label_visibility="collapsed"
+        )
+    vocab_deck = topic_deck("vocab", vocab_topic)
+
     # Initialize session state
     if "vocab_current_question" not in st.session_state:
-        st.session_state.vocab_current_question = random.choice(vocab_questions)
+        st.session_state.vocab_current_question = next_card("vocab", vocab_deck, vocab_topic)
+
+    if "vocab_deck_topic" not in st.session_state:
+        st.session_state.vocab_deck_topic = vocab_topic
 
     if "vocab_shuffled_choices" not in st.session_state:
-        st.session_state.vocab_shuffled_choices = st.session_state.vocab_current_question['choices'].copy()
-        random.shuffle(st.session_state.vocab_shuffled_choices)
+        st.session_state.vocab_shuffled_choices = vocab_choices(st.session_state.vocab_current_question)
 
     if "vocab_user_choice" not in st.session_state:
         st.session_state.vocab_user_choice = None
 
-    if "vocab_correct_count" not in st.session_state:
-        st.session_state.vocab_correct_count = 0
-
-    if "vocab_total_attempts" not in st.session_state:
-        st.session_state.vocab_total_attempts = 0
-
-    if "vocab_streak" not in st.session_state:
-        st.session_state.vocab_streak = 0
+    # --- Handle Topic Switching ---
+    if vocab_topic != st.session_state.vocab_deck_topic:
+        st.session_state.vocab_deck_topic = vocab_topic
+        st.session_state.vocab_current_question = next_card("vocab", vocab_deck, vocab_topic)
+        st.session_state.vocab_user_choice = None
+        st.session_state.vocab_shuffled_choices = vocab_choices(st.session_state.vocab_current_question)
 
     # --- Handle Next Question button FIRST ---
-    col1, col2, col3 = st.columns([2, 4, 1])
     with col1:
         if st.button("🔄 Next Question (Vocab Quiz)"):
-            st.session_state.vocab_current_question = random.choice(vocab_questions)
+            st.session_state.vocab_current_question = next_card(
+                "vocab", vocab_deck, vocab_topic, current=st.session_state.vocab_current_question
+            )
             st.session_state.vocab_user_choice = None
-            st.session_state.vocab_shuffled_choices = st.session_state.vocab_current_question['choices'].copy()
-            random.shuffle(st.session_state.vocab_shuffled_choices)
+            st.session_state.vocab_shuffled_choices = vocab_choices(st.session_state.vocab_current_question)
             st.rerun()
 
     # --- Display Current Question ---
@@ -538,62 +503,46 @@ with tab2:
     # --- Submit Answer Button ---
     if st.button("✅ Submit (Vocab Quiz)"):
         if st.session_state.vocab_user_choice:
-            st.session_state.vocab_total_attempts += 1
+            vocab_correct = st.session_state.vocab_user_choice == st.session_state.vocab_current_question['answer']
+            scheduler.review(player, "vocab", st.session_state.vocab_current_question['id'], vocab_correct)
+            progress_store.record(player, "vocab", st.session_state.vocab_current_question['id'], vocab_correct)
 
-            if st.session_state.vocab_user_choice == st.session_state.vocab_current_question['answer']:
-                st.session_state.vocab_correct_count += 1
-                st.session_state.vocab_streak += 1
+            if vocab_correct:
                 st.success(f"✅ Correct!\n\n**English Word:** {st.session_state.vocab_current_question['english']}\n**Korean Word:** {st.session_state.vocab_user_choice}")
             else:
-                st.session_state.vocab_streak = 0
                 st.error(f"❌ Incorrect.\n\n**English Word:** {st.session_state.vocab_current_question['english']}\n**Correct Korean Word:** {st.session_state.vocab_current_question['answer']}")
 
     # --- Show Progress and Streak at the Bottom ---
     st.markdown("---")
-    st.markdown(f"**Progress:** {st.session_state.vocab_correct_count} correct out of {st.session_state.vocab_total_attempts} attempts")
-    st.markdown(f"🔥 **Current Streak:** {st.session_state.vocab_streak}")
+    show_progress("vocab")
+    show_review_counts("vocab", vocab_deck, vocab_topic)
 
 
 # ---------------------------------------------------------------------------------------------------------------------------
 # Mini-Game 3: Korean Typeracer
 # ---------------------------------------------------------------------------------------------------------------------------
 
-# --- Helper function to highlight differences ---
-def highlight_differences(correct, user):
-    output = ""
-    for i in range(max(len(correct), len(user))):
-        correct_char = correct[i] if i < len(correct) else ""
-        user_char = user[i] if i < len(user) else ""
-        if correct_char == user_char:
-            output += f"<span style='color:black;'>{correct_char}</span>"
-        else:
-            output += f"<span style='color:red;'>{correct_char}</span>"
-    return output
+# Mistakes are highlighted by text_diff.py, which lines the attempt up with the sentence before comparing
 
 with tab3:
     st.header("Korean TypeRacer 🏎️⌨️")
 
     # --- Add Small Description Under Title ---
-    st.caption("Choose Easy or Hard mode. Type the full Korean sentence(s) exactly as shown. Timer starts when a new sentence appears!")
+    st.caption("Choose Easy or Hard mode. Type the full Korean sentence(s) exactly as shown. The timer starts at your first keystroke!")
 
     # Initialize session state
     if "typeracer_mode" not in st.session_state:
         st.session_state.typeracer_mode = "Easy"
 
     if "typeracer_current_sentence" not in st.session_state:
-        st.session_state.typeracer_current_sentence = random.choice(typing_sentences_easy)
+        st.session_state.typeracer_current_sentence = random.choice(content_store.items("typeracer", difficulty="easy"))
 
-    if "typeracer_user_input" not in st.session_state:
-        st.session_state.typeracer_user_input = ""
+    # Every new sentence is a new round, which clears the typing box and its timer
+    if "typeracer_round" not in st.session_state:
+        st.session_state.typeracer_round = 0
 
-    if "typeracer_start_time" not in st.session_state:
-        st.session_state.typeracer_start_time = time.time()
-
-    if "typeracer_best_time_easy" not in st.session_state:
-        st.session_state.typeracer_best_time_easy = None
-
-    if "typeracer_best_time_hard" not in st.session_state:
-        st.session_state.typeracer_best_time_hard = None
+    if "typeracer_last_submission" not in st.session_state:
+        st.session_state.typeracer_last_submission = None
 
     # --- Handle Mode Switching ---
     mode = st.radio(
@@ -605,11 +554,10 @@ with tab3:
     if mode != st.session_state.typeracer_mode:
         st.session_state.typeracer_mode = mode
         if mode == "Easy":
-            st.session_state.typeracer_current_sentence = random.choice(typing_sentences_easy)
+            st.session_state.typeracer_current_sentence = random.choice(content_store.items("typeracer", difficulty="easy"))
         else:
-            st.session_state.typeracer_current_sentence = random.choice(typing_sentences_hard)
-        st.session_state.typeracer_user_input = ""
-        st.session_state.typeracer_start_time = time.time()
+            st.session_state.typeracer_current_sentence = random.choice(content_store.items("typeracer", difficulty="hard"))
+        st.session_state.typeracer_round += 1
         st.rerun()
 
     # --- Handle Next Sentence Button FIRST ---
@@ -617,11 +565,10 @@ with tab3:
     with col1:
         if st.button("🔄 Next Sentence (TypeRacer)"):
             if st.session_state.typeracer_mode == "Easy":
-                st.session_state.typeracer_current_sentence = random.choice(typing_sentences_easy)
+                st.session_state.typeracer_current_sentence = random.choice(content_store.items("typeracer", difficulty="easy"))
             else:
-                st.session_state.typeracer_current_sentence = random.choice(typing_sentences_hard)
-            st.session_state.typeracer_user_input = ""
-            st.session_state.typeracer_start_time = time.time()
+                st.session_state.typeracer_current_sentence = random.choice(content_store.items("typeracer", difficulty="hard"))
+            st.session_state.typeracer_round += 1
             st.rerun()
 
     # --- Display Sentence to Type (Large, Cleanly Formatted) ---
@@ -640,54 +587,155 @@ with tab3:
         )
         st.markdown(formatted_sentences, unsafe_allow_html=True)
 
-    # --- Typing input box ---
-    user_input = st.text_area(
-        "Type the full sentence(s) exactly here:",
-        value=st.session_state.typeracer_user_input,
-        key="typeracer_user_input",
+    # --- Typing Box (timed in the browser, see typing_timer.py) ---
+    st.markdown("Type the full sentence(s) exactly here, then press **Submit** or **Ctrl + Enter**:")
+    typeracer_attempt = typing_timer(
+        st.session_state.typeracer_round,
+        st.session_state.typeracer_current_sentence['hangul'],
+        key="typeracer_timer",
         height=150
     )
 
-    # --- Submit Button ---
-    if st.button("✅ Submit (TypeRacer)"):
-        if st.session_state.typeracer_user_input:
-            end_time = time.time()
-            total_time = round(end_time - st.session_state.typeracer_start_time, 2)
-
-            if st.session_state.typeracer_user_input.strip() == st.session_state.typeracer_current_sentence['hangul'].strip():
-                st.success(f"✅ Correct! You typed it in **{total_time} seconds**.")
-                st.info(f"**English Translation:** {st.session_state.typeracer_current_sentence['english']}")
-
-                # Update best time based on mode
-                if st.session_state.typeracer_mode == "Easy":
-                    if (st.session_state.typeracer_best_time_easy is None) or (total_time < st.session_state.typeracer_best_time_easy):
-                        st.session_state.typeracer_best_time_easy = total_time
-                        st.balloons()
-                else:
-                    if (st.session_state.typeracer_best_time_hard is None) or (total_time < st.session_state.typeracer_best_time_hard):
-                        st.session_state.typeracer_best_time_hard = total_time
-                        st.balloons()
+    # --- Score a New Submission ---
+    if new_submission(typeracer_attempt, st.session_state.typeracer_round, st.session_state.typeracer_last_submission):
+        st.session_state.typeracer_last_submission = (st.session_state.typeracer_round, typeracer_attempt["submission"])
+        typed_sentence = typeracer_attempt["text"].strip()
+        correct_sentence = st.session_state.typeracer_current_sentence['hangul'].strip()
+        total_time = typeracer_attempt["seconds"]
+
+        typeracer_correct = typed_sentence == correct_sentence
+        # Pasted runs, or ones too fast to have been typed, still count as attempts but never as a best time
+        typeracer_typed = typed_run(typeracer_attempt, len(to_keys(correct_sentence)))
+        # Best time is saved per player and mode
+        typeracer_stats = progress_store.record(
+            player, "typeracer", st.session_state.typeracer_current_sentence['id'], typeracer_correct,
+            mode=st.session_state.typeracer_mode.lower(), seconds=total_time if typeracer_typed else None
+        )
 
-            else:
-                st.error("❌ Incorrect! Check your spelling and spacing carefully.")
+        # Keystroke-level speed and accuracy, saved for the heatmap below
+        typing_analysis = analyze_attempt(correct_sentence, typed_sentence, total_time)
+        typing_store.add(
+            player, st.session_state.typeracer_mode.lower(), st.session_state.typeracer_current_sentence['id'],
+            typing_analysis
+        )
 
-                # Highlight incorrect characters FIRST
-                highlighted = highlight_differences(
-                    st.session_state.typeracer_current_sentence['hangul'].strip(),
-                    st.session_state.typeracer_user_input.strip()
-                )
-                st.markdown("### 🔎 Correct Sentence with Mistakes Highlighted:")
-                st.markdown(highlighted, unsafe_allow_html=True)
+        speed_col1, speed_col2, speed_col3, speed_col4 = st.columns(4)
+        speed_col1.metric("⏱️ Time", f"{total_time} s")
+        speed_col2.metric("⌨️ CPM (타수)", typing_analysis["cpm"])
+        speed_col3.metric("📝 WPM", typing_analysis["wpm"])
+        speed_col4.metric("🎯 Jamo Accuracy", f"{typing_analysis['accuracy']}%")
+        st.caption(
+            f"{typeracer_attempt['keystrokes']} keys pressed, {typeracer_attempt['backspaces']} of them Backspace. "
+            "Timed in your browser from your first keystroke to Submit."
+        )
 
-                # Then show English translation SECOND
-                st.info(f"**English Translation:** {st.session_state.typeracer_current_sentence['english']}")
+        if typeracer_correct:
+            st.success(f"✅ Correct! You typed it in **{total_time} seconds**.")
+            st.info(f"**English Translation:** {st.session_state.typeracer_current_sentence['english']}")
+
+            if typeracer_stats["new_best"]:
+                st.balloons()
+
+            # Correct runs go on the leaderboard; a new personal best shows up right away on the two tables it can change
+            # (other sentences and modes keep their cached tables until the TTL; clearing one entry needs Streamlit 1.34+)
+            board_mode = st.session_state.typeracer_mode.lower()
+            board_sentence = st.session_state.typeracer_current_sentence['id']
+            if not typeracer_typed:
+                st.caption("🏁 Pasted or impossibly fast runs don't count for best times or the leaderboard.")
+            elif not player_name:
+                st.caption("🏁 Enter a player name in the sidebar to put your times on the leaderboard.")
+            else:
+                if leaderboard.submit(player, board_mode, board_sentence, total_time):
+                    sentence_leaderboard.clear(board_mode, board_sentence)
+                    mode_leaderboard.clear(board_mode)
+                leaderboard_rank = leaderboard.rank(player, board_mode, board_sentence)
+                if leaderboard_rank:
+                    st.markdown(f"🏁 **Leaderboard:** you're #{leaderboard_rank[0]} of {leaderboard_rank[1]} on this sentence")
+
+        else:
+            st.error("❌ Incorrect! Check your spelling and spacing carefully.")
+
+            # Highlight incorrect characters FIRST
+            opcodes = diff_opcodes(correct_sentence, typed_sentence)
+            mistakes = diff_summary(opcodes)
+            st.markdown("### 🔎 Correct Sentence with Mistakes Highlighted:")
+            st.markdown(highlight_differences(correct_sentence, typed_sentence, opcodes), unsafe_allow_html=True)
+            st.caption(
+                f"<span style='color:red;'>Red</span>: typed wrong ({mistakes['wrong']}) · "
+                f"<span style='color:red; text-decoration:underline;'>Underlined</span>: missing ({mistakes['missing']}) · "
+                f"<span style='color:orange; text-decoration:line-through;'>Struck out</span>: extra ({mistakes['extra']})",
+                unsafe_allow_html=True
+            )
+
+            # Then show English translation SECOND
+            st.info(f"**English Translation:** {st.session_state.typeracer_current_sentence['english']}")
+
+        # Characters in the box over time, from the progress events the typing box collected
+        if len(typeracer_attempt["trace"]) > 1:
+            st.markdown("#### 📈 Your Pace")
+            st.line_chart(
+                pd.DataFrame(typeracer_attempt["trace"], columns=["Milliseconds", "Characters"])
+                .assign(Seconds=lambda pace: pace["Milliseconds"] / 1000)
+                .set_index("Seconds")["Characters"]
+            )
 
     # --- Show Best Times ---
     st.markdown("---")
-    if st.session_state.typeracer_mode == "Easy" and st.session_state.typeracer_best_time_easy:
-        st.markdown(f"🏆 **Best Easy Mode Time:** {st.session_state.typeracer_best_time_easy} seconds")
-    if st.session_state.typeracer_mode == "Hard" and st.session_state.typeracer_best_time_hard:
-        st.markdown(f"🏆 **Best Hard Mode Time:** {st.session_state.typeracer_best_time_hard} seconds")
+    typeracer_stats = progress_store.stats(player, "typeracer", st.session_state.typeracer_mode.lower())
+    if typeracer_stats["best_time"]:
+        st.markdown(f"🏆 **Best {st.session_state.typeracer_mode} Mode Time:** {typeracer_stats['best_time']} seconds")
+
+    # --- Leaderboards ---
+    st.markdown("### 🏁 Leaderboard")
+    board_col1, board_col2 = st.columns(2)
+    with board_col1:
+        st.markdown("**This Sentence**")
+        board = sentence_leaderboard(
+            st.session_state.typeracer_mode.lower(), st.session_state.typeracer_current_sentence['id']
+        )
+        if board.empty:
+            st.caption("Nobody has finished this sentence yet. Be the first! 🚀")
+        else:
+            st.dataframe(board, hide_index=True)
+    with board_col2:
+        st.markdown(f"**All {st.session_state.typeracer_mode} Sentences**")
+        board = mode_leaderboard(st.session_state.typeracer_mode.lower())
+        if board.empty:
+            st.caption(f"No {st.session_state.typeracer_mode} Mode times yet.")
+        else:
+            st.dataframe(board, hide_index=True)
+    st.caption(f"Fastest correct runs of every player, refreshed every {LEADERBOARD_TTL} seconds.")
+
+    # --- Typing Analytics ---
+    typing_summary = typing_store.aggregate(player, st.session_state.typeracer_mode.lower())
+    if typing_summary:
+        with st.expander(f"📊 My Typing Analytics ({st.session_state.typeracer_mode} Mode)"):
+            summary_col1, summary_col2, summary_col3, summary_col4 = st.columns(4)
+            summary_col1.metric("Attempts", typing_summary["attempts"])
+            summary_col2.metric("Average CPM", typing_summary["mean_cpm"])
+            summary_col3.metric("Best CPM", typing_summary["best_cpm"])
+            summary_col4.metric("Average Jamo Accuracy", f"{typing_summary['mean_accuracy']}%")
+
+            st.markdown("#### 📈 Speed and Accuracy per Attempt")
+            st.line_chart(pd.DataFrame({"CPM": typing_summary["cpm"], "Jamo Accuracy %": typing_summary["accuracy"]}))
+
+            st.markdown("#### 🔥 Missed Keys")
+            st.markdown(
+                keyboard_heatmap_html(typing_summary["error_rate"], typing_summary["expected"]),
+                unsafe_allow_html=True
+            )
+            st.caption("The redder the key, the more often it was missed. Hover over a key for its numbers; gray keys haven't come up yet.")
+
+            missed = pd.DataFrame({
+                "Key": KEY_NAMES,
+                "Needed": typing_summary["expected"],
+                "Missed": typing_summary["errors"],
+                "Missed %": (100 * typing_summary["error_rate"]).round(1),
+            })
+            missed = missed[missed["Missed"] > 0].sort_values(["Missed %", "Missed"], ascending=False).head(5)
+            if not missed.empty:
+                st.markdown("**Keys to practice:**")
+                st.dataframe(missed, hide_index=True)
 
 
 
@@ -724,34 +772,46 @@ In Korean, verbs change depending on when an action happens: past, present, or f
     # --- Small Description under Title ---
     st.caption("Choose the correct Korean verb form (present, past, future) for the given English sentence.")
 
+    # --- Verb group picker (questions are generated for every verb in the group) ---
+    col1, col2, col3 = st.columns([2, 4, 1])
+    with col2:
+        tense_topic = st.selectbox(
+            "Verb group:",
+            options=[ALL_TOPICS] + content_store.tags("tense"),
+            key="tense_topic",
+            label_visibility="collapsed"
+        )
+    tense_deck = tense_cards(tense_topic)
+
     # Initialize session state
     if "tense_current_question" not in st.session_state:
-        st.session_state.tense_current_question = random.choice(tense_questions)
+        st.session_state.tense_current_question = tense_question(next_card("tense", tense_deck, tense_topic))
+
+    if "tense_deck_topic" not in st.session_state:
+        st.session_state.tense_deck_topic = tense_topic
 
     if "tense_user_choice" not in st.session_state:
         st.session_state.tense_user_choice = None
 
-    if "tense_correct_count" not in st.session_state:
-        st.session_state.tense_correct_count = 0
-
-    if "tense_total_attempts" not in st.session_state:
-        st.session_state.tense_total_attempts = 0
-
-    if "tense_streak" not in st.session_state:
-        st.session_state.tense_streak = 0
+    # --- Handle Topic Switching ---
+    if tense_topic != st.session_state.tense_deck_topic:
+        st.session_state.tense_deck_topic = tense_topic
+        st.session_state.tense_current_question = tense_question(next_card("tense", tense_deck, tense_topic))
+        st.session_state.tense_user_choice = None
 
     # --- Handle Next Question button FIRST ---
-    col1, col2, col3 = st.columns([2, 4, 1])
     with col1:
         if st.button("🔄 Next Question (Tense Selector)"):
-            st.session_state.tense_current_question = random.choice(tense_questions)
+            st.session_state.tense_current_question = tense_question(next_card(
+                "tense", tense_deck, tense_topic, current=st.session_state.tense_current_question
+            ))
             st.session_state.tense_user_choice = None
             st.rerun()
 
     # --- Display Current Question ---
     st.subheader(f"English Sentence: **{st.session_state.tense_current_question['english']}**")
 
-    # No shuffling — show choices in dataset order
+    # No shuffling — always present, past, future
     st.radio(
         "Pick the correct Korean verb form:",
         options=st.session_state.tense_current_question['choices'],
@@ -761,17 +821,86 @@ In Korean, verbs change depending on when an action happens: past, present, or f
     # --- Submit Answer Button ---
     if st.button("✅ Submit (Tense Selector)"):
         if st.session_state.tense_user_choice:
-            st.session_state.tense_total_attempts += 1
+            tense_correct = st.session_state.tense_user_choice == st.session_state.tense_current_question['answer']
+            scheduler.review(player, "tense", st.session_state.tense_current_question['id'], tense_correct)
+            progress_store.record(player, "tense", st.session_state.tense_current_question['id'], tense_correct)
 
-            if st.session_state.tense_user_choice == st.session_state.tense_current_question['answer']:
-                st.session_state.tense_correct_count += 1
-                st.session_state.tense_streak += 1
+            if tense_correct:
                 st.success(f"✅ Correct! **{st.session_state.tense_user_choice}** is the right form.")
             else:
-                st.session_state.tense_streak = 0
                 st.error(f"❌ Incorrect. Correct answer was: **{st.session_state.tense_current_question['answer']}**")
+            st.caption(
+                f"📖 **{st.session_state.tense_current_question['verb']}** — "
+                + " · ".join(st.session_state.tense_current_question['choices'])
+            )
 
     # --- Show Progress and Streak at the Bottom ---
     st.markdown("---")
-    st.markdown(f"**Progress:** {st.session_state.tense_correct_count} correct out of {st.session_state.tense_total_attempts} attempts")
-    st.markdown(f"🔥 **Current Streak:** {st.session_state.tense_streak}")
+    show_progress("tense")
+    show_review_counts("tense", tense_deck, tense_topic)
+
+
+# ---------------------------------------------------------------------------------------------------------------------------
+# My Progress
+# ---------------------------------------------------------------------------------------------------------------------------
+
+GAME_NAMES = {
+    "romanization": "✍️ Romanization ➔ Hangul",
+    "vocab": "📝 Vocabulary Quiz",
+    "typeracer": "🏎️ Korean TypeRacer",
+    "tense": "⏳ Tense Selector",
+}
+
+
+def game_label(game_mode):
+    game, mode = game_mode
+    return GAME_NAMES.get(game, game) + (f" ({mode.title()})" if mode else "")
+
+
+with tab_progress:
+    st.header("My Progress 📈")
+    if player_name:
+        st.caption(f"Saved progress for **{player}**. Change the player name in the sidebar to see someone else's progress.")
+    else:
+        st.caption("Progress for this guest session. Enter a player name in the sidebar to keep it across reloads.")
+
+    progress_summary = progress_store.summary(player)
+    if not progress_summary:
+        st.info("No attempts yet. Play any game and your progress will show up here! 🌱")
+    else:
+        st.dataframe(
+            pd.DataFrame([
+                {
+                    "Game": game_label(game_mode),
+                    "Attempts": stats["attempts"],
+                    "Correct": stats["correct"],
+                    "Accuracy %": round(100 * stats["correct"] / stats["attempts"], 1) if stats["attempts"] else 0.0,
+                    "Current Streak": stats["streak"],
+                    "Best Streak": stats["best_streak"],
+                    "Best Time (s)": stats["best_time"],
+                }
+                for game_mode, stats in progress_summary.items()
+            ]),
+            hide_index=True
+        )
+
+        # The history charts wait for queued attempts to be saved, so they only load when asked for
+        if st.toggle("📊 Show history", key="progress_show_history"):
+            history_game, history_mode = st.selectbox(
+                "Show history for:",
+                options=list(progress_summary),
+                format_func=game_label,
+                key="progress_game"
+            )
+
+            st.markdown("### 🎯 Accuracy per Day")
+            daily = progress_store.daily_accuracy(player, history_game, history_mode)
+            st.line_chart(pd.DataFrame(daily, columns=["Day", "Attempts", "Correct", "Accuracy %"]).set_index("Day")["Accuracy %"])
+
+            st.markdown("### 🔥 Streak History")
+            streaks = progress_store.streak_history(player, history_game, history_mode)
+            if streaks:
+                st.bar_chart(pd.DataFrame({"Streak": [length for length, _, _ in streaks]}))
+                st.caption("Each bar is one run of correct answers in a row, oldest on the left.")
+            else:
+                st.caption("No correct answers yet, so no streaks to show.")
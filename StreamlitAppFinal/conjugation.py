@@ -0,0 +1,165 @@
+# ---------------------------------------------------------------------------------------------------------------------------
+# Conjugation Engine ⏳
+# Present, past and future polite forms (해요체) of any verb, from its dictionary form
+# ---------------------------------------------------------------------------------------------------------------------------
+#
+# Everything is built from the 아/어 form of the stem (먹다 -> 먹어, 가다 -> 가, 보다 -> 봐):
+#
+#   present = 아/어 form + 요          먹어요, 가요, 봐요
+#   past    = 아/어 form + ㅆ어요      먹었어요, 갔어요, 봤어요
+#   future  = stem + (으)ㄹ 거예요     먹을 거예요, 갈 거예요, 볼 거예요
+#
+# Vowel harmony picks 아 after a stem whose last vowel is ㅏ or ㅗ and 어 after anything else; vowel-final stems contract
+# (보 + 아 -> 봐, 마시 + 어 -> 마셔, 쓰 + 어 -> 써). Syllables are split and rebuilt with hangul.py, so the rules work on
+# single jamo instead of lookup tables of whole syllables.
+#
+# The usual irregular classes (ㄷ, ㅂ, ㅅ, ㅎ, 르) are recognized from the word lists below, or can be passed in for verbs
+# that aren't listed. Results are memoized, since the Tense Selector asks for the same verbs over and over.
+
+from functools import lru_cache
+
+from hangul import compose, decompose, is_syllable
+
+TENSES = ("present", "past", "future")
+
+BRIGHT_VOWELS = ("ㅏ", "ㅗ")
+
+D_IRREGULAR = {"걷다", "듣다", "묻다", "싣다", "깨닫다", "붇다"}
+B_IRREGULAR = {
+    "춥다", "덥다", "쉽다", "어렵다", "가깝다", "맵다", "귀엽다", "무겁다", "가볍다", "반갑다", "고맙다", "즐겁다",
+    "아름답다", "눕다", "굽다", "줍다", "돕다", "곱다", "밉다", "싱겁다", "차갑다", "뜨겁다", "더럽다", "부드럽다",
+    "시끄럽다", "부럽다", "무섭다", "외롭다",
+}
+S_IRREGULAR = {"낫다", "짓다", "붓다", "잇다", "젓다"}
+H_IRREGULAR = {"그렇다", "이렇다", "저렇다", "어떻다", "빨갛다", "노랗다", "파랗다", "하얗다", "까맣다"}
+# 르 stems are irregular (모르다 -> 몰라요) except these, which just drop ㅡ (따르다 -> 따라요)
+REU_REGULAR = {"따르다", "치르다", "들르다"}
+
+# Vowel-final stems: stem vowel -> vowel after adding 아/어
+CONTRACTIONS = {"ㅏ": "ㅏ", "ㅓ": "ㅓ", "ㅐ": "ㅐ", "ㅔ": "ㅔ", "ㅕ": "ㅕ", "ㅗ": "ㅘ", "ㅜ": "ㅝ", "ㅣ": "ㅕ", "ㅚ": "ㅙ"}
+# ㅎ irregular: the ㅎ drops and the vowel becomes ㅐ (그렇 -> 그래, 하얗 -> 하얘)
+H_VOWELS = {"ㅏ": "ㅐ", "ㅓ": "ㅐ", "ㅑ": "ㅒ", "ㅕ": "ㅖ"}
+
+
+# ---------------------------------------------------------------------------------------------------------------------------
+# Verb Classes
+# ---------------------------------------------------------------------------------------------------------------------------
+
+def _stem(verb):
+    verb = verb.strip()
+    if len(verb) < 2 or not verb.endswith("다") or not all(is_syllable(char) for char in verb):
+        raise ValueError(f"{verb!r} is not a verb in dictionary form (e.g. 먹다)")
+    return verb[:-1]
+
+
+def irregular_class(verb):
+    # "ㄷ", "ㅂ", "ㅅ", "ㅎ", "르" or None
+    stem = _stem(verb)
+    if verb in D_IRREGULAR:
+        return "ㄷ"
+    if verb in B_IRREGULAR:
+        return "ㅂ"
+    if verb in S_IRREGULAR:
+        return "ㅅ"
+    if verb in H_IRREGULAR:
+        return "ㅎ"
+    if stem.endswith("르") and len(stem) > 1 and verb not in REU_REGULAR:
+        return "르"
+    return None
+
+
+def verb_class(verb, irregular=None):
+    # A short description of which rule the verb follows, used as its tag in the Tense Selector
+    stem = _stem(verb)
+    irregular = irregular or irregular_class(verb)
+    if irregular:
+        return f"{irregular} irregular"
+    if stem.endswith("하"):
+        return "하다 verbs"
+    _, vowel, final = decompose(stem[-1])
+    if final == "ㄹ":
+        return "ㄹ stems"
+    if final:
+        return "consonant stems"
+    if vowel == "ㅡ":
+        return "ㅡ drop"
+    if vowel in ("ㅏ", "ㅓ", "ㅐ", "ㅔ", "ㅕ"):
+        return "vowel stems"
+    return "vowel contraction"
+
+
+# ---------------------------------------------------------------------------------------------------------------------------
+# Building the Forms
+# ---------------------------------------------------------------------------------------------------------------------------
+
+def _infinitive(stem, irregular):
+    # The 아/어 form: 먹 -> 먹어, 가 -> 가, 보 -> 봐, 하 -> 해
+    if stem.endswith("하"):
+        return stem[:-1] + "해"
+    head, last = stem[:-1], stem[-1]
+    initial, vowel, final = decompose(last)
+
+    if irregular == "르":
+        # 모르 -> 몰라, 부르 -> 불러: ㄹ moves onto the syllable before, which also decides 라/러
+        before_initial, before_vowel, _ = decompose(head[-1])
+        return head[:-1] + compose(before_initial, before_vowel, "ㄹ") + ("라" if before_vowel in BRIGHT_VOWELS else "러")
+    if irregular == "ㅂ":
+        # 춥 -> 추워, but 돕/곱 -> 도와/고와
+        ending = "와" if vowel == "ㅗ" and not head else "워"
+        return head + compose(initial, vowel) + ending
+    if irregular == "ㅅ":
+        return head + compose(initial, vowel) + ("아" if vowel in BRIGHT_VOWELS else "어")
+    if irregular == "ㅎ":
+        return head + compose(initial, H_VOWELS.get(vowel, vowel))
+    if irregular == "ㄷ":
+        final = "ㄹ"
+
+    if final:
+        return head + compose(initial, vowel, final) + ("아" if vowel in BRIGHT_VOWELS else "어")
+    if vowel == "ㅡ":
+        # 쓰 -> 써, 바쁘 -> 바빠: the vowel before ㅡ decides, and one-syllable stems take 어
+        bright = bool(head) and decompose(head[-1])[1] in BRIGHT_VOWELS
+        return head + compose(initial, "ㅏ" if bright else "ㅓ")
+    if vowel in CONTRACTIONS:
+        return head + compose(initial, CONTRACTIONS[vowel])
+    # ㅟ, ㅢ, ... don't contract: 쉬 -> 쉬어
+    return stem + ("아" if vowel in BRIGHT_VOWELS else "어")
+
+
+def _future(stem, irregular):
+    head, last = stem[:-1], stem[-1]
+    initial, vowel, final = decompose(last)
+    if irregular == "ㄷ":
+        return head + compose(initial, vowel, "ㄹ") + "을 거예요"
+    if irregular == "ㅂ":
+        return head + compose(initial, vowel) + "울 거예요"
+    if irregular == "ㅅ":
+        return head + compose(initial, vowel) + "을 거예요"
+    if irregular == "ㅎ":
+        return head + compose(initial, vowel, "ㄹ") + " 거예요"
+    if final == "ㄹ":
+        return stem + " 거예요"
+    if final:
+        return stem + "을 거예요"
+    return head + compose(initial, vowel, "ㄹ") + " 거예요"
+
+
+@lru_cache(maxsize=65536)
+def conjugate(verb, tense, irregular=None):
+    # conjugate("먹다", "past") -> "먹었어요"
+    if tense not in TENSES:
+        raise ValueError(f"Unknown tense {tense!r}; expected one of {', '.join(TENSES)}")
+    stem = _stem(verb)
+    irregular = irregular or irregular_class(verb)
+    if tense == "future":
+        return _future(stem, irregular)
+    infinitive = _infinitive(stem, irregular)
+    if tense == "present":
+        return infinitive + "요"
+    initial, vowel, _ = decompose(infinitive[-1])
+    return infinitive[:-1] + compose(initial, vowel, "ㅆ") + "어요"
+
+
+def conjugations(verb, irregular=None):
+    # {"present": ..., "past": ..., "future": ...}
+    return {tense: conjugate(verb, tense, irregular) for tense in TENSES}
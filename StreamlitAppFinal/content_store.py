@@ -0,0 +1,101 @@
+# ---------------------------------------------------------------------------------------------------------------------------
+# Content Store 🗂️
+# Mini-game datasets, loaded from content/<game>.json
+# ---------------------------------------------------------------------------------------------------------------------------
+#
+# Each game's items live in their own JSON file, one item per line:
+#
+#   {"id": "rom-00001", "difficulty": "easy", "tags": ["greetings"], "hangul": ..., "english": ...}
+#
+# A game's file is read the first time that game asks for items, and then kept (with its indexes) for the life of the
+# process. Streamlit re-runs app.py on every click but imports this module only once, so reruns never re-read or
+# re-build the datasets.
+#
+# Indexes per game: by id, by difficulty, by tag, and by (difficulty, tag), so a filtered deck is a dict lookup
+# instead of a scan over every item.
+
+import json
+import os
+import threading
+
+CONTENT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "content")
+
+GAMES = ("romanization", "vocab", "typeracer", "tense")
+
+
+# ---------------------------------------------------------------------------------------------------------------------------
+# Building a Game's Indexes
+# ---------------------------------------------------------------------------------------------------------------------------
+
+def _build_index(items):
+    by_id = {}
+    by_difficulty = {}
+    by_tag = {}
+    by_difficulty_tag = {}
+    for item in items:
+        if item["id"] in by_id:
+            raise ValueError(f"Duplicate content id {item['id']!r}")
+        by_id[item["id"]] = item
+        by_difficulty.setdefault(item["difficulty"], []).append(item)
+        for tag in item.get("tags", ()):
+            by_tag.setdefault(tag, []).append(item)
+            by_difficulty_tag.setdefault((item["difficulty"], tag), []).append(item)
+    return {
+        "items": items,
+        "by_id": by_id,
+        "by_difficulty": by_difficulty,
+        "by_tag": by_tag,
+        "by_difficulty_tag": by_difficulty_tag,
+    }
+
+
+# ---------------------------------------------------------------------------------------------------------------------------
+# Content Store
+# ---------------------------------------------------------------------------------------------------------------------------
+# Lists returned by items() are shared by every session: pick from them, but copy before changing anything
+# (the games already copy `choices` before shuffling).
+
+class ContentStore:
+    def __init__(self, content_dir=CONTENT_DIR):
+        self.content_dir = content_dir
+        self._lock = threading.Lock()
+        self._games = {}
+
+    def _game(self, game):
+        index = self._games.get(game)
+        if index is None:
+            # Sessions run on separate threads, so two of them may ask for a game at the same time
+            with self._lock:
+                index = self._games.get(game)
+                if index is None:
+                    if game not in GAMES:
+                        raise KeyError(f"Unknown game {game!r}")
+                    with open(os.path.join(self.content_dir, f"{game}.json"), encoding="utf-8") as f:
+                        index = _build_index(json.load(f))
+                    self._games[game] = index
+        return index
+
+    def items(self, game, difficulty=None, tag=None):
+        index = self._game(game)
+        if difficulty and tag:
+            return index["by_difficulty_tag"].get((difficulty, tag), [])
+        if difficulty:
+            return index["by_difficulty"].get(difficulty, [])
+        if tag:
+            return index["by_tag"].get(tag, [])
+        return index["items"]
+
+    def item(self, game, item_id):
+        return self._game(game)["by_id"].get(item_id)
+
+    def tags(self, game, difficulty=None):
+        index = self._game(game)
+        if difficulty:
+            return sorted(tag for item_difficulty, tag in index["by_difficulty_tag"] if item_difficulty == difficulty)
+        return sorted(index["by_tag"])
+
+    def difficulties(self, game):
+        return sorted(self._game(game)["by_difficulty"])
+
+
+content_store = ContentStore()
@@ -0,0 +1,132 @@
+# ---------------------------------------------------------------------------------------------------------------------------
+# Distractor Generator 🎭
+# Plausible wrong answers for the Vocabulary Quiz, picked from the rest of the vocabulary
+# ---------------------------------------------------------------------------------------------------------------------------
+#
+# A good distractor looks like the answer: same part of speech, about the same length, and built from many of the same
+# jamo (e.g. 오늘 / 내일, 천천히 / 편하게). Each word is scored against the others by
+#
+#   jamo overlap (Jaccard of the sets of letters)  -  LENGTH_PENALTY * difference in length
+#
+# Precomputed once per vocabulary:
+#   - every word's set of jamo as a 64-bit mask (there are only 51 letters), in one NumPy array
+#   - the word indices of each part of speech
+# so scoring one answer against a whole part of speech is a few vectorized AND/OR/popcount operations.
+#
+# The best TOP_CANDIDATES for a word are memoized, and each question samples its distractors from them, so repeat
+# questions cost microseconds and still don't always show the same three wrong answers.
+
+import random
+import re
+import threading
+
+import numpy as np
+
+from hangul import JAMO_INDEX, to_jamo
+
+TOP_CANDIDATES = 8
+LENGTH_PENALTY = 0.2
+
+PARENTHESES = re.compile(r"\([^)]*\)")
+
+
+def meaning_key(english):
+    # "Excuse me (formal)" and "Excuse me" mean the same thing
+    return " ".join(PARENTHESES.sub(" ", english).lower().split())
+
+
+def jamo_mask(word):
+    mask = 0
+    for letter in to_jamo(word):
+        index = JAMO_INDEX.get(letter)
+        if index is not None:
+            mask |= 1 << index
+    return mask
+
+
+# ---------------------------------------------------------------------------------------------------------------------------
+# Distractor Index
+# ---------------------------------------------------------------------------------------------------------------------------
+# entries: (word, part of speech, english, synonyms) for every word that may be used as an answer or a distractor.
+# Words with the answer's English meaning (ignoring anything in parentheses) or listed among its synonyms are never
+# offered, since they would be a second right answer.
+
+class DistractorIndex:
+    def __init__(self, entries):
+        self.words = []
+        self.english = []
+        positions = {}
+        pos_of_word = []
+        synonyms = []
+        for word, pos, english, word_synonyms in entries:
+            if word in positions:
+                continue
+            positions[word] = len(self.words)
+            self.words.append(word)
+            self.english.append(meaning_key(english))
+            pos_of_word.append(pos or "")
+            synonyms.append(word_synonyms or ())
+        self._positions = positions
+        self._pos = pos_of_word
+        self._masks = np.array([jamo_mask(word) for word in self.words], dtype=np.uint64)
+        self._lengths = np.array([len(word) for word in self.words], dtype=np.int64)
+        self._by_pos = {}
+        for index, pos in enumerate(pos_of_word):
+            self._by_pos.setdefault(pos, []).append(index)
+        self._by_pos = {pos: np.array(indices, dtype=np.int64) for pos, indices in self._by_pos.items()}
+        self._everyone = np.arange(len(self.words), dtype=np.int64)
+        by_english = {}
+        for index, english in enumerate(self.english):
+            by_english.setdefault(english, []).append(index)
+        # Indices a word must never be offered against: its own meaning group plus its synonyms (both ways)
+        self._same_meaning = [set(by_english[english]) for english in self.english]
+        for index, word_synonyms in enumerate(synonyms):
+            for synonym in word_synonyms:
+                other = positions.get(synonym)
+                if other is not None:
+                    self._same_meaning[index].add(other)
+                    self._same_meaning[other].add(index)
+        self._lock = threading.Lock()
+        self._memo = {}
+
+    @classmethod
+    def from_items(cls, items):
+        # Vocabulary Quiz items: {"answer", "pos", "english", "synonyms" (optional), ...}
+        return cls((item["answer"], item.get("pos"), item["english"], item.get("synonyms")) for item in items)
+
+    def _ranked(self, index, pool, exclude):
+        # Indices from `pool` (minus `exclude`), best distractor first
+        pool = pool[~np.isin(pool, exclude)]
+        if not len(pool):
+            return []
+        mask = self._masks[index]
+        shared = np.bitwise_count(self._masks[pool] & mask)
+        union = np.maximum(np.bitwise_count(self._masks[pool] | mask), 1)
+        scores = shared / union - LENGTH_PENALTY * np.abs(self._lengths[pool] - self._lengths[index])
+        count = min(TOP_CANDIDATES, len(pool))
+        best = np.argpartition(-scores, count - 1)[:count]
+        best = best[np.argsort(-scores[best], kind="stable")]
+        return pool[best].tolist()
+
+    def candidates(self, word):
+        index = self._positions.get(word)
+        if index is None:
+            return []
+        with self._lock:
+            cached = self._memo.get(index)
+        if cached is not None:
+            return cached
+
+        same_meaning = list(self._same_meaning[index])
+        ranked = self._ranked(index, self._by_pos[self._pos[index]], same_meaning)
+        if len(ranked) < TOP_CANDIDATES:
+            # Small parts of speech are topped up from the whole vocabulary
+            ranked += self._ranked(index, self._everyone, same_meaning + ranked)[:TOP_CANDIDATES - len(ranked)]
+        candidates = [self.words[other] for other in ranked]
+        with self._lock:
+            self._memo[index] = candidates
+        return candidates
+
+    def distractors(self, word, count=3, rng=random):
+        candidates = self.candidates(word)
+        return rng.sample(candidates, min(count, len(candidates)))
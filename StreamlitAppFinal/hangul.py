@@ -0,0 +1,51 @@
+# ---------------------------------------------------------------------------------------------------------------------------
+# Hangul Helpers 한글
+# Splitting syllable blocks into jamo (letters) and putting them back together
+# ---------------------------------------------------------------------------------------------------------------------------
+#
+# Every precomposed Hangul syllable (가 U+AC00 ... 힣 U+D7A3) is numbered as
+#
+#   0xAC00 + (initial * 21 + medial) * 28 + final
+#
+# with 19 initial consonants, 21 vowels and 28 finals (index 0 = no final consonant), so splitting and composing is
+# plain arithmetic. Jamo are returned as the "compatibility" letters people type and see (ㄱ, ㅏ, ...).
+
+SYLLABLE_BASE = 0xAC00
+SYLLABLE_LAST = 0xD7A3
+
+INITIALS = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+MEDIALS = "ㅏㅐㅑㅒㅓㅔㅕㅖㅗㅘㅙㅚㅛㅜㅝㅞㅟㅠㅡㅢㅣ"
+FINALS = ("", "ㄱ", "ㄲ", "ㄳ", "ㄴ", "ㄵ", "ㄶ", "ㄷ", "ㄹ", "ㄺ", "ㄻ", "ㄼ", "ㄽ", "ㄾ", "ㄿ", "ㅀ", "ㅁ", "ㅂ", "ㅄ", "ㅅ",
+          "ㅆ", "ㅇ", "ㅈ", "ㅊ", "ㅋ", "ㅌ", "ㅍ", "ㅎ")
+
+# All 51 compatibility letters ㄱ (U+3131) ... ㅣ (U+3163), e.g. for bitmasks and per-letter counts
+JAMO = "".join(chr(code) for code in range(0x3131, 0x3164))
+JAMO_INDEX = {letter: index for index, letter in enumerate(JAMO)}
+
+
+def is_syllable(char):
+    return SYLLABLE_BASE <= ord(char) <= SYLLABLE_LAST
+
+
+def decompose(syllable):
+    # "한" -> ("ㅎ", "ㅏ", "ㄴ"); the final is "" when there isn't one
+    code = ord(syllable) - SYLLABLE_BASE
+    return INITIALS[code // 588], MEDIALS[code % 588 // 28], FINALS[code % 28]
+
+
+def compose(initial, medial, final=""):
+    # ("ㅎ", "ㅏ", "ㄴ") -> "한"
+    return chr(SYLLABLE_BASE + (INITIALS.index(initial) * 21 + MEDIALS.index(medial)) * 28 + FINALS.index(final))
+
+
+def has_final(syllable):
+    return is_syllable(syllable) and (ord(syllable) - SYLLABLE_BASE) % 28 != 0
+
+
+def to_jamo(text):
+    # "한국" -> "ㅎㅏㄴㄱㅜㄱ"; anything that isn't a Hangul syllable is kept as it is
+    return "".join("".join(decompose(char)) if is_syllable(char) else char for char in text)
+
+
+def syllable_count(text):
+    return sum(1 for char in text if is_syllable(char))
@@ -0,0 +1,112 @@
+# ---------------------------------------------------------------------------------------------------------------------------
+# Leaderboard 🏁
+# Fastest correct TypeRacer times across all players, per sentence and per mode
+# ---------------------------------------------------------------------------------------------------------------------------
+#
+# One row per (player, mode, sentence) holding that player's best time, in korean_hub.sqlite3. A slower run never
+# overwrites a faster one (the upsert only updates when the new time is lower).
+#
+# Indexes:
+#   - (mode, item_id, seconds, achieved_at): the top K of one sentence is an index range read in order, stopping after K
+#     rows (ties go to whoever got there first)
+#   - (mode, seconds): the top K of a whole mode, fastest first
+#
+# The app caches the rendered tables for a few seconds (see app.py), so many players on the same page share one query.
+#
+# Times are measured in the browser, so `typed_run` checks a run before it goes on the board. It must not have been
+# pasted (or dropped) into the box, it needs at least half as many keystrokes as the sentence has jamo keys, and it
+# can't be faster than MIN_SECONDS_PER_KEY per key, well beyond the fastest human typists.
+
+import os
+import sqlite3
+import time
+from contextlib import closing
+
+DEFAULT_DB = os.path.join(os.path.dirname(os.path.abspath(__file__)), "korean_hub.sqlite3")
+
+MIN_KEYSTROKE_SHARE = 0.5
+MIN_SECONDS_PER_KEY = 0.04
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS leaderboard (
+    player TEXT NOT NULL,
+    mode TEXT NOT NULL,
+    item_id TEXT NOT NULL,
+    seconds REAL NOT NULL,
+    achieved_at REAL NOT NULL,
+    PRIMARY KEY (player, mode, item_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS leaderboard_by_sentence ON leaderboard (mode, item_id, seconds, achieved_at);
+CREATE INDEX IF NOT EXISTS leaderboard_by_mode ON leaderboard (mode, seconds);
+"""
+
+
+def typed_run(attempt, expected_keys):
+    # attempt is the typing box's submission (typing_timer.py); expected_keys is len(to_keys(sentence))
+    return (
+        not attempt.get("pasted", False)
+        and attempt.get("keystrokes", 0) >= MIN_KEYSTROKE_SHARE * expected_keys
+        and attempt["seconds"] >= MIN_SECONDS_PER_KEY * expected_keys
+    )
+
+
+class Leaderboard:
+    def __init__(self, path=DEFAULT_DB):
+        self.path = path
+        with closing(self._connect()) as connection:
+            connection.execute("PRAGMA journal_mode = WAL")
+            connection.executescript(SCHEMA)
+
+    def _connect(self):
+        connection = sqlite3.connect(self.path, timeout=30)
+        connection.execute("PRAGMA synchronous = NORMAL")
+        return connection
+
+    def submit(self, player, mode, item_id, seconds, now=None):
+        # Saves a correct run; returns True if it's the player's new best on this sentence
+        now = time.time() if now is None else now
+        with closing(self._connect()) as connection, connection:
+            cursor = connection.execute(
+                "INSERT INTO leaderboard (player, mode, item_id, seconds, achieved_at) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (player, mode, item_id) DO UPDATE SET seconds = excluded.seconds, "
+                "achieved_at = excluded.achieved_at WHERE excluded.seconds < leaderboard.seconds",
+                (player, mode, item_id, seconds, now)
+            )
+            return cursor.rowcount > 0
+
+    def top_sentence(self, mode, item_id, limit=10):
+        # [(player, seconds, achieved_at), ...] fastest first
+        with closing(self._connect()) as connection:
+            return connection.execute(
+                "SELECT player, seconds, achieved_at FROM leaderboard WHERE mode = ? AND item_id = ? "
+                "ORDER BY seconds, achieved_at LIMIT ?",
+                (mode, item_id, limit)
+            ).fetchall()
+
+    def top_mode(self, mode, limit=10):
+        # [(player, item_id, seconds, achieved_at), ...]: each player's single fastest run in the mode, fastest first
+        with closing(self._connect()) as connection:
+            return connection.execute(
+                "SELECT player, item_id, MIN(seconds) AS best, achieved_at FROM leaderboard WHERE mode = ? "
+                "GROUP BY player ORDER BY best, achieved_at LIMIT ?",
+                (mode, limit)
+            ).fetchall()
+
+    def rank(self, player, mode, item_id):
+        # (place, players) for the player on one sentence, or None if they haven't finished it
+        with closing(self._connect()) as connection:
+            row = connection.execute(
+                "SELECT seconds FROM leaderboard WHERE player = ? AND mode = ? AND item_id = ?", (player, mode, item_id)
+            ).fetchone()
+            if row is None:
+                return None
+            faster = connection.execute(
+                "SELECT COUNT(*) FROM leaderboard WHERE mode = ? AND item_id = ? AND seconds < ?", (mode, item_id, row[0])
+            ).fetchone()[0]
+            players = connection.execute(
+                "SELECT COUNT(*) FROM leaderboard WHERE mode = ? AND item_id = ?", (mode, item_id)
+            ).fetchone()[0]
+        return faster + 1, players
+
+
+leaderboard = Leaderboard()
@@ -0,0 +1,222 @@
+# ---------------------------------------------------------------------------------------------------------------------------
+# Progress Store 📈
+# Per-player attempts, accuracy, streaks and best times, saved in korean_hub.sqlite3
+# ---------------------------------------------------------------------------------------------------------------------------
+#
+# Tables:
+#   - attempts: one row per submitted answer (player, game, mode, item, correct, seconds, time)
+#   - stats:    running totals per (player, game, mode): attempts, correct, current streak, best streak, best time
+#
+# `mode` is "easy"/"hard" for the TypeRacer and "" for the other games.
+#
+# record() updates the player's totals in memory and returns them right away; the database writes happen on a background
+# thread that commits queued attempts in batches, so a submit never waits on disk. stats() and summary() answer from the
+# in-memory totals without waiting; only the history queries flush the queue first, so they include the latest attempts.
+
+import atexit
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+from contextlib import closing
+
+DEFAULT_DB = os.path.join(os.path.dirname(os.path.abspath(__file__)), "korean_hub.sqlite3")
+
+# The writer commits once it has MAX_BATCH attempts or FLUSH_SECONDS after the first one, whichever comes first
+MAX_BATCH = 500
+FLUSH_SECONDS = 0.5
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS attempts (
+    id INTEGER PRIMARY KEY,
+    player TEXT NOT NULL,
+    game TEXT NOT NULL,
+    mode TEXT NOT NULL,
+    item_id TEXT NOT NULL,
+    correct INTEGER NOT NULL,
+    seconds REAL,
+    attempted_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS attempts_by_player ON attempts (player, game, mode, attempted_at);
+CREATE TABLE IF NOT EXISTS stats (
+    player TEXT NOT NULL,
+    game TEXT NOT NULL,
+    mode TEXT NOT NULL,
+    attempts INTEGER NOT NULL,
+    correct INTEGER NOT NULL,
+    streak INTEGER NOT NULL,
+    best_streak INTEGER NOT NULL,
+    best_time REAL,
+    PRIMARY KEY (player, game, mode)
+) WITHOUT ROWID;
+"""
+
+STAT_FIELDS = ("attempts", "correct", "streak", "best_streak", "best_time")
+
+logger = logging.getLogger(__name__)
+
+
+def _empty_stats():
+    return {"attempts": 0, "correct": 0, "streak": 0, "best_streak": 0, "best_time": None}
+
+
+# ---------------------------------------------------------------------------------------------------------------------------
+# Progress Store
+# ---------------------------------------------------------------------------------------------------------------------------
+
+class ProgressStore:
+    def __init__(self, path=DEFAULT_DB):
+        self.path = path
+        self._lock = threading.Lock()
+        self._stats = {}
+        self._queue = queue.Queue()
+        self._writer = None
+        with closing(self._connect()) as connection:
+            connection.execute("PRAGMA journal_mode = WAL")
+            connection.executescript(SCHEMA)
+
+    def _connect(self):
+        connection = sqlite3.connect(self.path, timeout=30)
+        connection.execute("PRAGMA synchronous = NORMAL")
+        return connection
+
+    # ---------------- Totals ----------------
+    def _load_stats(self, key):
+        # Called with the lock held
+        if key not in self._stats:
+            with closing(self._connect()) as connection:
+                row = connection.execute(
+                    f"SELECT {', '.join(STAT_FIELDS)} FROM stats WHERE player = ? AND game = ? AND mode = ?", key
+                ).fetchone()
+            self._stats[key] = _empty_stats() if row is None else dict(zip(STAT_FIELDS, row))
+        return self._stats[key]
+
+    def stats(self, player, game, mode=""):
+        with self._lock:
+            return dict(self._load_stats((player, game, mode)))
+
+    def record(self, player, game, item_id, correct, mode="", seconds=None, now=None):
+        # Returns the updated totals, plus "new_best" when `seconds` beat the best time
+        now = time.time() if now is None else now
+        key = (player, game, mode)
+        self._start_writer()
+        with self._lock:
+            stats = self._load_stats(key)
+            stats["attempts"] += 1
+            new_best = False
+            if correct:
+                stats["correct"] += 1
+                stats["streak"] += 1
+                stats["best_streak"] = max(stats["best_streak"], stats["streak"])
+                if seconds is not None and (stats["best_time"] is None or seconds < stats["best_time"]):
+                    stats["best_time"] = seconds
+                    new_best = True
+            else:
+                stats["streak"] = 0
+            snapshot = dict(stats)
+            # Queued under the lock, so the writer saves snapshots of the same totals in the order they were taken
+            self._queue.put(((player, game, mode, item_id, int(bool(correct)), seconds, now), key, snapshot))
+        return {**snapshot, "new_best": new_best}
+
+    # ---------------- Background writer ----------------
+    def _start_writer(self):
+        if self._writer is None:
+            with self._lock:
+                if self._writer is None:
+                    self._writer = threading.Thread(target=self._run, name="progress-writer", daemon=True)
+                    self._writer.start()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + FLUSH_SECONDS
+            while len(batch) < MAX_BATCH:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+            try:
+                self._write(batch)
+            except sqlite3.Error:
+                logger.exception("Could not save %d progress attempts", len(batch))
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _write(self, batch):
+        # Only the newest snapshot of each player's totals needs saving
+        latest = {}
+        for _, key, snapshot in batch:
+            latest[key] = snapshot
+        with closing(self._connect()) as connection, connection:
+            connection.executemany(
+                "INSERT INTO attempts (player, game, mode, item_id, correct, seconds, attempted_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (row for row, _, _ in batch)
+            )
+            connection.executemany(
+                f"INSERT OR REPLACE INTO stats (player, game, mode, {', '.join(STAT_FIELDS)}) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key + tuple(snapshot[field] for field in STAT_FIELDS) for key, snapshot in latest.items())
+            )
+
+    def flush(self):
+        # Blocks until every queued attempt is committed
+        if self._writer is not None:
+            self._queue.join()
+
+    # ---------------- History ----------------
+    def daily_accuracy(self, player, game, mode=None, days=30):
+        # [(day, attempts, correct, accuracy %), ...] for the last `days` days with any attempts, oldest first
+        self.flush()
+        sql = (
+            "SELECT date(attempted_at, 'unixepoch', 'localtime') AS day, COUNT(*), SUM(correct), "
+            "ROUND(100.0 * SUM(correct) / COUNT(*), 1) FROM attempts "
+            "WHERE player = ? AND game = ? AND attempted_at >= ?"
+        )
+        params = [player, game, time.time() - days * 24 * 60 * 60]
+        if mode is not None:
+            sql += " AND mode = ?"
+            params.append(mode)
+        sql += " GROUP BY day ORDER BY day"
+        with closing(self._connect()) as connection:
+            return connection.execute(sql, params).fetchall()
+
+    def streak_history(self, player, game, mode="", limit=50):
+        # [(length, started_at, ended_at), ...] for the most recent runs of correct answers, oldest first.
+        # Each wrong answer starts a new run, so the running count of wrong answers numbers the runs.
+        self.flush()
+        with closing(self._connect()) as connection:
+            rows = connection.execute(
+                "WITH numbered AS ("
+                "  SELECT correct, attempted_at, SUM(1 - correct) OVER (ORDER BY attempted_at, id) AS run "
+                "  FROM attempts WHERE player = ? AND game = ? AND mode = ?"
+                ") "
+                "SELECT COUNT(*), MIN(attempted_at), MAX(attempted_at) FROM numbered WHERE correct = 1 "
+                "GROUP BY run ORDER BY MIN(attempted_at) DESC LIMIT ?",
+                (player, game, mode, limit)
+            ).fetchall()
+        return rows[::-1]
+
+    def summary(self, player):
+        # {(game, mode): totals} for every game the player has played. Saved totals are merged with the in-memory ones,
+        # which already include attempts still waiting in the queue, so this never waits for the writer.
+        with closing(self._connect()) as connection:
+            rows = connection.execute(
+                f"SELECT game, mode, {', '.join(STAT_FIELDS)} FROM stats WHERE player = ?", (player,)
+            ).fetchall()
+        totals = {(game, mode): dict(zip(STAT_FIELDS, values)) for game, mode, *values in rows}
+        with self._lock:
+            for (stats_player, game, mode), stats in self._stats.items():
+                if stats_player == player and stats["attempts"]:
+                    totals[(game, mode)] = dict(stats)
+        return dict(sorted(totals.items()))
+
+
+progress_store = ProgressStore()
+atexit.register(progress_store.flush)
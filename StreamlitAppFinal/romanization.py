@@ -0,0 +1,313 @@
+# ---------------------------------------------------------------------------------------------------------------------------
+# Romanization Engine 🔤
+# Revised Romanization <-> Hangul, and partial credit for Romanization game answers
+# ---------------------------------------------------------------------------------------------------------------------------
+#
+# Hangul -> Romanization (romanize) follows the Revised Romanization of Korean, which spells words the way they sound:
+#
+#   - a final consonant moves onto a following ㅇ (한국어 -> hangugeo, 맛있어요 -> masisseoyo)
+#   - finals are read as their sound: ㄱ/ㅋ/ㄲ -> k, ㅅ/ㅆ/ㅈ/ㅊ/ㄷ/ㅌ/ㅎ -> t, ㅂ/ㅍ -> p (옷 -> ot)
+#   - k/t/p before ㄴ or ㅁ become ng/n/m (감사합니다 -> gamsahamnida), ㄴ and ㄹ next to each other become ll (설날 -> seollal)
+#   - ㅎ next to ㄱ/ㄷ/ㅈ makes them k/t/ch (어떻게 -> eotteoke), and drops before a vowel (좋아요 -> joayo)
+#
+# Romanization -> Hangul (to_hangul) spells romanization by sound (mashisseoyo -> 마시써요). Letters are matched against a
+# trie of the romanized consonants and vowels; a run of consonants between two vowels is split into a final and the next
+# initial (annyeong -> an + nyeong, hangugeo -> han + gu + geo). A hyphen or apostrophe forces a syllable break.
+#
+# Both directions are memoized. Syllables are split and built with hangul.py.
+#
+# grade() gives an answer partial credit:
+#   - correct:      same spelling, ignoring spaces and punctuation
+#   - sounds right: a different spelling that romanizes the same (마시써요 for 맛있어요)
+#   - close:        at most a quarter of the word's jamo keystrokes off (see typing_analytics.to_keys), and at least one,
+#                   e.g. 맛잇어요 for 맛있어요; typed romanization is never close, the app hints at the keyboard instead
+#   - wrong:        anything else
+#
+# passed() says which grades count as a correct answer: the same ones SM-2 counts as a pass, so progress streaks and the
+# review schedule always agree ("sounds right" passes, "close" doesn't).
+
+import re
+import unicodedata
+from functools import lru_cache
+
+from hangul import compose, decompose, is_syllable
+from spaced_repetition import QUALITY_ALMOST, QUALITY_CORRECT, QUALITY_HARD, QUALITY_INCORRECT, QUALITY_PASS
+from text_diff import diff_opcodes, diff_summary
+from typing_analytics import to_keys
+
+INITIAL_ROMAN = {
+    "ㄱ": "g", "ㄲ": "kk", "ㄴ": "n", "ㄷ": "d", "ㄸ": "tt", "ㄹ": "r", "ㅁ": "m", "ㅂ": "b", "ㅃ": "pp", "ㅅ": "s", "ㅆ": "ss",
+    "ㅇ": "", "ㅈ": "j", "ㅉ": "jj", "ㅊ": "ch", "ㅋ": "k", "ㅌ": "t", "ㅍ": "p", "ㅎ": "h",
+}
+VOWEL_ROMAN = {
+    "ㅏ": "a", "ㅐ": "ae", "ㅑ": "ya", "ㅒ": "yae", "ㅓ": "eo", "ㅔ": "e", "ㅕ": "yeo", "ㅖ": "ye", "ㅗ": "o", "ㅘ": "wa",
+    "ㅙ": "wae", "ㅚ": "oe", "ㅛ": "yo", "ㅜ": "u", "ㅝ": "wo", "ㅞ": "we", "ㅟ": "wi", "ㅠ": "yu", "ㅡ": "eu", "ㅢ": "ui",
+    "ㅣ": "i",
+}
+# How each final sounds at the end of a word or before a consonant
+FINAL_SOUND = {
+    "ㄱ": "k", "ㄲ": "k", "ㅋ": "k", "ㄳ": "k", "ㄺ": "k",
+    "ㄴ": "n", "ㄵ": "n", "ㄶ": "n",
+    "ㄷ": "t", "ㅅ": "t", "ㅆ": "t", "ㅈ": "t", "ㅊ": "t", "ㅌ": "t", "ㅎ": "t",
+    "ㄹ": "l", "ㄼ": "l", "ㄽ": "l", "ㄾ": "l", "ㅀ": "l",
+    "ㅁ": "m", "ㄻ": "m",
+    "ㅂ": "p", "ㅍ": "p", "ㅄ": "p", "ㄿ": "p",
+    "ㅇ": "ng",
+}
+# Compound finals: (the part that stays, the part that moves onto a following ㅇ)
+COMPOUND_FINALS = {
+    "ㄳ": ("ㄱ", "ㅅ"), "ㄵ": ("ㄴ", "ㅈ"), "ㄶ": ("ㄴ", "ㅎ"), "ㄺ": ("ㄹ", "ㄱ"), "ㄻ": ("ㄹ", "ㅁ"), "ㄼ": ("ㄹ", "ㅂ"),
+    "ㄽ": ("ㄹ", "ㅅ"), "ㄾ": ("ㄹ", "ㅌ"), "ㄿ": ("ㄹ", "ㅍ"), "ㅀ": ("ㄹ", "ㅎ"), "ㅄ": ("ㅂ", "ㅅ"),
+}
+NASALS = {"k": "ng", "t": "n", "p": "m"}
+ASPIRATED = {"ㄱ": "k", "ㄷ": "t", "ㅈ": "ch"}
+
+# Romanized letters -> jamo when reading romanization back. "l" and "sh" (as in "mashisseoyo") are common spellings too.
+ROMAN_INITIALS = {roman: letter for letter, roman in INITIAL_ROMAN.items() if roman}
+ROMAN_INITIALS.update({"l": "ㄹ", "sh": "ㅅ"})
+ROMAN_VOWELS = {roman: letter for letter, roman in VOWEL_ROMAN.items()}
+ROMAN_FINALS = {
+    "k": "ㄱ", "g": "ㄱ", "kk": "ㄲ", "n": "ㄴ", "t": "ㅅ", "d": "ㄷ", "l": "ㄹ", "r": "ㄹ", "m": "ㅁ", "p": "ㅂ", "b": "ㅂ",
+    "s": "ㅅ", "ss": "ㅆ", "ng": "ㅇ", "j": "ㅈ", "ch": "ㅊ", "h": "ㅎ",
+}
+VOWEL_LETTERS = set("aeiouwy")
+SYLLABLE_BREAKS = set("-'’")
+
+# Scores for each grade
+SCORES = {"correct": 1.0, "sounds right": 0.8}
+CLOSE_SCORE = 0.6
+# Share of the expected keystrokes a close answer may get wrong
+CLOSE_SHARE = 0.25
+# SM-2 answer quality for each grade
+VERDICT_QUALITY = {"correct": QUALITY_CORRECT, "sounds right": QUALITY_HARD, "close": QUALITY_ALMOST, "wrong": QUALITY_INCORRECT}
+
+PUNCTUATION = re.compile(r"[\s.,!?~'\"’]+")
+
+
+# ---------------------------------------------------------------------------------------------------------------------------
+# Hangul -> Romanization
+# ---------------------------------------------------------------------------------------------------------------------------
+
+def _boundary(final, initial, vowel):
+    # How a final and the next syllable's initial are written together: (end of this syllable, start of the next)
+    if not final:
+        return "", INITIAL_ROMAN[initial]
+    sound = FINAL_SOUND[final]
+
+    if initial == "ㅇ":
+        if final == "ㅇ":
+            return "ng", ""
+        if final == "ㅎ":
+            return "", ""
+        if final in COMPOUND_FINALS:
+            stays, moves = COMPOUND_FINALS[final]
+            return FINAL_SOUND[stays], "" if moves == "ㅎ" else INITIAL_ROMAN[moves]
+        if final == "ㄹ":
+            return "", "r"
+        if vowel == "ㅣ" and final in ("ㄷ", "ㅌ"):
+            # 같이 -> gachi, 굳이 -> guji
+            return "", "j" if final == "ㄷ" else "ch"
+        return "", INITIAL_ROMAN[final]
+
+    if final in ("ㅎ", "ㄶ", "ㅀ"):
+        rest = FINAL_SOUND[COMPOUND_FINALS[final][0]] if final in COMPOUND_FINALS else ""
+        if initial in ASPIRATED:
+            return rest, ASPIRATED[initial]
+        if initial == "ㅅ":
+            return rest, "ss"
+        if initial == "ㄴ":
+            return rest or "n", "n"
+    if initial == "ㅎ" and sound in NASALS:
+        return sound, "h"
+    if initial in ("ㄴ", "ㅁ") and sound in NASALS:
+        return NASALS[sound], INITIAL_ROMAN[initial]
+    if initial == "ㄹ":
+        if sound in ("n", "l"):
+            return "l", "l"
+        if sound in NASALS:
+            return NASALS[sound], "n"
+        return sound, "n"
+    if initial == "ㄴ" and sound == "l":
+        return "l", "l"
+    return sound, INITIAL_ROMAN[initial]
+
+
+def _romanize_word(word):
+    parts = []
+    for char in word:
+        if is_syllable(char):
+            parts.append(decompose(char))
+        elif char.isalnum():
+            parts.append(char.lower())
+
+    romanized = []
+    start = None
+    for index, part in enumerate(parts):
+        if isinstance(part, str):
+            romanized.append(part)
+            start = None
+            continue
+        initial, vowel, final = part
+        romanized.append(INITIAL_ROMAN[initial] if start is None else start)
+        romanized.append(VOWEL_ROMAN[vowel])
+        following = parts[index + 1] if index + 1 < len(parts) else None
+        if isinstance(following, tuple):
+            end, start = _boundary(final, following[0], following[1])
+        else:
+            end, start = (FINAL_SOUND[final] if final else ""), None
+        romanized.append(end)
+    return "".join(romanized)
+
+
+@lru_cache(maxsize=65536)
+def romanize(text):
+    # romanize("감사합니다") -> "gamsahamnida"; sound changes only apply inside a word, not across spaces
+    return " ".join(word for word in map(_romanize_word, text.split()) if word)
+
+
+# ---------------------------------------------------------------------------------------------------------------------------
+# Romanization -> Hangul
+# ---------------------------------------------------------------------------------------------------------------------------
+
+class _Trie:
+    def __init__(self, words):
+        self.root = {}
+        for word, value in words.items():
+            node = self.root
+            for letter in word:
+                node = node.setdefault(letter, {})
+            node[None] = value
+
+    def matches(self, text, start):
+        # [(end, value), ...] for every word in the trie that text[start:] begins with, longest first
+        found = []
+        node = self.root
+        for position in range(start, len(text)):
+            node = node.get(text[position])
+            if node is None:
+                break
+            if None in node:
+                found.append((position + 1, node[None]))
+        found.reverse()
+        return found
+
+    def whole(self, text):
+        # The value for exactly `text`, or None
+        node = self.root
+        for letter in text:
+            node = node.get(letter)
+            if node is None:
+                return None
+        return node.get(None)
+
+
+INITIAL_TRIE = _Trie(ROMAN_INITIALS)
+# Initials spelled backwards, to find the initials a run of consonants ends with
+INITIAL_TRIE_REVERSED = _Trie({roman[::-1]: letter for roman, letter in ROMAN_INITIALS.items()})
+VOWEL_TRIE = _Trie(ROMAN_VOWELS)
+FINAL_TRIE = _Trie(ROMAN_FINALS)
+
+
+def _consonants_end(word, start):
+    end = start
+    while end < len(word) and word[end] not in VOWEL_LETTERS and word[end] not in SYLLABLE_BREAKS:
+        end += 1
+    return end
+
+
+def _split_run(run):
+    # Consonants between two vowels -> (final of the syllable before, initial of the next), or None if unreadable.
+    # The next syllable gets the longest initial the run ends with ("nn" -> n + n, "kk" -> "" + kk, "ngg" -> ng + g).
+    if not run:
+        return "", "ㅇ"
+    for end, initial in INITIAL_TRIE_REVERSED.matches(run[::-1], 0):
+        split = len(run) - end
+        final = FINAL_TRIE.whole(run[:split]) if split else ""
+        if final is not None:
+            return final, initial
+    final = FINAL_TRIE.whole(run)
+    return (final, "ㅇ") if final is not None else None
+
+
+def _hangul_word(word):
+    # One romanized word -> Hangul, or None if it isn't readable as romanization
+    syllables = []
+    position = 0
+    initial = None
+    while position < len(word):
+        if word[position] in SYLLABLE_BREAKS:
+            position += 1
+            continue
+        if initial is None:
+            # Start of the word, or right after a break: the consonants up to the vowel are the initial
+            end = _consonants_end(word, position)
+            initial = INITIAL_TRIE.whole(word[position:end]) if end > position else "ㅇ"
+            if initial is None:
+                return None
+            position = end
+
+        vowels = VOWEL_TRIE.matches(word, position)
+        if not vowels:
+            return None
+        position, vowel = vowels[0]
+
+        end = _consonants_end(word, position)
+        run = word[position:end]
+        if end < len(word) and word[end] not in SYLLABLE_BREAKS:
+            split = _split_run(run)
+        else:
+            split = (FINAL_TRIE.whole(run) if run else "", None)
+        if split is None or split[0] is None:
+            return None
+        final, next_initial = split
+        syllables.append(compose(initial, vowel, final))
+        initial = next_initial
+        position = end
+    return "".join(syllables)
+
+
+@lru_cache(maxsize=65536)
+def to_hangul(romanization):
+    # to_hangul("annyeong haseyo") -> "안녕 하세요"; words that can't be read are kept as they are
+    words = []
+    for word in romanization.lower().split():
+        letters = "".join(char for char in word if char.isalpha() or char in SYLLABLE_BREAKS)
+        words.append(_hangul_word(letters) or word)
+    return " ".join(words)
+
+
+# ---------------------------------------------------------------------------------------------------------------------------
+# Grading
+# ---------------------------------------------------------------------------------------------------------------------------
+
+def normalize(text):
+    # Compares answers regardless of spacing, punctuation and how the characters were composed
+    return PUNCTUATION.sub("", unicodedata.normalize("NFC", text))
+
+
+def jamo_distance(answer, expected):
+    # Edits between the two, counted in jamo keystrokes (ㅘ = ㅗ + ㅏ), and how many keystrokes the expected answer has
+    expected_keys = to_keys(normalize(expected)).tolist()
+    mistakes = diff_summary(diff_opcodes(expected_keys, to_keys(normalize(answer)).tolist()))
+    return mistakes["wrong"] + mistakes["missing"] + mistakes["extra"], len(expected_keys)
+
+
+def grade(answer, expected, close_share=CLOSE_SHARE):
+    # {"verdict", "score", "distance"}: see the top of the file for the verdicts
+    answer = answer.strip()
+    if normalize(answer) == normalize(expected):
+        return {"verdict": "correct", "score": SCORES["correct"], "distance": 0}
+    distance, length = jamo_distance(answer, expected)
+    # Only Hangul answers can sound right; typed romanization would trivially "sound" the same
+    if any(is_syllable(char) for char in answer) and romanize(normalize(answer)) == romanize(normalize(expected)):
+        return {"verdict": "sounds right", "score": SCORES["sounds right"], "distance": distance}
+    # Typed romanization isn't "close" (that's the wrong keyboard, not a typo), and short words allow a single slip
+    close_distance = max(1, int(length * close_share))
+    if answer and not answer.isascii() and distance <= close_distance:
+        return {"verdict": "close", "score": round(CLOSE_SCORE * (1 - (distance - 1) / close_distance), 2),
+                "distance": distance}
+    return {"verdict": "wrong", "score": 0.0, "distance": distance}
+
+
+def passed(verdict):
+    return VERDICT_QUALITY[verdict] >= QUALITY_PASS
@@ -0,0 +1,289 @@
+# ---------------------------------------------------------------------------------------------------------------------------
+# Spaced Repetition Scheduler 📅
+# SM-2 review scheduling shared by the Romanization, Vocabulary Quiz and Tense Selector games
+# ---------------------------------------------------------------------------------------------------------------------------
+#
+# Every (player, game, item) has a card with an ease factor, an interval and a due time. After each answer the card is
+# rescheduled with the SM-2 rules:
+#
+#   - correct:   interval goes 1 day -> 6 days -> interval * ease, and the ease creeps up
+#   - incorrect: the card restarts and comes back after RELEARN_SECONDS, and the ease drops (never below 1.3)
+#
+# Picking the next card:
+#   1. the card that has been due the longest, if any card is due
+#   2. otherwise a card the player has never seen (in a shuffled order that is fixed per player)
+#   3. otherwise the card that will be due soonest, so practice never runs dry
+#
+# Each deck (a game's items, optionally filtered to one topic) keeps its seen cards in a heap ordered by due time,
+# so choosing the next card costs O(log n) no matter how big the deck is. The due/new/learning/learned counts shown in
+# every game are kept up to date as cards are reviewed, so reading them is O(log n) too. Card states and every review
+# are saved in a local SQLite database, so a player's schedule survives reloads and restarts.
+
+import heapq
+import os
+import random
+import sqlite3
+import threading
+import time
+from bisect import bisect_left, bisect_right, insort
+from collections import OrderedDict
+from contextlib import closing
+
+DEFAULT_DB = os.path.join(os.path.dirname(os.path.abspath(__file__)), "korean_hub.sqlite3")
+
+DAY_SECONDS = 24 * 60 * 60
+RELEARN_SECONDS = 60
+START_EASE = 2.5
+MIN_EASE = 1.3
+# (player, game) card sets kept in memory; the least recently used ones are dropped and reloaded from SQLite when needed
+MAX_CACHED_PLAYERS = 256
+
+# Answer quality on SM-2's 0-5 scale
+QUALITY_CORRECT = 4
+QUALITY_HARD = 3        # right, but not quite (e.g. spelled the way it sounds)
+QUALITY_ALMOST = 2      # wrong, but close
+QUALITY_INCORRECT = 1
+# Answers below this are lapses: the card starts over and comes back soon
+QUALITY_PASS = 3
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS cards (
+    player TEXT NOT NULL,
+    game TEXT NOT NULL,
+    item_id TEXT NOT NULL,
+    ease REAL NOT NULL,
+    interval_days REAL NOT NULL,
+    repetitions INTEGER NOT NULL,
+    due REAL NOT NULL,
+    last_review REAL NOT NULL,
+    PRIMARY KEY (player, game, item_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS reviews (
+    id INTEGER PRIMARY KEY,
+    player TEXT NOT NULL,
+    game TEXT NOT NULL,
+    item_id TEXT NOT NULL,
+    quality INTEGER NOT NULL,
+    reviewed_at REAL NOT NULL,
+    interval_days REAL NOT NULL,
+    ease REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS reviews_by_player ON reviews (player, game, reviewed_at);
+"""
+
+
+# ---------------------------------------------------------------------------------------------------------------------------
+# SM-2 Update
+# ---------------------------------------------------------------------------------------------------------------------------
+# card: {"ease", "interval_days", "repetitions", "due", "last_review"}, or None for a card never seen before.
+
+def sm2(card, quality, now):
+    ease = START_EASE if card is None else card["ease"]
+    interval_days = 0.0 if card is None else card["interval_days"]
+    repetitions = 0 if card is None else card["repetitions"]
+
+    if quality < QUALITY_PASS:
+        repetitions = 0
+        interval_days = 0.0
+        due = now + RELEARN_SECONDS
+    else:
+        repetitions += 1
+        if repetitions == 1:
+            interval_days = 1.0
+        elif repetitions == 2:
+            interval_days = 6.0
+        else:
+            interval_days = round(interval_days * ease, 2)
+        due = now + interval_days * DAY_SECONDS
+
+    ease = max(MIN_EASE, ease + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02))
+    return {"ease": ease, "interval_days": interval_days, "repetitions": repetitions, "due": due, "last_review": now}
+
+
+# ---------------------------------------------------------------------------------------------------------------------------
+# One Deck's Queue
+# ---------------------------------------------------------------------------------------------------------------------------
+# The heap holds (due, item id) for seen cards. A review pushes a fresh entry and leaves the old one behind; entries whose
+# due time no longer matches the card are dropped when they reach the top.
+# For the counts, the due times of seen cards are also kept in two sorted lists, one for cards still being learned
+# (repetitions == 0) and one for learned cards, so "how many are due now" is a binary search instead of a scan.
+
+class _Deck:
+    def __init__(self, items, cards, seed):
+        self.items = {item["id"]: item for item in items}
+        self.item_ids = self.items.keys()
+        self.heap = [(cards[item_id]["due"], item_id) for item_id in self.item_ids if item_id in cards]
+        heapq.heapify(self.heap)
+        unseen = sorted(item_id for item_id in self.item_ids if item_id not in cards)
+        random.Random(seed).shuffle(unseen)
+        # Popped from the end, so reverse to keep the shuffled order
+        self.unseen = unseen[::-1]
+        self.learning_dues = sorted(cards[item_id]["due"] for item_id in self.item_ids
+                                    if item_id in cards and cards[item_id]["repetitions"] == 0)
+        self.learned_dues = sorted(cards[item_id]["due"] for item_id in self.item_ids
+                                   if item_id in cards and cards[item_id]["repetitions"] > 0)
+
+    def _dues(self, card):
+        return self.learning_dues if card["repetitions"] == 0 else self.learned_dues
+
+    def update(self, item_id, old_card, card):
+        # Called after a review with the card before (None if it was new) and after
+        if item_id not in self.item_ids:
+            return
+        heapq.heappush(self.heap, (card["due"], item_id))
+        if old_card is not None:
+            dues = self._dues(old_card)
+            dues.pop(bisect_left(dues, old_card["due"]))
+        insort(self._dues(card), card["due"])
+
+    def _top(self, cards, exclude):
+        # Returns the earliest valid entry that isn't `exclude`, leaving the heap intact
+        skipped = None
+        top = None
+        while self.heap:
+            due, item_id = self.heap[0]
+            if cards.get(item_id, {}).get("due") != due:
+                heapq.heappop(self.heap)
+                continue
+            if item_id == exclude and skipped is None:
+                skipped = heapq.heappop(self.heap)
+                continue
+            top = self.heap[0]
+            break
+        if skipped is not None:
+            heapq.heappush(self.heap, skipped)
+        return top
+
+    def _next_unseen(self, cards, exclude):
+        while self.unseen and self.unseen[-1] in cards:
+            self.unseen.pop()
+        for item_id in reversed(self.unseen):
+            if item_id != exclude and item_id not in cards:
+                return item_id
+        return None
+
+    def next_id(self, cards, now, exclude=None):
+        top = self._top(cards, exclude)
+        if top is not None and top[0] <= now:
+            return top[1]
+        unseen = self._next_unseen(cards, exclude)
+        if unseen is not None:
+            return unseen
+        if top is not None:
+            return top[1]
+        return exclude
+
+    def counts(self, now):
+        # due: ready for review; learning: missed recently and coming back soon; learned: scheduled days ahead
+        learning_due = bisect_right(self.learning_dues, now)
+        learned_due = bisect_right(self.learned_dues, now)
+        return {
+            "due": learning_due + learned_due,
+            "new": len(self.item_ids) - len(self.learning_dues) - len(self.learned_dues),
+            "learning": len(self.learning_dues) - learning_due,
+            "learned": len(self.learned_dues) - learned_due,
+        }
+
+
+# ---------------------------------------------------------------------------------------------------------------------------
+# Scheduler
+# ---------------------------------------------------------------------------------------------------------------------------
+# One per process. A player's cards for a game are read from SQLite the first time that game is played and then kept in
+# memory (up to MAX_CACHED_PLAYERS card sets, least recently used dropped first, together with their decks). Every review
+# updates memory and is written through to the database under the same lock, so writes of one card land in order.
+
+class Scheduler:
+    def __init__(self, path=DEFAULT_DB):
+        self.path = path
+        self._lock = threading.Lock()
+        self._cards = OrderedDict()
+        self._decks = {}
+        with closing(self._connect()) as connection:
+            connection.execute("PRAGMA journal_mode = WAL")
+            connection.executescript(SCHEMA)
+
+    def _connect(self):
+        connection = sqlite3.connect(self.path, timeout=30)
+        connection.execute("PRAGMA synchronous = NORMAL")
+        return connection
+
+    def _player_cards(self, player, game):
+        key = (player, game)
+        if key in self._cards:
+            self._cards.move_to_end(key)
+        else:
+            with closing(self._connect()) as connection:
+                rows = connection.execute(
+                    "SELECT item_id, ease, interval_days, repetitions, due, last_review FROM cards "
+                    "WHERE player = ? AND game = ?",
+                    key
+                ).fetchall()
+            self._cards[key] = {
+                item_id: {"ease": ease, "interval_days": interval_days, "repetitions": repetitions, "due": due,
+                          "last_review": last_review}
+                for item_id, ease, interval_days, repetitions, due, last_review in rows
+            }
+            while len(self._cards) > MAX_CACHED_PLAYERS:
+                evicted, _ = self._cards.popitem(last=False)
+                for deck_key in [deck_key for deck_key in self._decks if deck_key[:2] == evicted]:
+                    del self._decks[deck_key]
+        return self._cards[key]
+
+    def _deck(self, player, game, deck_name, items):
+        key = (player, game, deck_name)
+        deck = self._decks.get(key)
+        if deck is None or len(deck.item_ids) != len(items):
+            cards = self._player_cards(player, game)
+            deck = _Deck(items, cards, f"{player}:{game}:{deck_name}")
+            self._decks[key] = deck
+        return deck
+
+    def next_item(self, player, game, items, deck_name="all", exclude=None, now=None):
+        # items: the deck's content items; exclude: the id of the item on screen, so "Next" always moves on
+        now = time.time() if now is None else now
+        with self._lock:
+            cards = self._player_cards(player, game)
+            deck = self._deck(player, game, deck_name, items)
+            item_id = deck.next_id(cards, now, exclude)
+        return deck.items.get(item_id) or random.choice(items)
+
+    def review(self, player, game, item_id, correct, now=None, quality=None):
+        # `quality` (0-5) overrides the right/wrong default for games that give partial credit
+        now = time.time() if now is None else now
+        if quality is None:
+            quality = QUALITY_CORRECT if correct else QUALITY_INCORRECT
+        with self._lock:
+            cards = self._player_cards(player, game)
+            old_card = cards.get(item_id)
+            card = sm2(old_card, quality, now)
+            cards[item_id] = card
+            for (deck_player, deck_game, _), deck in self._decks.items():
+                if (deck_player, deck_game) == (player, game):
+                    deck.update(item_id, old_card, card)
+            self._save(player, game, item_id, quality, now, card)
+        return card
+
+    def _save(self, player, game, item_id, quality, now, card):
+        with closing(self._connect()) as connection, connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO cards (player, game, item_id, ease, interval_days, repetitions, due, last_review) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (player, game, item_id, card["ease"], card["interval_days"], card["repetitions"], card["due"], now)
+            )
+            connection.execute(
+                "INSERT INTO reviews (player, game, item_id, quality, reviewed_at, interval_days, ease) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (player, game, item_id, quality, now, card["interval_days"], card["ease"])
+            )
+
+    def deck_counts(self, player, game, items, deck_name="all", now=None):
+        now = time.time() if now is None else now
+        with self._lock:
+            return self._deck(player, game, deck_name, items).counts(now)
+
+    def card(self, player, game, item_id):
+        with self._lock:
+            return self._player_cards(player, game).get(item_id)
+
+
+scheduler = Scheduler()
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# The app imports its modules as top-level names from its own folder
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
@@ -0,0 +1,57 @@
+import shutil
+import sqlite3
+import sys
+from pathlib import Path
+
+from streamlit.testing.v1 import AppTest
+
+APP_DIR = Path(__file__).resolve().parents[1]
+APP_MODULES = {path.stem for path in APP_DIR.glob("*.py")}
+
+
+def _forget_app_modules():
+    for name in [name for name in sys.modules if name in APP_MODULES]:
+        del sys.modules[name]
+
+
+def _app_copy(tmp_path):
+    # The stores keep korean_hub.sqlite3 next to their modules, so run a copy to leave the real database alone
+    copy = tmp_path / "app"
+    shutil.copytree(APP_DIR, copy, ignore=shutil.ignore_patterns("tests", "__pycache__", "*.sqlite3*"))
+    _forget_app_modules()
+    sys.path.insert(0, str(copy))
+    return copy
+
+
+def _finish_typeracer(at, seconds, submission):
+    sentence = at.session_state["typeracer_current_sentence"]
+    at.session_state["typeracer_timer"] = {
+        "round": at.session_state["typeracer_round"], "submission": submission, "text": sentence["hangul"],
+        "seconds": seconds, "keystrokes": 200, "backspaces": 0, "trace": [],
+    }
+    return at.run()
+
+
+def test_guests_get_their_own_player_and_stay_off_the_leaderboard(tmp_path):
+    copy = _app_copy(tmp_path)
+    try:
+        first = AppTest.from_file(str(copy / "app.py"), default_timeout=60).run()
+        second = AppTest.from_file(str(copy / "app.py"), default_timeout=60).run()
+        assert not first.exception and not second.exception
+        assert first.session_state["guest_id"] != second.session_state["guest_id"]
+
+        _finish_typeracer(first, 30.0, 1)
+        assert not first.exception
+        first.text_input(key="player_name").input("Mina").run()
+        _finish_typeracer(first, 30.0, 2)
+        assert not first.exception
+
+        import progress_store
+        progress_store.progress_store.flush()
+        with sqlite3.connect(copy / "korean_hub.sqlite3") as connection:
+            assert connection.execute("SELECT player FROM leaderboard").fetchall() == [("Mina",)]
+            players = {row[0] for row in connection.execute("SELECT DISTINCT player FROM attempts")}
+        assert players == {first.session_state["guest_id"], "Mina"}
+    finally:
+        sys.path.remove(str(copy))
+        _forget_app_modules()
@@ -0,0 +1,19 @@
+from leaderboard import typed_run
+from typing_analytics import to_keys
+
+SENTENCE = "새로운 직장을 찾고 있어요."
+
+
+def _attempt(seconds, keystrokes, pasted=False):
+    return {"text": SENTENCE, "seconds": seconds, "keystrokes": keystrokes, "backspaces": 0, "pasted": pasted}
+
+
+def test_only_typed_runs_count_for_the_leaderboard():
+    keys = len(to_keys(SENTENCE))
+    assert typed_run(_attempt(8.0, keys), keys)
+    # Pasted, pasted-then-typed-a-little, and faster than anyone can type
+    assert not typed_run(_attempt(8.0, keys, pasted=True), keys)
+    assert not typed_run(_attempt(0.1, 1), keys)
+    assert not typed_run(_attempt(0.3, keys), keys)
+    # Submissions from before the box reported pastes are still checked by their keystrokes
+    assert typed_run({"seconds": 8.0, "keystrokes": keys}, keys)
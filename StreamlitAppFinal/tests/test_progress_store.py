@@ -0,0 +1,39 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from progress_store import ProgressStore
+
+
+def test_summary_after_record_does_not_wait_for_the_writer(tmp_path):
+    store = ProgressStore(str(tmp_path / "progress.sqlite3"))
+    store.record("Mina", "vocab", "vocab-00001", True)
+    started = time.perf_counter()
+    summary = store.summary("Mina")
+    assert time.perf_counter() - started < 0.1
+    assert summary[("vocab", "")]["attempts"] == 1
+    assert summary[("vocab", "")]["streak"] == 1
+
+
+def test_summary_merges_saved_and_queued_totals(tmp_path):
+    path = str(tmp_path / "progress.sqlite3")
+    store = ProgressStore(path)
+    store.record("Mina", "vocab", "vocab-00001", True)
+    store.flush()
+    # A fresh store (e.g. after a restart) only knows the saved totals until it records something new
+    restarted = ProgressStore(path)
+    restarted.record("Mina", "tense", "verb-00001-past", False)
+    summary = restarted.summary("Mina")
+    assert summary[("vocab", "")]["correct"] == 1
+    assert summary[("tense", "")]["attempts"] == 1
+    assert list(summary) == sorted(summary)
+
+
+def test_concurrent_records_save_the_latest_totals(tmp_path):
+    path = str(tmp_path / "progress.sqlite3")
+    store = ProgressStore(path)
+    with ThreadPoolExecutor(8) as pool:
+        list(pool.map(lambda index: store.record("Mina", "vocab", f"vocab-{index:05d}", True), range(400)))
+    store.flush()
+    saved = ProgressStore(path).stats("Mina", "vocab")
+    assert saved["attempts"] == 400
+    assert saved["streak"] == 400
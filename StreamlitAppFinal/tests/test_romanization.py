@@ -0,0 +1,18 @@
+import pytest
+
+from romanization import grade
+
+
+@pytest.mark.parametrize("answer, expected, verdict", [
+    ("맛잇어요", "맛있어요", "close"),
+    ("맛잇어오", "맛있어요", "close"),
+    ("내", "네", "close"),
+    # Both keys of a two-key word wrong
+    ("가", "네", "wrong"),
+    ("나", "그", "wrong"),
+    # Typed romanization is left for the keyboard hint
+    ("ne", "네", "wrong"),
+    ("masisseoyo", "맛있어요", "wrong"),
+])
+def test_close_scales_with_the_word_length(answer, expected, verdict):
+    assert grade(answer, expected)["verdict"] == verdict
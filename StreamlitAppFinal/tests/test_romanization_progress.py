@@ -0,0 +1,32 @@
+import pytest
+
+from progress_store import ProgressStore
+from romanization import VERDICT_QUALITY, grade, passed
+from spaced_repetition import Scheduler
+
+
+@pytest.mark.parametrize("answer, verdict, counts", [
+    ("맛있어요", "correct", True),
+    ("마시써요", "sounds right", True),
+    ("맛잇어요", "close", False),
+    ("사랑", "wrong", False),
+])
+def test_each_verdict_maps_to_the_same_outcome_in_progress_and_review(tmp_path, answer, verdict, counts):
+    # Submitted the way the Romanization game does it (app.py), after one earlier correct answer
+    store = ProgressStore(str(tmp_path / "hub.sqlite3"))
+    scheduler = Scheduler(str(tmp_path / "hub.sqlite3"))
+    store.record("Mina", "romanization", "rom-00001", True)
+    scheduler.review("Mina", "romanization", "rom-00001", True, now=0)
+
+    result = grade(answer, "맛있어요")
+    assert result["verdict"] == verdict
+    assert passed(verdict) is counts
+    store.record("Mina", "romanization", "rom-00001", passed(verdict))
+    card = scheduler.review(
+        "Mina", "romanization", "rom-00001", passed(verdict), now=86400, quality=VERDICT_QUALITY[verdict]
+    )
+
+    totals = store.summary("Mina")[("romanization", "")]
+    assert totals["correct"] == (2 if counts else 1)
+    assert totals["streak"] == (2 if counts else 0)
+    assert card["repetitions"] == (2 if counts else 0)
@@ -0,0 +1,48 @@
+import random
+
+import spaced_repetition
+from spaced_repetition import Scheduler
+
+ITEMS = [{"id": f"vocab-{index:05d}"} for index in range(200)]
+
+
+def _recount(scheduler, player, now):
+    counts = {"due": 0, "new": 0, "learning": 0, "learned": 0}
+    for item in ITEMS:
+        card = scheduler.card(player, "vocab", item["id"])
+        if card is None:
+            counts["new"] += 1
+        elif card["due"] <= now:
+            counts["due"] += 1
+        elif card["repetitions"] == 0:
+            counts["learning"] += 1
+        else:
+            counts["learned"] += 1
+    return counts
+
+
+def test_deck_counts_follow_reviews(tmp_path):
+    path = str(tmp_path / "hub.sqlite3")
+    scheduler = Scheduler(path)
+    picker = random.Random(0)
+    now = 0.0
+    assert scheduler.deck_counts("Mina", "vocab", ITEMS, now=now)["new"] == len(ITEMS)
+    for _ in range(1000):
+        now += picker.uniform(0, 3600)
+        scheduler.review("Mina", "vocab", picker.choice(ITEMS)["id"], picker.random() < 0.7, now=now)
+        if picker.random() < 0.1:
+            assert scheduler.deck_counts("Mina", "vocab", ITEMS, now=now) == _recount(scheduler, "Mina", now)
+    # A restarted scheduler builds the same counts from the database
+    assert Scheduler(path).deck_counts("Mina", "vocab", ITEMS, now=now) == _recount(scheduler, "Mina", now)
+
+
+def test_card_cache_keeps_only_recent_players(tmp_path, monkeypatch):
+    monkeypatch.setattr(spaced_repetition, "MAX_CACHED_PLAYERS", 3)
+    scheduler = Scheduler(str(tmp_path / "hub.sqlite3"))
+    for player in ["A", "B", "C", "D", "E"]:
+        scheduler.review(player, "vocab", "vocab-00001", True, now=0)
+        scheduler.deck_counts(player, "vocab", ITEMS, now=0)
+    assert list(scheduler._cards) == [("C", "vocab"), ("D", "vocab"), ("E", "vocab")]
+    assert {key[:2] for key in scheduler._decks} <= set(scheduler._cards)
+    # An evicted player's cards come back from the database
+    assert scheduler.card("A", "vocab", "vocab-00001")["repetitions"] == 1
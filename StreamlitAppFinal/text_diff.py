@@ -0,0 +1,128 @@
+# ---------------------------------------------------------------------------------------------------------------------------
+# Mistake Highlighting 🔎
+# Aligns what was typed with the correct sentence, so one extra or missing character doesn't mark the rest as wrong
+# ---------------------------------------------------------------------------------------------------------------------------
+#
+# The alignment is Myers' diff (the algorithm behind `git diff`), which finds the fewest insertions and deletions in
+# O((N + M) * D) time, where D is the number of edits: close to linear for an attempt with a few typos. Strings are
+# compared character by character; a precomposed Hangul syllable is one character, so a wrong syllable is one edit.
+#
+# Edits are grouped into opcodes like difflib's: ("equal" | "replace" | "delete" | "insert", i1, i2, j1, j2), where
+# correct[i1:i2] lines up with typed[j1:j2].
+
+import html
+
+
+# ---------------------------------------------------------------------------------------------------------------------------
+# Myers Diff
+# ---------------------------------------------------------------------------------------------------------------------------
+
+def _edit_path(a, b):
+    # Forward pass: v[k] is the furthest x reached on diagonal k (k = x - y). Each step's v is kept for the backtrack.
+    n, m = len(a), len(b)
+    v = {1: 0}
+    trace = []
+    for d in range(n + m + 1):
+        trace.append(dict(v))
+        for k in range(-d, d + 1, 2):
+            if k == -d or (k != d and v[k - 1] < v[k + 1]):
+                x = v[k + 1]
+            else:
+                x = v[k - 1] + 1
+            y = x - k
+            while x < n and y < m and a[x] == b[y]:
+                x += 1
+                y += 1
+            v[k] = x
+            if x >= n and y >= m:
+                return _backtrack(trace, n, m)
+    return []
+
+
+def _backtrack(trace, n, m):
+    # Walks back from (n, m) and returns single-character steps, first to last
+    steps = []
+    x, y = n, m
+    for d in range(len(trace) - 1, -1, -1):
+        v = trace[d]
+        k = x - y
+        if k == -d or (k != d and v[k - 1] < v[k + 1]):
+            previous_k = k + 1
+        else:
+            previous_k = k - 1
+        previous_x = v[previous_k]
+        previous_y = previous_x - previous_k
+        while x > previous_x and y > previous_y:
+            x -= 1
+            y -= 1
+            steps.append("equal")
+        if d > 0:
+            steps.append("insert" if x == previous_x else "delete")
+        x, y = previous_x, previous_y
+    steps.reverse()
+    return steps
+
+
+def diff_opcodes(correct, typed):
+    opcodes = []
+    i = j = 0
+    for step in _edit_path(correct, typed):
+        di = 0 if step == "insert" else 1
+        dj = 0 if step == "delete" else 1
+        if opcodes and opcodes[-1][0] == step:
+            tag, i1, i2, j1, j2 = opcodes[-1]
+            opcodes[-1] = (tag, i1, i2 + di, j1, j2 + dj)
+        else:
+            opcodes.append((step, i, i + di, j, j + dj))
+        i += di
+        j += dj
+
+    # Deletions next to insertions are a substitution: the learner typed something else in that spot
+    merged = []
+    for opcode in opcodes:
+        if merged and merged[-1][0] != "equal" and opcode[0] != "equal":
+            _, i1, _, j1, _ = merged[-1]
+            merged[-1] = ("replace", i1, opcode[2], j1, opcode[4])
+        else:
+            merged.append(opcode)
+    return merged
+
+
+def diff_summary(opcodes):
+    # Characters that were typed wrong, left out, or typed extra
+    summary = {"wrong": 0, "missing": 0, "extra": 0}
+    for tag, i1, i2, j1, j2 in opcodes:
+        if tag == "replace":
+            summary["wrong"] += min(i2 - i1, j2 - j1)
+            summary["missing"] += max(0, (i2 - i1) - (j2 - j1))
+            summary["extra"] += max(0, (j2 - j1) - (i2 - i1))
+        elif tag == "delete":
+            summary["missing"] += i2 - i1
+        elif tag == "insert":
+            summary["extra"] += j2 - j1
+    return summary
+
+
+# ---------------------------------------------------------------------------------------------------------------------------
+# HTML Rendering
+# ---------------------------------------------------------------------------------------------------------------------------
+# The correct sentence, with one span per run of mistakes (not one per character):
+#   - red:                  typed something else here (hover to see what)
+#   - red, underlined:      left out
+#   - orange, struck out:   typed extra (shown where it was typed)
+
+def highlight_differences(correct, typed, opcodes=None):
+    opcodes = diff_opcodes(correct, typed) if opcodes is None else opcodes
+    parts = []
+    for tag, i1, i2, j1, j2 in opcodes:
+        expected = html.escape(correct[i1:i2])
+        entered = html.escape(typed[j1:j2])
+        if tag == "equal":
+            parts.append(expected)
+        elif tag == "replace":
+            parts.append(f"<span style='color:red;' title='You typed: {entered}'>{expected}</span>")
+        elif tag == "delete":
+            parts.append(f"<span style='color:red; text-decoration:underline;' title='Missing'>{expected}</span>")
+        else:
+            parts.append(f"<span style='color:orange; text-decoration:line-through;' title='Extra'>{entered}</span>")
+    return "".join(parts)
@@ -0,0 +1,237 @@
+# ---------------------------------------------------------------------------------------------------------------------------
+# Typing Analytics ⌨️
+# Keystroke-level speed and accuracy for the Korean TypeRacer, per jamo key
+# ---------------------------------------------------------------------------------------------------------------------------
+#
+# Korean is typed one jamo at a time on the 2-set (두벌식) keyboard, so a syllable like 왔 is four keystrokes: ㅇ ㅗ ㅏ ㅆ.
+# Every attempt is turned into the key sequence the sentence needs and the key sequence that was typed:
+#
+#   - compound vowels and finals are split into the keys that make them (ㅘ -> ㅗ ㅏ, ㄺ -> ㄹ ㄱ)
+#   - double consonants (ㄲ, ㅆ, ...) are one shifted key
+#
+# The decomposition is vectorized: the text's code points go into a NumPy array and the initial/medial/final of every
+# syllable come out of integer division and lookup arrays, with no per-character Python loop.
+#
+# Per attempt:
+#   - CPM: keystrokes per minute (the usual Korean 타수), WPM: space-separated words per minute
+#   - jamo accuracy: share of the sentence's keys that line up with a correct key (Myers alignment from text_diff.py)
+#   - how often each key was needed and how often it was missed, as arrays over KEY_NAMES
+#
+# Those arrays are saved per attempt, and a player's heatmap is the NumPy sum over all of their attempts.
+
+import os
+import sqlite3
+import time
+from contextlib import closing
+
+import numpy as np
+
+from hangul import FINALS, INITIALS, JAMO, JAMO_INDEX, MEDIALS, SYLLABLE_BASE, SYLLABLE_LAST
+from text_diff import diff_opcodes
+
+DEFAULT_DB = os.path.join(os.path.dirname(os.path.abspath(__file__)), "korean_hub.sqlite3")
+
+# Keys tracked in the heatmap: the 51 jamo, the space bar, and everything else (punctuation, Latin letters, ...)
+KEY_NAMES = list(JAMO) + ["Space", "Other"]
+SPACE_KEY = len(JAMO)
+OTHER_KEY = SPACE_KEY + 1
+KEY_COUNT = OTHER_KEY + 1
+# Other characters keep their own code (OTHER_KEY + 1 + code point) so "." and "," still differ when aligning
+OTHER_CODE_BASE = OTHER_KEY + 1
+
+# Letters that take two keystrokes on the 2-set keyboard
+KEY_SEQUENCES = {
+    "ㅘ": "ㅗㅏ", "ㅙ": "ㅗㅐ", "ㅚ": "ㅗㅣ", "ㅝ": "ㅜㅓ", "ㅞ": "ㅜㅔ", "ㅟ": "ㅜㅣ", "ㅢ": "ㅡㅣ",
+    "ㄳ": "ㄱㅅ", "ㄵ": "ㄴㅈ", "ㄶ": "ㄴㅎ", "ㄺ": "ㄹㄱ", "ㄻ": "ㄹㅁ", "ㄼ": "ㄹㅂ", "ㄽ": "ㄹㅅ", "ㄾ": "ㄹㅌ", "ㄿ": "ㄹㅍ",
+    "ㅀ": "ㄹㅎ", "ㅄ": "ㅂㅅ",
+}
+
+# Dubeolsik layout for the heatmap (shifted keys on their own row)
+KEYBOARD_ROWS = ["ㅂㅈㄷㄱㅅㅛㅕㅑㅐㅔ", "ㅁㄴㅇㄹㅎㅗㅓㅏㅣ", "ㅋㅌㅊㅍㅠㅜㅡ", "ㅃㅉㄸㄲㅆㅒㅖ"]
+
+
+def _key_table(letters, width):
+    # One row per letter: the key indices it takes, padded with -1
+    table = np.full((len(letters), width), -1, dtype=np.int64)
+    for row, letter in enumerate(letters):
+        keys = [JAMO_INDEX[key] for key in KEY_SEQUENCES.get(letter, letter)]
+        table[row, :len(keys)] = keys
+    return table
+
+
+INITIAL_KEYS = _key_table(INITIALS, 1)
+MEDIAL_KEYS = _key_table(MEDIALS, 2)
+FINAL_KEYS = np.vstack([np.full((1, 2), -1, dtype=np.int64), _key_table(FINALS[1:], 2)])
+LETTER_KEYS = _key_table(JAMO, 2)
+
+
+# ---------------------------------------------------------------------------------------------------------------------------
+# Text -> Keystrokes
+# ---------------------------------------------------------------------------------------------------------------------------
+
+def to_keys(text):
+    codes = np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32).astype(np.int64)
+    keys = np.full((len(codes), 5), -1, dtype=np.int64)
+
+    syllables = (codes >= SYLLABLE_BASE) & (codes <= SYLLABLE_LAST)
+    offsets = codes[syllables] - SYLLABLE_BASE
+    keys[syllables, 0:1] = INITIAL_KEYS[offsets // 588]
+    keys[syllables, 1:3] = MEDIAL_KEYS[offsets % 588 // 28]
+    keys[syllables, 3:5] = FINAL_KEYS[offsets % 28]
+
+    # Loose jamo typed on their own (ㅋㅋ)
+    letters = (codes >= 0x3131) & (codes <= 0x3163)
+    keys[letters, 0:2] = LETTER_KEYS[codes[letters] - 0x3131]
+
+    spaces = codes == ord(" ")
+    keys[spaces, 0] = SPACE_KEY
+    others = ~(syllables | letters | spaces)
+    keys[others, 0] = OTHER_CODE_BASE + codes[others]
+
+    flat = keys.ravel()
+    return flat[flat >= 0]
+
+
+def heatmap_keys(keys):
+    # Folds every "other" character into the single Other bucket
+    return np.minimum(keys, OTHER_KEY)
+
+
+# ---------------------------------------------------------------------------------------------------------------------------
+# One Attempt
+# ---------------------------------------------------------------------------------------------------------------------------
+
+def analyze_attempt(correct, typed, seconds):
+    expected = to_keys(correct)
+    entered = to_keys(typed)
+
+    matched = np.zeros(len(expected), dtype=bool)
+    extra = 0
+    for tag, i1, i2, j1, j2 in diff_opcodes(expected.tolist(), entered.tolist()):
+        if tag == "equal":
+            matched[i1:i2] = True
+        elif j2 - j1 > i2 - i1:
+            extra += (j2 - j1) - (i2 - i1)
+
+    buckets = heatmap_keys(expected)
+    minutes = max(seconds, 0.01) / 60
+    return {
+        "seconds": seconds,
+        "keystrokes": int(len(entered)),
+        "cpm": round(len(entered) / minutes, 1),
+        "wpm": round(len(typed.split()) / minutes, 1),
+        "accuracy": round(100 * float(matched.mean()), 1) if len(expected) else 100.0,
+        "extra_keys": extra,
+        "expected": np.bincount(buckets, minlength=KEY_COUNT).astype(np.int32),
+        "errors": np.bincount(buckets[~matched], minlength=KEY_COUNT).astype(np.int32),
+    }
+
+
+# ---------------------------------------------------------------------------------------------------------------------------
+# Saved Attempts
+# ---------------------------------------------------------------------------------------------------------------------------
+# The per-key arrays are stored as raw int32 bytes, so aggregating loads them straight back into one 2-D array.
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS typing_attempts (
+    id INTEGER PRIMARY KEY,
+    player TEXT NOT NULL,
+    mode TEXT NOT NULL,
+    item_id TEXT NOT NULL,
+    attempted_at REAL NOT NULL,
+    seconds REAL NOT NULL,
+    keystrokes INTEGER NOT NULL,
+    cpm REAL NOT NULL,
+    wpm REAL NOT NULL,
+    accuracy REAL NOT NULL,
+    expected BLOB NOT NULL,
+    errors BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS typing_attempts_by_player ON typing_attempts (player, mode, attempted_at);
+"""
+
+
+class TypingAnalyticsStore:
+    def __init__(self, path=DEFAULT_DB):
+        self.path = path
+        with closing(self._connect()) as connection:
+            connection.execute("PRAGMA journal_mode = WAL")
+            connection.executescript(SCHEMA)
+
+    def _connect(self):
+        connection = sqlite3.connect(self.path, timeout=30)
+        connection.execute("PRAGMA synchronous = NORMAL")
+        return connection
+
+    def add(self, player, mode, item_id, analysis, now=None):
+        now = time.time() if now is None else now
+        with closing(self._connect()) as connection, connection:
+            connection.execute(
+                "INSERT INTO typing_attempts (player, mode, item_id, attempted_at, seconds, keystrokes, cpm, wpm, accuracy, "
+                "expected, errors) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (player, mode, item_id, now, analysis["seconds"], analysis["keystrokes"], analysis["cpm"],
+                 analysis["wpm"], analysis["accuracy"], analysis["expected"].tobytes(), analysis["errors"].tobytes())
+            )
+
+    def aggregate(self, player, mode=None, limit=500):
+        # Totals over the player's last `limit` attempts, or None if there are none
+        sql = "SELECT attempted_at, cpm, wpm, accuracy, expected, errors FROM typing_attempts WHERE player = ?"
+        params = [player]
+        if mode:
+            sql += " AND mode = ?"
+            params.append(mode)
+        sql += " ORDER BY attempted_at DESC LIMIT ?"
+        params.append(limit)
+        with closing(self._connect()) as connection:
+            rows = connection.execute(sql, params).fetchall()
+        if not rows:
+            return None
+
+        rows.reverse()
+        times, cpm, wpm, accuracy, expected, errors = zip(*rows)
+        expected = np.frombuffer(b"".join(expected), dtype=np.int32).reshape(len(rows), KEY_COUNT).sum(axis=0)
+        errors = np.frombuffer(b"".join(errors), dtype=np.int32).reshape(len(rows), KEY_COUNT).sum(axis=0)
+        cpm = np.array(cpm)
+        accuracy = np.array(accuracy)
+        return {
+            "attempts": len(rows),
+            "attempted_at": np.array(times),
+            "cpm": cpm,
+            "wpm": np.array(wpm),
+            "accuracy": accuracy,
+            "mean_cpm": round(float(cpm.mean()), 1),
+            "best_cpm": round(float(cpm.max()), 1),
+            "mean_accuracy": round(float(accuracy.mean()), 1),
+            "expected": expected,
+            "errors": errors,
+            "error_rate": np.divide(errors, expected, out=np.zeros(KEY_COUNT), where=expected > 0),
+        }
+
+
+# ---------------------------------------------------------------------------------------------------------------------------
+# Keyboard Heatmap
+# ---------------------------------------------------------------------------------------------------------------------------
+# An HTML keyboard where each key is tinted by how often it was missed; keys never needed stay gray.
+
+def keyboard_heatmap_html(error_rate, expected):
+    rows = []
+    for row in KEYBOARD_ROWS:
+        cells = []
+        for letter in row:
+            index = JAMO_INDEX[letter]
+            if expected[index]:
+                rate = float(error_rate[index])
+                style = f"background-color: rgba(198, 12, 48, {0.1 + 0.9 * rate:.2f}); color: #FFFFFF;"
+                title = f"{letter}: {rate:.0%} missed of {int(expected[index])}"
+            else:
+                style = "background-color: #333333; color: #888888;"
+                title = f"{letter}: not typed yet"
+            cells.append(
+                f"<span title='{title}' style='{style} display: inline-block; width: 2.2em; margin: 2px; "
+                f"padding: 6px 0; text-align: center; border-radius: 5px; font-weight: bold;'>{letter}</span>"
+            )
+        rows.append("<div>" + "".join(cells) + "</div>")
+    return "<div style='text-align: center;'>" + "".join(rows) + "</div>"
+
+
+typing_store = TypingAnalyticsStore()
@@ -0,0 +1,33 @@
+# ---------------------------------------------------------------------------------------------------------------------------
+# TypeRacer Typing Box ⏱️
+# A Streamlit component that times typing in the browser instead of on the server
+# ---------------------------------------------------------------------------------------------------------------------------
+#
+# Timing with time.time() on the server counts everything between two reruns: the websocket round trip, re-running the
+# script, and any rerun that restarts the clock. The component (components/typing_timer/index.html) starts its clock at
+# the first keystroke and stops it at Submit, and only talks to the server once, on Submit.
+#
+# Each submission comes back as
+#   {"round", "submission", "text", "seconds", "keystrokes", "backspaces", "pasted",
+#    "trace": [[milliseconds, characters], ...]}
+# and keeps coming back on every rerun after that, so `new_submission` tells a fresh one apart from one already scored.
+
+import os
+
+import streamlit.components.v1 as components
+
+FRONTEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "components", "typing_timer")
+
+_typing_timer = components.declare_component("typing_timer", path=FRONTEND_DIR)
+
+
+def typing_timer(round_id, target, key, placeholder="", height=150):
+    # round_id changes whenever a new sentence is shown, which clears the box and resets the clock
+    return _typing_timer(
+        round=round_id, target_length=len(target), placeholder=placeholder, height=height, key=key, default=None
+    )
+
+
+def new_submission(value, round_id, last_seen):
+    # True for a submission from the current round that hasn't been scored yet
+    return bool(value) and value.get("round") == round_id and (round_id, value.get("submission")) != last_seen